@@ -0,0 +1,13 @@
+import streamlit as st
+
+from comum.paginas import EXERCICIOS
+
+# Entrada do app único: os dez exercícios rodam como páginas (pasta pages/)
+# de um só processo, em vez de um contêiner por exercício
+st.set_page_config(page_title="Exercícios Streamlit", page_icon="📚")
+
+st.title("📚 Exercícios Streamlit")
+st.write("Escolha um exercício na barra lateral.")
+
+for numero, (nome, titulo) in enumerate(EXERCICIOS.items(), start=1):
+    st.markdown(f"{numero}. **{titulo}** (`{nome}`)")
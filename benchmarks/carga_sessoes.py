@@ -0,0 +1,516 @@
+"""
+Teste de carga com várias sessões simultâneas contra um aplicativo real.
+
+Sobe `streamlit run exercN/app.py` numa porta local e abre N conexões
+websocket (/_stcore/stream), cada uma se comportando como um navegador:
+pede a execução do script, espera o fim (script_finished), altera widgets
+pelo rótulo, clica botões e envia arquivos pelo mesmo protocolo do
+frontend (BackMsg/ForwardMsg). Para cada quantidade de sessões são
+medidos a vazão (interações por segundo), a latência das interações
+(p50/p95/p99) e a memória RSS do processo do servidor (antes, pico e
+depois das sessões fecharem).
+
+O exerc10 usa a API simulada de benchmarks/servidor_paises.py, então o
+teste não depende da rede nem da API real.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/carga_sessoes.py --app exerc9 --sessoes 1 5 10 25 --tamanho 100000
+
+O resultado vai para benchmarks/resultados/carga_<app>.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import websocket_connect
+
+import dados_sinteticos
+from servidor_paises import ServidorPaises
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIPOS_WIDGET = {
+    "button", "checkbox", "file_uploader", "multiselect", "number_input",
+    "radio", "selectbox", "slider", "text_area", "text_input",
+}
+
+
+class SessaoStreamlit:
+    """Uma sessão de navegador simulada sobre o websocket do Streamlit"""
+
+    def __init__(self, url_base, timeout):
+        self.url_base = url_base
+        self.timeout = timeout
+        self.session_id = None
+        # Página do app multipágina (nome na barra lateral); None = principal
+        self.pagina = None
+        self.widgets = {}
+        self.estados = {}
+        self.bytes_recebidos = 0
+        self.excecoes = 0
+        self._conexao = None
+        self._fim_execucao = None
+        self._pedidos_arquivo = {}
+
+    async def conectar(self):
+        url = "ws" + self.url_base[len("http"):] + "/_stcore/stream"
+        self._conexao = await websocket_connect(url, subprotocols=["streamlit"], max_message_size=1 << 31)
+        asyncio.ensure_future(self._ler())
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+
+    async def _ler(self):
+        while True:
+            dados = await self._conexao.read_message()
+            if dados is None:
+                if self._fim_execucao is not None and not self._fim_execucao.done():
+                    self._fim_execucao.set_exception(ConnectionError("conexão encerrada pelo servidor"))
+                return
+            self.bytes_recebidos += len(dados)
+            msg = ForwardMsg()
+            msg.ParseFromString(dados)
+            tipo = msg.WhichOneof("type")
+
+            if tipo == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif tipo == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elemento = msg.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                if tipo_elemento in TIPOS_WIDGET:
+                    proto = getattr(elemento, tipo_elemento)
+                    self.widgets[proto.label] = (tipo_elemento, proto)
+                elif tipo_elemento == "exception":
+                    self.excecoes += 1
+            elif tipo == "file_urls_response":
+                futuro = self._pedidos_arquivo.pop(msg.file_urls_response.response_id, None)
+                if futuro is not None:
+                    futuro.set_result(msg.file_urls_response)
+            elif tipo == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                if self._fim_execucao is not None and not self._fim_execucao.done():
+                    self._fim_execucao.set_result(msg.script_finished)
+
+    async def executar(self):
+        """Pede uma execução com o estado atual dos widgets; devolve (segundos, bytes recebidos)"""
+        self._fim_execucao = asyncio.get_running_loop().create_future()
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        if self.pagina:
+            msg.rerun_script.page_name = self.pagina
+        msg.rerun_script.widget_states.widgets.extend(self.estados.values())
+
+        bytes_antes = self.bytes_recebidos
+        inicio = time.perf_counter()
+        await self._conexao.write_message(msg.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._fim_execucao, self.timeout)
+        segundos = time.perf_counter() - inicio
+
+        # Botões valem só para a execução em que foram clicados
+        self.estados = {
+            id_widget: estado for id_widget, estado in self.estados.items()
+            if estado.WhichOneof("value") != "trigger_value"
+        }
+        return segundos, self.bytes_recebidos - bytes_antes
+
+    def definir(self, rotulo, valor):
+        """Altera o valor de um widget (pelo rótulo), como o frontend faria"""
+        tipo, proto = self.widgets[rotulo]
+        estado = WidgetState(id=proto.id)
+        if tipo in ("selectbox", "radio"):
+            estado.int_value = list(proto.options).index(str(valor))
+        elif tipo == "multiselect":
+            estado.int_array_value.data.extend(list(proto.options).index(str(v)) for v in valor)
+        elif tipo == "slider":
+            valores = list(valor) if isinstance(valor, (list, tuple)) else [valor]
+            if proto.options:
+                valores = [list(proto.options).index(str(v)) for v in valores]
+            estado.double_array_value.data.extend(valores)
+        elif tipo == "checkbox":
+            estado.bool_value = bool(valor)
+        elif tipo in ("text_input", "text_area"):
+            estado.string_value = valor
+        elif tipo == "number_input":
+            if proto.data_type == NumberInput.INT:
+                estado.int_value = int(valor)
+            else:
+                estado.double_value = float(valor)
+        elif tipo == "button":
+            estado.trigger_value = True
+        else:
+            raise ValueError(f"Widget '{rotulo}' ({tipo}) não pode ser alterado por definir()")
+        self.estados[proto.id] = estado
+
+    async def enviar_arquivo(self, rotulo, nome, conteudo):
+        """Envia um arquivo para um st.file_uploader, como o frontend faria"""
+        _, proto = self.widgets[rotulo]
+        id_pedido = uuid.uuid4().hex
+        pedido = BackMsg()
+        pedido.file_urls_request.request_id = id_pedido
+        pedido.file_urls_request.file_names.append(nome)
+        pedido.file_urls_request.session_id = self.session_id
+        futuro = asyncio.get_running_loop().create_future()
+        self._pedidos_arquivo[id_pedido] = futuro
+        await self._conexao.write_message(pedido.SerializeToString(), binary=True)
+        urls = (await asyncio.wait_for(futuro, self.timeout)).file_urls[0]
+
+        limite = uuid.uuid4().hex
+        corpo = (
+            f'--{limite}\r\nContent-Disposition: form-data; name="file"; filename="{nome}"\r\n'
+            "Content-Type: text/csv\r\n\r\n"
+        ).encode("utf-8") + conteudo + f"\r\n--{limite}--\r\n".encode("utf-8")
+        await AsyncHTTPClient().fetch(HTTPRequest(
+            self.url_base + urls.upload_url, method="PUT", body=corpo,
+            headers={"Content-Type": f"multipart/form-data; boundary={limite}"},
+            request_timeout=self.timeout,
+        ))
+
+        estado = WidgetState(id=proto.id)
+        info = estado.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id = urls.file_id
+        info.name = nome
+        info.size = len(conteudo)
+        info.file_urls.CopyFrom(urls)
+        self.estados[proto.id] = estado
+
+
+# --- Roteiros ----------------------------------------------------------------
+# Cada roteiro devolve (variáveis de ambiente do servidor, passos). Um passo
+# é (nome, ações); cada ação é ("definir", rótulo, valor), ("clicar", rótulo)
+# ou ("enviar", rótulo, nome do arquivo, conteúdo). O valor e o conteúdo
+# podem ser funções do número da sessão, para que sessões diferentes
+# escolham valores diferentes.
+
+def _arquivo(rotulo, caminho):
+    with open(caminho, "rb") as arquivo:
+        return ("enviar", rotulo, os.path.basename(caminho), arquivo.read())
+
+
+def roteiro_exerc1(args, diretorio):
+    return {}, [
+        ("enviar CSV", [_arquivo("Escolha um arquivo CSV", dados_sinteticos.csv_generico(args.tamanho))]),
+        ("trocar coluna", [("definir", "Selecione uma coluna numérica para análise:", "preco")]),
+        ("voltar coluna", [("definir", "Selecione uma coluna numérica para análise:", "vendas")]),
+    ]
+
+
+def roteiro_exerc2(args, diretorio):
+    cidades = dados_sinteticos.CIDADES
+    return {"DADOS_PRODUTOS": dados_sinteticos.csv_produtos(args.tamanho)}, [
+        ("filtrar cidades", [("definir", "Filtrar por Cidade:", lambda i: cidades[i % 4:i % 4 + 3])]),
+        ("faixa de preço", [("definir", "Faixa de Preço:", (1_000, 5_000))]),
+        ("limpar filtros", [("definir", "Filtrar por Cidade:", cidades)]),
+    ]
+
+
+def roteiro_exerc3(args, diretorio):
+    return {}, [
+        ("taxa de juros", [("definir", "Taxa de juros anual (%):", lambda i: 1.0 + (i % 50) / 5)]),
+        ("período", [("definir", "Período (anos):", 30)]),
+    ]
+
+
+def roteiro_exerc4(args, diretorio):
+    return {}, [("reexecutar", [])]
+
+
+def roteiro_exerc5(args, diretorio):
+    return {}, [
+        ("enviar formulário", [
+            ("definir", "Nome", lambda i: f"Pessoa {i}"),
+            ("definir", "Idade", 30),
+            ("definir", "Quais são suas cores favoritas?", ["Azul", "Verde"]),
+            ("clicar", "Enviar"),
+        ]),
+    ]
+
+
+def roteiro_exerc6(args, diretorio):
+    textos = [dados_sinteticos.texto(args.tamanho, semente) for semente in (1, 2)]
+    return {}, [
+        ("digitar texto", [("definir", "Digite ou cole seu texto aqui:", textos[0])]),
+        ("trocar texto", [("definir", "Digite ou cole seu texto aqui:", textos[1])]),
+    ]
+
+
+def roteiro_exerc7(args, diretorio):
+    return {"CATALOGO_FILMES": dados_sinteticos.csv_filmes(args.tamanho)}, [
+        ("gerar recomendações", [
+            ("definir", "Ação", True),
+            ("definir", "Comédia", True),
+            ("clicar", "Gerar Recomendações"),
+        ]),
+        ("semelhantes a um título", [("definir", "Modo de recomendação:", "Semelhantes a um título")]),
+        ("buscar título", [("definir", "Buscar filme pelo início do título:", lambda i: f"Filme {i % 100}")]),
+        ("por preferências", [("definir", "Modo de recomendação:", "Por preferências")]),
+    ]
+
+
+def roteiro_exerc8(args, diretorio):
+    caminho = dados_sinteticos.csv_notas(args.tamanho)
+    return {"DADOS_TREINO_NOTAS": caminho, "ARTEFATOS_MODELO_NOTAS": os.path.join(diretorio, "artefatos")}, [
+        ("horas de estudo", [("definir", "Horas de estudo por semana", lambda i: 1.0 + (i % 19) / 2)]),
+        ("agregação em voxels", [("definir", "Modo de exibição dos pontos:", "Agregação em voxels")]),
+        ("amostragem estratificada", [("definir", "Modo de exibição dos pontos:", "Amostragem estratificada")]),
+        # O botão só aparece depois que o arquivo é enviado
+        ("enviar CSV de alunos", [_arquivo("Arquivo CSV de alunos", caminho)]),
+        ("previsão em lote", [("clicar", "Calcular Previsões em Lote")]),
+    ]
+
+
+def roteiro_exerc9(args, diretorio):
+    # Cada sessão envia um arquivo diferente (uma linha a mais com o número
+    # da sessão), como usuários distintos, sem compartilhar o DataFrame
+    _, rotulo, nome, conteudo = _arquivo("Escolha um arquivo CSV", dados_sinteticos.csv_generico(args.tamanho))
+    enviar = ("enviar", rotulo, nome, lambda i: conteudo + f"2020-01-01 00:00:00,{i},0.0,0.0,Norte\n".encode("utf-8"))
+    return {}, [
+        ("enviar CSV", [enviar]),
+        ("análise estatística", [("definir", "Selecione uma página:", "Análise Estatística")]),
+        ("gráficos interativos", [("definir", "Selecione uma página:", "Gráficos Interativos")]),
+        ("upload de dados", [("definir", "Selecione uma página:", "Upload de Dados")]),
+    ]
+
+
+def roteiro_exerc10(args, diretorio):
+    return {"SNAPSHOT_PAISES": os.path.join(diretorio, "paises.json.gz")}, [
+        ("buscar país", [
+            ("definir", "Selecione um país:", lambda i: f"País {i % args.paises}"),
+            ("clicar", "Buscar Informações"),
+        ]),
+        ("fronteiras cruzadas", [("definir", "Fronteiras cruzadas:", 3)]),
+    ]
+
+
+ROTEIROS = {f"exerc{i}": globals()[f"roteiro_exerc{i}"] for i in range(1, 11)}
+
+
+# --- Servidor e medição ------------------------------------------------------
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for linha in status:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_total_mb(pids):
+    return sum(rss_mb(pid) or 0.0 for pid in pids)
+
+
+class AmostradorMemoria:
+    """Acompanha o RSS somado de processos numa thread e guarda o pico"""
+
+    def __init__(self, pids, intervalo=0.1):
+        self.pids = pids
+        self.intervalo = intervalo
+        self.pico = 0.0
+        self._parar = threading.Event()
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, rss_total_mb(self.pids))
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+
+def iniciar_servidor(script, porta, diretorio, ambiente_extra):
+    """Sobe `script` (relativo à raiz do repositório) com `streamlit run` e espera ele responder"""
+    comando = [
+        sys.executable, "-m", "streamlit", "run", os.path.join(RAIZ, script),
+        "--server.port", str(porta),
+        "--server.headless", "true",
+        # O cliente de carga não tem o cookie XSRF do frontend
+        "--server.enableXsrfProtection", "false",
+        "--server.enableCORS", "false",
+        "--server.maxUploadSize", "4000",
+        "--browser.gatherUsageStats", "false",
+    ]
+    # Cache de conjuntos e cópias das sessões em disco vazios a cada servidor,
+    # sem herdar cargas anteriores
+    ambiente = dict(
+        os.environ,
+        DADOS_CACHE_DIR=os.path.join(diretorio, "cache_dados"),
+        MEMORIA_SESSOES_DIR=os.path.join(diretorio, "sessoes"),
+        **ambiente_extra
+    )
+    processo = subprocess.Popen(comando, cwd=diretorio, env=ambiente,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.time() + 60
+    while time.time() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor de {script} terminou com código {processo.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1):
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f"O servidor de {script} não respondeu em 60 s")
+
+
+async def rodar_sessao(indice, url_base, passos, args, pagina=None):
+    """Uma sessão: carga inicial e depois o roteiro repetido `ciclos` vezes"""
+    sessao = SessaoStreamlit(url_base, args.timeout)
+    sessao.pagina = pagina
+    medicoes = []
+    erro = None
+    try:
+        await sessao.conectar()
+        segundos, recebidos = await sessao.executar()
+        medicoes.append(("carga", segundos, recebidos))
+        for _ in range(args.ciclos):
+            for nome, acoes in passos:
+                for acao in acoes:
+                    if acao[0] == "definir":
+                        valor = acao[2](indice) if callable(acao[2]) else acao[2]
+                        sessao.definir(acao[1], valor)
+                    elif acao[0] == "clicar":
+                        sessao.definir(acao[1], True)
+                    else:
+                        conteudo = acao[3](indice) if callable(acao[3]) else acao[3]
+                        await sessao.enviar_arquivo(acao[1], acao[2], conteudo)
+                segundos, recebidos = await sessao.executar()
+                medicoes.append((nome, segundos, recebidos))
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    finally:
+        sessao.fechar()
+    return medicoes, erro, sessao.excecoes
+
+
+def percentis(valores):
+    if not valores:
+        return {}
+    valores = np.asarray(valores) * 1000
+    return {
+        "p50_ms": float(np.percentile(valores, 50)),
+        "p95_ms": float(np.percentile(valores, 95)),
+        "p99_ms": float(np.percentile(valores, 99)),
+        "max_ms": float(valores.max()),
+    }
+
+
+async def medir_rodada(quantidade, url_base, passos, pid, args):
+    """Roda `quantidade` sessões ao mesmo tempo e resume as medições"""
+    rss_antes = rss_mb(pid)
+    with AmostradorMemoria([pid]) as memoria:
+        inicio = time.perf_counter()
+        sessoes = await asyncio.gather(*(rodar_sessao(i, url_base, passos, args) for i in range(quantidade)))
+        duracao = time.perf_counter() - inicio
+    # Tempo para o servidor encerrar as sessões desconectadas
+    await asyncio.sleep(args.espera)
+
+    medicoes = [m for medicoes_sessao, _, _ in sessoes for m in medicoes_sessao]
+    por_passo = {}
+    for nome, segundos, _ in medicoes:
+        por_passo.setdefault(nome, []).append(segundos)
+    erros = [erro for _, erro, _ in sessoes if erro]
+    return {
+        "sessoes": quantidade,
+        "interacoes": len(medicoes),
+        "segundos": duracao,
+        "interacoes_por_segundo": len(medicoes) / duracao if duracao > 0 else 0.0,
+        "latencia": percentis([segundos for _, segundos, _ in medicoes]),
+        "latencia_por_passo": {nome: percentis(valores) for nome, valores in por_passo.items()},
+        "bytes_recebidos_mediana": statistics.median(b for _, _, b in medicoes) if medicoes else 0,
+        "rss_antes_mb": rss_antes,
+        "rss_pico_mb": memoria.pico,
+        "rss_depois_mb": rss_mb(pid),
+        "sessoes_com_erro": len(erros),
+        "erros": sorted(set(erros))[:5],
+        "excecoes_no_app": sum(excecoes for _, _, excecoes in sessoes),
+    }
+
+
+async def executar(args):
+    servidor_paises = None
+    with tempfile.TemporaryDirectory() as diretorio:
+        ambiente, passos = ROTEIROS[args.app](args, diretorio)
+        if args.app == "exerc10":
+            servidor_paises = ServidorPaises(0, args.paises, args.latencia_api / 1000).iniciar()
+            ambiente["REST_COUNTRIES_URL"] = servidor_paises.url_api
+
+        processo = iniciar_servidor(os.path.join(args.app, "app.py"), args.porta, diretorio, ambiente)
+        url_base = f"http://127.0.0.1:{args.porta}"
+        rodadas = []
+        try:
+            for quantidade in args.sessoes:
+                rodada = await medir_rodada(quantidade, url_base, passos, processo.pid, args)
+                rodadas.append(rodada)
+                latencia = rodada["latencia"]
+                print(
+                    f"{quantidade:4d} sessões  {rodada['interacoes_por_segundo']:7.1f} interações/s  "
+                    f"p50 {latencia.get('p50_ms', 0):7.0f} ms  p95 {latencia.get('p95_ms', 0):7.0f} ms  "
+                    f"p99 {latencia.get('p99_ms', 0):7.0f} ms  RSS {rodada['rss_antes_mb']:6.0f} -> "
+                    f"pico {rodada['rss_pico_mb']:6.0f} -> {rodada['rss_depois_mb']:6.0f} MB"
+                    + (f"  ({rodada['sessoes_com_erro']} sessões com erro)" if rodada["sessoes_com_erro"] else "")
+                )
+        finally:
+            processo.terminate()
+            processo.wait()
+            if servidor_paises is not None:
+                servidor_paises.shutdown()
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "app": args.app,
+        "tamanho": args.tamanho,
+        "ciclos": args.ciclos,
+        "api_paises": dict(servidor_paises.requisicoes) if servidor_paises else None,
+        "rodadas": rodadas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", required=True, choices=sorted(ROTEIROS))
+    parser.add_argument("--sessoes", nargs="+", type=int, default=[1, 5, 10, 25])
+    parser.add_argument("--ciclos", type=int, default=3, help="repetições do roteiro por sessão")
+    parser.add_argument("--tamanho", type=int, default=100_000, help="linhas dos dados sintéticos")
+    parser.add_argument("--paises", type=int, default=250, help="países da API simulada (exerc10)")
+    parser.add_argument("--latencia-api", type=float, default=50.0, help="atraso da API simulada (ms)")
+    parser.add_argument("--porta", type=int, default=8599)
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de cada interação (s)")
+    parser.add_argument("--espera", type=float, default=2.0, help="pausa após cada rodada antes de medir o RSS (s)")
+    parser.add_argument("--saida")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(executar(args))
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"carga_{args.app}.json")
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, "w") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
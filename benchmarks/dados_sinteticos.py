@@ -0,0 +1,134 @@
+"""
+Dados sintéticos dos benchmarks, no formato que cada aplicativo espera.
+
+Os arquivos são gerados uma vez por tamanho e reaproveitados nas
+execuções seguintes (ficam em benchmarks/dados/, fora do git).
+"""
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+
+CIDADES = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Salvador", "Brasília", "Curitiba", "Recife", "Porto Alegre"]
+CATEGORIAS = ["Eletrônicos", "Roupas", "Alimentos", "Livros", "Casa", "Esportes"]
+GENEROS = ["Ação", "Comédia", "Drama", "Ficção Científica", "Terror", "Romance", "Animação", "Documentário"]
+REGIOES = ["Africa", "Americas", "Asia", "Europe", "Oceania"]
+
+
+def _arquivo(nome, tamanho, gerar, extensao="csv"):
+    """Caminho do arquivo `nome` com `tamanho` linhas, gerando se ainda não existir"""
+    os.makedirs(DIRETORIO_DADOS, exist_ok=True)
+    caminho = os.path.join(DIRETORIO_DADOS, f"{nome}_{tamanho}.{extensao}")
+    if not os.path.exists(caminho):
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        gerar(temporario, tamanho)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def tabela_generica(tamanho, semente=42):
+    """Tabela com datas, três colunas numéricas e uma categórica (exerc1 e exerc9)"""
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "data": pd.date_range("2020-01-01", periods=tamanho, freq="min"),
+        "vendas": gerador.integers(100, 1000, tamanho),
+        "temperatura": gerador.normal(25, 5, tamanho),
+        "preco": gerador.uniform(10, 50, tamanho),
+        "regiao": gerador.choice(["Norte", "Sul", "Leste", "Oeste"], tamanho),
+    })
+
+
+def csv_generico(tamanho):
+    return _arquivo("generico", tamanho, lambda caminho, n: tabela_generica(n).to_csv(caminho, index=False))
+
+
+def csv_produtos(tamanho):
+    """Tabela de produtos no formato do products_data.csv do exerc2"""
+    def gerar(caminho, n):
+        gerador = np.random.default_rng(42)
+        pd.DataFrame({
+            "product_id": np.arange(1001, 1001 + n),
+            "product_name": [f"Produto {i}" for i in range(n)],
+            "category": gerador.choice(CATEGORIAS, n),
+            "price": gerador.uniform(0, 10_000, n).round(2),
+            "stock": gerador.integers(0, 500, n),
+            "city": gerador.choice(CIDADES, n),
+            "rating": gerador.uniform(1, 5, n).round(1),
+        }).to_csv(caminho, index=False)
+    return _arquivo("produtos_loja", tamanho, gerar)
+
+
+def csv_filmes(tamanho):
+    """Catálogo de filmes no formato do exerc7 (titulo, genero, ano, pontuacao_base)"""
+    def gerar(caminho, n):
+        gerador = np.random.default_rng(42)
+        pd.DataFrame({
+            "titulo": [f"Filme {i}" for i in range(n)],
+            "genero": gerador.choice(GENEROS, n),
+            "ano": gerador.integers(1950, 2025, n),
+            "pontuacao_base": gerador.integers(40, 100, n),
+        }).to_csv(caminho, index=False)
+    return _arquivo("filmes", tamanho, gerar)
+
+
+def csv_notas(tamanho):
+    """Dados de treino do exerc8 (horas_estudo, nota_anterior, nota_final)"""
+    def gerar(caminho, n):
+        gerador = np.random.default_rng(42)
+        horas = gerador.uniform(1, 10, n)
+        anterior = gerador.uniform(3, 10, n)
+        final = np.clip(2 + 0.5 * horas + 0.3 * anterior + gerador.normal(0, 1, n), 0, 10)
+        pd.DataFrame({
+            "horas_estudo": horas.round(3),
+            "nota_anterior": anterior.round(3),
+            "nota_final": final.round(3),
+        }).to_csv(caminho, index=False)
+    return _arquivo("notas", tamanho, gerar)
+
+
+def paises(tamanho, semente=42):
+    """Lista de países no formato da API REST Countries (v3.1)"""
+    gerador = np.random.default_rng(semente)
+    codigos = [f"P{i:05d}" for i in range(tamanho)]
+    lista = []
+    for i, codigo in enumerate(codigos):
+        vizinhos = gerador.choice(tamanho, size=min(3, tamanho - 1), replace=False) if tamanho > 1 else []
+        lista.append({
+            "name": {"common": f"País {i}", "official": f"República do País {i}"},
+            "cca2": codigo[-2:],
+            "cca3": codigo,
+            "capital": [f"Capital {i}"],
+            "region": REGIOES[i % len(REGIOES)],
+            "subregion": f"Sub-região {i % 17}",
+            "population": int(gerador.integers(1_000, 200_000_000)),
+            "area": float(gerador.uniform(100, 5_000_000)),
+            "latlng": [float(gerador.uniform(-60, 70)), float(gerador.uniform(-180, 180))],
+            "borders": [codigos[j] for j in vizinhos if j != i],
+            "currencies": {"XXX": {"name": "Moeda"}},
+            "languages": {"por": "Portuguese"},
+            "timezones": ["UTC"],
+            "flags": {"png": ""},
+        })
+    return lista
+
+
+def snapshot_paises(tamanho):
+    """Snapshot gzip no formato do exerc10 (SNAPSHOT_PAISES)"""
+    def gerar(caminho, n):
+        with gzip.open(caminho, "wt", encoding="utf-8") as arquivo:
+            json.dump({"paises": paises(n), "etag": "sintetico", "last_modified": None,
+                       "baixado_em": time.time(), "verificado_em": 0.0}, arquivo)
+    return _arquivo("paises", tamanho, gerar, extensao="json.gz")
+
+
+def texto(tamanho_palavras, semente=42):
+    """Texto com `tamanho_palavras` palavras de um vocabulário com distribuição de Zipf"""
+    gerador = np.random.default_rng(semente)
+    vocabulario = np.array([f"palavra{i}" for i in range(5_000)])
+    indices = np.minimum(gerador.zipf(1.3, tamanho_palavras) - 1, len(vocabulario) - 1)
+    return " ".join(vocabulario[indices])
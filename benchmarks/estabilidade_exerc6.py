@@ -0,0 +1,143 @@
+"""
+Teste de estabilidade do exerc6: milhares de reexecuções seguidas, sem
+navegador, verificando que nenhuma figura fica registrada no pyplot e que
+a memória do processo (RSS) não cresce.
+
+O app é executado com o AppTest do Streamlit no próprio processo (ver
+benchmarks/requirements.txt), alternando entre alguns textos sintéticos,
+como um usuário digitando: parte das reexecuções desenha gráficos novos e
+parte reaproveita o cache. As primeiras reexecuções (aquecimento) enchem
+os caches do app e não entram na comparação; depois delas, o RSS é
+amostrado a intervalos e a diferença entre o início e o fim precisa ficar
+dentro da tolerância.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/estabilidade_exerc6.py [--reexecucoes 10000] [--tolerancia-mb 20]
+
+As 10 mil reexecuções levam cerca de uma hora: com os 300 textos em
+rodízio, mais que as 256 entradas do cache de imagens, a nuvem de
+palavras é refeita em todas elas. O resultado vai para
+benchmarks/resultados/estabilidade_exerc6.json; o código de saída é 1 se
+alguma verificação falhar.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import dados_sinteticos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_mb():
+    with open("/proc/self/status") as status:
+        for linha in status:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024
+    return None
+
+
+def executar(args):
+    import matplotlib.pyplot as plt
+    from streamlit.testing.v1 import AppTest
+
+    # Mais textos que as entradas do cache de gráficos: o cache também é
+    # esvaziado e reenchido durante o teste
+    textos = [dados_sinteticos.texto(args.palavras, semente=i) for i in range(args.textos)]
+
+    at = AppTest.from_file(os.path.join(RAIZ, "exerc6", "app.py"), default_timeout=args.timeout)
+    at.run()
+
+    amostras = []
+    figuras_abertas = []
+    erros = []
+    inicio = time.perf_counter()
+    for i in range(args.reexecucoes):
+        at.text_area[0].input(textos[i % len(textos)])
+        at.run()
+        if at.exception and len(erros) < 5:
+            erros.append(str(at.exception[0].value))
+        if plt.get_fignums():
+            figuras_abertas.append({"reexecucao": i + 1, "figuras": len(plt.get_fignums())})
+        if (i + 1) % args.intervalo == 0:
+            gc.collect()
+            amostras.append({"reexecucao": i + 1, "rss_mb": _rss_mb(), "segundos": time.perf_counter() - inicio})
+            print(f"{i + 1:>7} reexecuções  RSS {amostras[-1]['rss_mb']:7.1f} MB  "
+                  f"figuras {len(plt.get_fignums())}", flush=True)
+
+    # Medianas de algumas amostras no início e no fim, depois do aquecimento,
+    # para que uma coleta de lixo isolada não decida o resultado
+    medidas = [a["rss_mb"] for a in amostras if a["reexecucao"] > args.aquecimento]
+    janela = max(1, min(5, len(medidas) // 4))
+    rss_inicio = statistics.median(medidas[:janela]) if medidas else None
+    rss_fim = statistics.median(medidas[-janela:]) if medidas else None
+    crescimento = rss_fim - rss_inicio if medidas else None
+
+    falhas = []
+    if figuras_abertas:
+        falhas.append(f"{len(figuras_abertas)} reexecuções deixaram figuras no pyplot")
+    if crescimento is None:
+        falhas.append("nenhuma amostra de memória depois do aquecimento")
+    elif crescimento > args.tolerancia_mb:
+        falhas.append(f"RSS cresceu {crescimento:.1f} MB (tolerância {args.tolerancia_mb:.1f} MB)")
+    if erros:
+        falhas.append(f"exceções no app: {erros[0]}")
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "reexecucoes": args.reexecucoes,
+        "aquecimento": args.aquecimento,
+        "textos": args.textos,
+        "palavras": args.palavras,
+        "rss_inicio_mb": rss_inicio,
+        "rss_fim_mb": rss_fim,
+        "crescimento_mb": crescimento,
+        "tolerancia_mb": args.tolerancia_mb,
+        "figuras_abertas": figuras_abertas[:20],
+        "erros": erros,
+        "amostras": amostras,
+        "falhas": falhas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reexecucoes", type=int, default=10_000)
+    parser.add_argument("--aquecimento", type=int, default=1_000, help="reexecuções iniciais fora da comparação")
+    parser.add_argument("--intervalo", type=int, default=250, help="reexecuções entre duas amostras de RSS")
+    parser.add_argument("--textos", type=int, default=300, help="textos diferentes digitados em rodízio")
+    parser.add_argument("--palavras", type=int, default=50, help="palavras de cada texto")
+    parser.add_argument("--tolerancia-mb", type=float, default=20.0, help="crescimento máximo do RSS (MB)")
+    parser.add_argument("--timeout", type=float, default=60, help="tempo máximo de cada reexecução (s)")
+    parser.add_argument("--saida", default=os.path.join(RAIZ, "benchmarks", "resultados", "estabilidade_exerc6.json"))
+    args = parser.parse_args()
+
+    try:
+        from streamlit.testing.v1 import AppTest  # noqa: F401
+    except ImportError:
+        sys.exit("O teste precisa do AppTest do Streamlit: pip install -r benchmarks/requirements.txt")
+
+    resultado = executar(args)
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, "w") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+    if resultado["crescimento_mb"] is not None:
+        print(f"RSS depois do aquecimento: {resultado['rss_inicio_mb']:.1f} -> {resultado['rss_fim_mb']:.1f} MB "
+              f"({resultado['crescimento_mb']:+.1f} MB)")
+    print(f"Resultados gravados em {args.saida}")
+    if resultado["falhas"]:
+        for falha in resultado["falhas"]:
+            print(f"FALHOU: {falha}")
+        sys.exit(1)
+    print("OK: nenhuma figura aberta e memória estável")
+
+
+if __name__ == "__main__":
+    main()
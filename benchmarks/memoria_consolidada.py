@@ -0,0 +1,162 @@
+"""
+Memória da implantação consolidada (um processo, dez páginas) contra a de
+dez processos separados (um por exercício, como os contêineres antigos).
+
+As duas implantações sobem localmente com `streamlit run` e recebem o mesmo
+uso: uma sessão por exercício roda o roteiro de benchmarks/carga_sessoes.py
+(envio de arquivos, filtros, botões), o que enche os caches de cada app.
+Depois, é medido o RSS somado dos processos do servidor:
+
+- ocioso: logo depois de subir, antes de qualquer sessão;
+- pico: máximo durante os roteiros;
+- final: depois que as sessões fecham (os caches continuam em memória).
+
+O RSS de processos separados equivale ao de contêineres separados, que não
+compartilham bibliotecas carregadas nem caches.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/memoria_consolidada.py --tamanho 100000
+
+O resultado vai para benchmarks/resultados/memoria_consolidada.json.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+
+from carga_sessoes import (
+    RAIZ, ROTEIROS, AmostradorMemoria, iniciar_servidor, rodar_sessao, rss_mb, rss_total_mb,
+)
+from servidor_paises import ServidorPaises
+
+
+def paginas_consolidadas():
+    """Nome de página (como o Streamlit o envia) de cada exercício em pages/"""
+    paginas = {}
+    for caminho in glob.glob(os.path.join(RAIZ, "pages", "*.py")):
+        with open(caminho, encoding="utf-8") as arquivo:
+            encontrado = re.search(r'executar_exercicio\("(exerc\d+)"\)', arquivo.read())
+        if encontrado:
+            nome = re.sub(r"^\d+_", "", os.path.splitext(os.path.basename(caminho))[0])
+            paginas[encontrado.group(1)] = nome
+    return paginas
+
+
+async def usar_apps(servidores, roteiros, args):
+    """Uma sessão por exercício, com o roteiro de carga_sessoes.py; devolve os erros"""
+    erros = {}
+    for app, (url_base, pagina) in servidores.items():
+        _, passos = roteiros[app]
+        sessoes = await asyncio.gather(*(
+            rodar_sessao(i, url_base, passos, args, pagina) for i in range(args.sessoes_por_app)
+        ))
+        mensagens = [erro for _, erro, _ in sessoes if erro]
+        if mensagens:
+            erros[app] = mensagens[0]
+    return erros
+
+
+async def medir(nome, processos, servidores, roteiros, args):
+    pids = [processo.pid for processo in processos]
+    ocioso = rss_total_mb(pids)
+    with AmostradorMemoria(pids) as memoria:
+        erros = await usar_apps(servidores, roteiros, args)
+    await asyncio.sleep(args.espera)
+    resultado = {
+        "implantacao": nome,
+        "processos": len(pids),
+        "rss_ocioso_mb": ocioso,
+        "rss_pico_mb": memoria.pico,
+        "rss_final_mb": rss_total_mb(pids),
+        "erros": erros,
+    }
+    if len(pids) > 1:
+        resultado["rss_final_por_app_mb"] = {app: rss_mb(pid) for app, pid in zip(servidores, pids)}
+    return resultado
+
+
+def encerrar(processos):
+    for processo in processos:
+        processo.terminate()
+    for processo in processos:
+        processo.wait()
+
+
+async def executar(args):
+    paginas = paginas_consolidadas()
+    servidor_paises = ServidorPaises(0, args.paises, 0.0).iniciar()
+    resultados = []
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            roteiros = {app: ROTEIROS[app](args, diretorio) for app in args.apps}
+            ambiente = {"REST_COUNTRIES_URL": servidor_paises.url_api}
+            for ambiente_app, _ in roteiros.values():
+                ambiente.update(ambiente_app)
+
+            # Dez processos, um por exercício
+            processos = []
+            try:
+                servidores = {}
+                for i, app in enumerate(args.apps):
+                    porta = args.porta + 1 + i
+                    processos.append(iniciar_servidor(os.path.join(app, "app.py"), porta, diretorio, ambiente))
+                    servidores[app] = (f"http://127.0.0.1:{porta}", None)
+                resultados.append(await medir("separados", processos, servidores, roteiros, args))
+            finally:
+                encerrar(processos)
+
+            # Um processo com os exercícios como páginas
+            processo = iniciar_servidor("app.py", args.porta, diretorio, ambiente)
+            try:
+                url_base = f"http://127.0.0.1:{args.porta}"
+                servidores = {app: (url_base, paginas[app]) for app in args.apps}
+                resultados.append(await medir("consolidado", [processo], servidores, roteiros, args))
+            finally:
+                encerrar([processo])
+    finally:
+        servidor_paises.shutdown()
+
+    print(f"{'implantação':<14}{'processos':>10}{'ocioso':>10}{'pico':>10}{'final':>10}  (RSS total, MB)")
+    for resultado in resultados:
+        print(
+            f"{resultado['implantacao']:<14}{resultado['processos']:>10}{resultado['rss_ocioso_mb']:>10.0f}"
+            f"{resultado['rss_pico_mb']:>10.0f}{resultado['rss_final_mb']:>10.0f}"
+        )
+        for app, erro in resultado["erros"].items():
+            print(f"    {app}: {erro}")
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "tamanho": args.tamanho,
+        "apps": args.apps,
+        "resultados": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=sorted(ROTEIROS, key=lambda app: int(app[len("exerc"):])))
+    parser.add_argument("--sessoes-por-app", type=int, default=1)
+    parser.add_argument("--ciclos", type=int, default=1, help="repetições do roteiro por sessão")
+    parser.add_argument("--tamanho", type=int, default=100_000, help="linhas dos dados sintéticos")
+    parser.add_argument("--paises", type=int, default=250, help="países da API simulada (exerc10)")
+    parser.add_argument("--porta", type=int, default=8600, help="porta do app consolidado; os separados usam as seguintes")
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de cada interação (s)")
+    parser.add_argument("--espera", type=float, default=2.0, help="pausa antes da medição final (s)")
+    parser.add_argument("--saida", default=os.path.join(RAIZ, "benchmarks", "resultados", "memoria_consolidada.json"))
+    args = parser.parse_args()
+
+    resultado = asyncio.run(executar(args))
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, "w") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Benchmark de reexecuções (reruns) dos dez aplicativos, sem navegador.
+
+Cada aplicativo é executado com o AppTest do Streamlit (a mesma versão
+fixada nos aplicativos, ver benchmarks/requirements.txt) e passa por um
+roteiro de interações com widgets sobre dados sintéticos de tamanho
+crescente. Para cada passo são medidos o tempo da reexecução, os bytes
+das mensagens enviadas ao navegador (ForwardMsg serializadas) e a memória
+do processo; cada combinação aplicativo × tamanho roda num processo
+separado, então o pico de memória (ru_maxrss) é só daquele cenário.
+
+O AppTest não simula upload de arquivos: nos aplicativos que dependem de
+upload, st.file_uploader é substituído por uma função que devolve o
+arquivo sintético. Os demais dados chegam pelas variáveis de ambiente que
+os aplicativos já leem (CATALOGO_FILMES, DADOS_TREINO_NOTAS,
+SNAPSHOT_PAISES) ou pelo session_state.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/reexecucoes.py [--apps exerc7 exerc8] [--tamanhos 1000 100000]
+    python benchmarks/reexecucoes.py --comparar benchmarks/resultados/reexecucoes_anterior.json
+
+O resultado vai para benchmarks/resultados/reexecucoes.json.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = [f"exerc{i}" for i in range(1, 11)]
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# Tamanho máximo de cada aplicativo; None = não usa dados de entrada
+# (roda uma vez só, sem variar o tamanho)
+MAXIMOS = {
+    "exerc1": 10_000_000,
+    "exerc2": 10_000_000,
+    "exerc3": None,
+    "exerc4": None,
+    "exerc5": None,
+    "exerc6": 1_000_000,
+    "exerc7": 10_000_000,
+    "exerc8": 10_000_000,
+    "exerc9": 1_000_000,
+    "exerc10": 100_000,
+}
+
+
+# --- Roteiros (executados no processo filho) --------------------------------
+
+def _enviar_arquivo(caminho):
+    """Faz st.file_uploader devolver o arquivo em toda reexecução, como um UploadedFile"""
+    import streamlit as st
+
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+
+    def file_uploader(*args, **kwargs):
+        enviado = io.BytesIO(conteudo)
+        enviado.file_id = caminho
+        enviado.name = os.path.basename(caminho)
+        enviado.size = len(conteudo)
+        return enviado
+
+    st.file_uploader = file_uploader
+
+
+def _botao(at, rotulo):
+    return next(botao for botao in at.button if botao.label == rotulo)
+
+
+def roteiro_exerc1(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    _enviar_arquivo(dados_sinteticos.csv_generico(tamanho))
+    return [
+        ("carga", lambda at: None),
+        ("trocar coluna", lambda at: at.selectbox[0].set_value("preco")),
+    ]
+
+
+def roteiro_exerc2(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    ambiente["DADOS_PRODUTOS"] = dados_sinteticos.csv_produtos(tamanho)
+    return [
+        ("carga", lambda at: None),
+        ("filtrar cidades", lambda at: at.multiselect[0].set_value(dados_sinteticos.CIDADES[:3])),
+        ("faixa de preço", lambda at: at.slider[0].set_range(1_000, 5_000)),
+    ]
+
+
+def roteiro_exerc3(at, tamanho, ambiente):
+    return [
+        ("carga", lambda at: None),
+        ("taxa de juros", lambda at: at.slider[0].set_value(8.0)),
+        ("período", lambda at: at.selectbox[0].set_value(30)),
+    ]
+
+
+def roteiro_exerc4(at, tamanho, ambiente):
+    return [
+        ("carga", lambda at: None),
+        ("filtrar cidade", lambda at: at.selectbox[0].set_value(at.selectbox[0].options[1])),
+    ]
+
+
+def roteiro_exerc5(at, tamanho, ambiente):
+    def preencher(at):
+        at.text_input[0].input("Maria da Silva")
+        at.number_input[0].set_value(30)
+        at.multiselect[0].set_value(["Azul", "Verde"])
+        _botao(at, "Enviar").click()
+
+    return [
+        ("carga", lambda at: None),
+        ("enviar formulário", preencher),
+    ]
+
+
+def roteiro_exerc6(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    texto = dados_sinteticos.texto(tamanho)
+    return [
+        ("carga", lambda at: None),
+        ("digitar texto", lambda at: at.text_area[0].input(texto)),
+    ]
+
+
+def roteiro_exerc7(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    ambiente["CATALOGO_FILMES"] = dados_sinteticos.csv_filmes(tamanho)
+
+    def gerar(at):
+        at.checkbox[0].check()
+        at.checkbox[1].check()
+        _botao(at, "Gerar Recomendações").click()
+
+    return [
+        ("carga", lambda at: None),
+        ("gerar recomendações", gerar),
+        ("semelhantes a um título", lambda at: at.radio[0].set_value("Semelhantes a um título")),
+        ("buscar título", lambda at: at.text_input[0].input("Filme 12")),
+    ]
+
+
+def roteiro_exerc8(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    caminho = dados_sinteticos.csv_notas(tamanho)
+    ambiente["DADOS_TREINO_NOTAS"] = caminho
+    _enviar_arquivo(caminho)
+    return [
+        ("carga", lambda at: None),
+        ("horas de estudo", lambda at: at.slider[0].set_value(8.0)),
+        ("agregação em voxels", lambda at: at.radio[0].set_value("Agregação em voxels")),
+        ("previsão em lote", lambda at: _botao(at, "Calcular Previsões em Lote").click()),
+    ]
+
+
+def roteiro_exerc9(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    # Os dados chegam pelo envio de arquivo; o app os guarda em comum.memoria_sessoes
+    _enviar_arquivo(dados_sinteticos.csv_generico(tamanho))
+    return [
+        ("carga", lambda at: None),
+        ("análise estatística", lambda at: at.sidebar.radio[0].set_value("Análise Estatística")),
+        ("gráficos interativos", lambda at: at.sidebar.radio[0].set_value("Gráficos Interativos")),
+        ("gráfico de barras", lambda at: at.selectbox[0].set_value("Gráfico de Barras")),
+        ("agrupar valores", lambda at: at.checkbox[0].check()),
+    ]
+
+
+def roteiro_exerc10(at, tamanho, ambiente):
+    import dados_sinteticos
+
+    # Cópia do snapshot: o app pode regravá-lo ao tentar atualizar
+    shutil.copyfile(dados_sinteticos.snapshot_paises(tamanho), "paises.json.gz")
+    ambiente["SNAPSHOT_PAISES"] = os.path.abspath("paises.json.gz")
+
+    def buscar(at):
+        at.selectbox[0].set_value("País 1")
+        _botao(at, "Buscar Informações").click()
+
+    return [
+        ("carga", lambda at: None),
+        ("buscar país", buscar),
+        ("fronteiras cruzadas", lambda at: at.slider[0].set_value(3)),
+    ]
+
+
+ROTEIROS = {f"exerc{i}": globals()[f"roteiro_exerc{i}"] for i in range(1, 11)}
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for linha in status:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def executar_filho(app, tamanho, repeticoes, timeout, caminho_saida):
+    """Roda o roteiro de um aplicativo num tamanho e grava as medições em JSON"""
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+    from streamlit.testing.v1 import AppTest
+
+    # Conta os bytes de toda mensagem que seria enviada ao navegador
+    contador = {"bytes": 0}
+    enfileirar = ForwardMsgQueue.enqueue
+
+    def enfileirar_contando(self, msg):
+        contador["bytes"] += msg.ByteSize()
+        return enfileirar(self, msg)
+
+    ForwardMsgQueue.enqueue = enfileirar_contando
+
+    at = AppTest.from_file(os.path.join(RAIZ, app, "app.py"), default_timeout=timeout)
+    ambiente = {}
+    passos = ROTEIROS[app](at, tamanho, ambiente)
+    os.environ.update(ambiente)
+
+    def medir(nome, acao):
+        inicio_bytes = contador["bytes"]
+        erro = None
+        inicio = time.perf_counter()
+        try:
+            acao(at)
+            at.run()
+            excecoes = [str(excecao.value) for excecao in at.exception]
+            if excecoes:
+                erro = excecoes[0]
+        except Exception as e:
+            erro = repr(e)
+        return {
+            "passo": nome,
+            "segundos": time.perf_counter() - inicio,
+            "bytes": contador["bytes"] - inicio_bytes,
+            "rss_mb": _rss_mb(),
+            "erro": erro,
+        }
+
+    resultados = [medir(nome, acao) for nome, acao in passos]
+
+    # Reexecuções sem nenhuma mudança: o custo de base de cada interação
+    repetidas = [medir("reexecução sem mudanças", lambda at: None) for _ in range(repeticoes)]
+    resultados.append({
+        "passo": "reexecução sem mudanças",
+        "segundos": statistics.median(r["segundos"] for r in repetidas),
+        "segundos_max": max(r["segundos"] for r in repetidas),
+        "bytes": statistics.median(r["bytes"] for r in repetidas),
+        "rss_mb": repetidas[-1]["rss_mb"],
+        "erro": next((r["erro"] for r in repetidas if r["erro"]), None),
+    })
+
+    with open(caminho_saida, "w") as arquivo:
+        json.dump({
+            "passos": resultados,
+            # ru_maxrss vem em KB no Linux
+            "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }, arquivo, ensure_ascii=False)
+
+
+# --- Processo principal ------------------------------------------------------
+
+def executar_cenario(app, tamanho, args):
+    """Roda um cenário num processo novo, dentro de um diretório temporário"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_saida = os.path.join(diretorio, "resultado.json")
+        ambiente = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([os.path.join(RAIZ, app), RAIZ, os.path.dirname(os.path.abspath(__file__))]),
+            ARTEFATOS_MODELO_NOTAS=os.path.join(diretorio, "artefatos"),
+            # Cache em disco vazio a cada medição, sem herdar cargas anteriores
+            DADOS_CACHE_DIR=os.path.join(diretorio, "cache_dados"),
+            MEMORIA_SESSOES_DIR=os.path.join(diretorio, "sessoes"),
+            REST_COUNTRIES_URL="http://127.0.0.1:9/v3.1",
+        )
+        comando = [sys.executable, os.path.abspath(__file__), "--filho", app, str(tamanho or 0),
+                   "--repeticoes", str(args.repeticoes), "--timeout", str(args.timeout), "--saida", caminho_saida]
+        inicio = time.perf_counter()
+        try:
+            processo = subprocess.run(comando, cwd=diretorio, env=ambiente, capture_output=True, text=True,
+                                      timeout=args.timeout * 4)
+        except subprocess.TimeoutExpired:
+            return {"erro": f"tempo esgotado ({args.timeout * 4:.0f} s)"}
+        if processo.returncode != 0 or not os.path.exists(caminho_saida):
+            ultima_linha = (processo.stderr.strip().splitlines() or [""])[-1]
+            return {"erro": f"processo encerrado com código {processo.returncode}: {ultima_linha}"}
+        with open(caminho_saida) as arquivo:
+            resultado = json.load(arquivo)
+        resultado["segundos_total"] = time.perf_counter() - inicio
+        return resultado
+
+
+def comparar(resultados, caminho_anterior, limite=0.2):
+    """Mostra os passos que ficaram mais lentos ou mais pesados que na execução anterior"""
+    with open(caminho_anterior) as arquivo:
+        anteriores = json.load(arquivo)["resultados"]
+    print(f"\nComparação com {caminho_anterior} (variação acima de {limite:.0%}):")
+    encontrou = False
+    for app, por_tamanho in resultados.items():
+        for tamanho, atual in por_tamanho.items():
+            anterior = anteriores.get(app, {}).get(tamanho)
+            if not anterior or "passos" not in atual or "passos" not in anterior:
+                continue
+            passos_anteriores = {p["passo"]: p for p in anterior["passos"]}
+            for passo in atual["passos"]:
+                antigo = passos_anteriores.get(passo["passo"])
+                if antigo is None:
+                    continue
+                for medida in ("segundos", "bytes"):
+                    if antigo[medida] and passo[medida] > antigo[medida] * (1 + limite):
+                        encontrou = True
+                        print(f"  {app} [{tamanho}] {passo['passo']}: {medida} "
+                              f"{antigo[medida]:.4g} -> {passo[medida]:.4g} (+{passo[medida] / antigo[medida] - 1:.0%})")
+    if not encontrou:
+        print("  nenhuma regressão encontrada")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=TAMANHOS)
+    parser.add_argument("--repeticoes", type=int, default=5, help="reexecuções sem mudanças ao fim do roteiro")
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de cada reexecução (s)")
+    parser.add_argument("--saida", default=os.path.join(RAIZ, "benchmarks", "resultados", "reexecucoes.json"))
+    parser.add_argument("--comparar", help="resultado anterior para procurar regressões")
+    parser.add_argument("--filho", nargs=2, metavar=("APP", "TAMANHO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        app, tamanho = args.filho
+        executar_filho(app, int(tamanho), args.repeticoes, args.timeout, args.saida)
+        return
+
+    try:
+        import streamlit
+        from streamlit.testing.v1 import AppTest  # noqa: F401
+    except ImportError:
+        sys.exit("O benchmark precisa do AppTest do Streamlit: pip install -r benchmarks/requirements.txt")
+
+    resultados = {}
+    for app in args.apps:
+        maximo = MAXIMOS[app]
+        tamanhos = [None] if maximo is None else [t for t in args.tamanhos if t <= maximo]
+        resultados[app] = {}
+        for tamanho in tamanhos:
+            resultado = executar_cenario(app, tamanho, args)
+            resultados[app][str(tamanho or 0)] = resultado
+            rotulo = f"{app} [{tamanho:,}]".replace(",", ".") if tamanho else app
+            if "passos" not in resultado:
+                print(f"{rotulo:24s} ERRO: {resultado['erro']}")
+                continue
+            resumo = "  ".join(
+                f"{p['passo']}={p['segundos'] * 1000:.0f}ms/{p['bytes'] / 1024:.0f}KB" + ("!" if p["erro"] else "")
+                for p in resultado["passos"]
+            )
+            print(f"{rotulo:24s} pico {resultado['pico_rss_mb']:7.1f} MB  {resumo}")
+
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    if args.comparar:
+        comparar(resultados, args.comparar)
+    with open(args.saida, "w") as arquivo:
+        json.dump({
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "streamlit": streamlit.__version__,
+            "repeticoes": args.repeticoes,
+            "resultados": resultados,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.saida} (passos com '!' tiveram erro; detalhes no JSON)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Servidor local que imita a API REST Countries (v3.1) para testes de carga.
+
+Serve /v3.1/all (com ETag e resposta 304 para requisições condicionais),
+/v3.1/name/<nome> e as imagens das bandeiras, a partir de países
+sintéticos. Uma latência artificial pode ser somada a cada resposta para
+simular a API real, e as próximas respostas podem ser trocadas por erros
+(`falhar_proximas`) para exercitar as novas tentativas do cliente.
+
+Uso isolado (o exerc10 aponta para ele com REST_COUNTRIES_URL):
+
+    python benchmarks/servidor_paises.py --porta 8765 --paises 250 --latencia 50
+    REST_COUNTRIES_URL=http://127.0.0.1:8765/v3.1 streamlit run exerc10/app.py
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import dados_sinteticos
+
+
+class ServidorPaises(ThreadingHTTPServer):
+    """Servidor HTTP com os dados sintéticos e contadores de requisições"""
+
+    daemon_threads = True
+
+    def __init__(self, porta, quantidade_paises=250, latencia=0.0):
+        super().__init__(("127.0.0.1", porta), _Requisicao)
+        self.latencia = latencia
+        self.url_base = f"http://127.0.0.1:{self.server_address[1]}"
+
+        paises = dados_sinteticos.paises(quantidade_paises)
+        for pais in paises:
+            pais["flags"]["png"] = f"{self.url_base}/flags/{pais['cca3'].lower()}.png"
+        self.corpo_todos = json.dumps(paises).encode("utf-8")
+        self.etag = f'"{len(self.corpo_todos)}"'
+        self.por_nome = {pais["name"]["common"].casefold(): pais for pais in paises}
+        self.bandeira = _gerar_bandeira()
+
+        self.requisicoes = {}
+        self._falhas = []
+        self._lock = threading.Lock()
+
+    @property
+    def url_api(self):
+        return f"{self.url_base}/v3.1"
+
+    def contar(self, rota):
+        with self._lock:
+            self.requisicoes[rota] = self.requisicoes.get(rota, 0) + 1
+
+    def falhar_proximas(self, quantidade, status=503, retry_after=None):
+        """As próximas `quantidade` requisições (de qualquer rota) respondem `status`"""
+        with self._lock:
+            self._falhas.extend([(status, retry_after)] * quantidade)
+
+    def proxima_falha(self):
+        with self._lock:
+            return self._falhas.pop(0) if self._falhas else None
+
+    def iniciar(self):
+        """Atende as requisições numa thread em segundo plano"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def _gerar_bandeira():
+    from PIL import Image
+
+    saida = io.BytesIO()
+    Image.new("RGB", (640, 400), (0, 120, 60)).save(saida, format="PNG")
+    return saida.getvalue()
+
+
+class _Requisicao(BaseHTTPRequestHandler):
+    def do_GET(self):
+        servidor = self.server
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        caminho = urlsplit(self.path).path
+
+        falha = servidor.proxima_falha()
+        if falha is not None:
+            servidor.contar("falhas")
+            status, retry_after = falha
+            self._responder(status, b"", cabecalhos={"Retry-After": str(retry_after)} if retry_after is not None else None)
+            return
+
+        if caminho == "/v3.1/all":
+            servidor.contar("all")
+            if self.headers.get("If-None-Match") == servidor.etag:
+                self._responder(304, b"")
+            else:
+                self._responder(200, servidor.corpo_todos, "application/json", {"ETag": servidor.etag})
+        elif caminho.startswith("/v3.1/name/"):
+            servidor.contar("name")
+            pais = servidor.por_nome.get(unquote(caminho[len("/v3.1/name/"):]).casefold())
+            if pais is None:
+                self._responder(404, b'{"status": 404, "message": "Not Found"}', "application/json")
+            else:
+                self._responder(200, json.dumps([pais]).encode("utf-8"), "application/json")
+        elif caminho.startswith("/flags/"):
+            servidor.contar("flags")
+            self._responder(200, servidor.bandeira, "image/png")
+        else:
+            self._responder(404, b"")
+
+    def _responder(self, status, corpo, tipo=None, cabecalhos=None):
+        self.send_response(status)
+        if tipo:
+            self.send_header("Content-Type", tipo)
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--paises", type=int, default=250)
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso de cada resposta (ms)")
+    args = parser.parse_args()
+
+    servidor = ServidorPaises(args.porta, args.paises, args.latencia / 1000)
+    print(f"API de países simulada em {servidor.url_api}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Mede o tempo de inicialização a frio e a memória (RSS) de cada aplicativo,
+com e sem a importação tardia de bibliotecas pesadas.
+
+Cada medição roda o app.py num processo Python novo, em modo "bare"
+(sem servidor Streamlit): o script é executado uma vez de cima a baixo,
+como na primeira execução de uma sessão. O modo é escolhido pela variável
+IMPORTACAO_TARDIA (0 = importa tudo no início, 1 = importa no primeiro uso).
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/tempo_importacao.py [--repeticoes 5] [--apps exerc1 exerc6]
+
+O resultado vai para benchmarks/resultados/tempo_importacao.json.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = [f"exerc{i}" for i in range(1, 11)]
+MODULOS_PESADOS = ["plotly.express", "plotly.graph_objects", "sklearn", "matplotlib", "wordcloud", "joblib"]
+
+# Executado dentro do processo filho: roda o app e informa tempo, RSS e
+# quais módulos pesados acabaram carregados.
+CODIGO_FILHO = """
+import json, resource, runpy, sys, time, warnings
+inicio = time.perf_counter()
+warnings.simplefilter("ignore")
+try:
+    runpy.run_path("app.py", run_name="__main__")
+    erro = None
+except BaseException as e:
+    erro = repr(e)
+segundos = time.perf_counter() - inicio
+rss_kb = None
+try:
+    with open("/proc/self/status") as status:
+        for linha in status:
+            if linha.startswith("VmRSS:"):
+                rss_kb = int(linha.split()[1])
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(sys.argv[1], "w") as saida:
+    json.dump({
+        "segundos_script": segundos,
+        "rss_mb": rss_kb / 1024 if rss_kb else None,
+        "modulos_carregados": [m for m in MODULOS if m in sys.modules],
+        "erro": erro,
+    }, saida)
+"""
+
+
+def medir(app, tardia, ambiente_base):
+    """Uma execução a frio do app num processo novo"""
+    diretorio_app = os.path.join(RAIZ, app)
+    ambiente = dict(ambiente_base, IMPORTACAO_TARDIA="1" if tardia else "0")
+    ambiente["PYTHONPATH"] = os.pathsep.join([diretorio_app, RAIZ])
+
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temporario:
+        caminho_saida = temporario.name
+    codigo = f"MODULOS = {MODULOS_PESADOS!r}\n{CODIGO_FILHO}"
+    try:
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", codigo, caminho_saida],
+            cwd=diretorio_app, env=ambiente,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+        )
+        total = time.perf_counter() - inicio
+        with open(caminho_saida) as arquivo:
+            medicao = json.load(arquivo)
+    finally:
+        os.unlink(caminho_saida)
+
+    medicao["segundos_total"] = total
+    return medicao
+
+
+def resumir(medicoes):
+    """Mediana das repetições (a primeira é descartada quando há mais de uma)"""
+    if len(medicoes) > 1:
+        medicoes = medicoes[1:]
+    return {
+        "segundos_total": statistics.median(m["segundos_total"] for m in medicoes),
+        "segundos_script": statistics.median(m["segundos_script"] for m in medicoes),
+        "rss_mb": statistics.median(m["rss_mb"] for m in medicoes if m["rss_mb"] is not None),
+        "modulos_carregados": medicoes[-1]["modulos_carregados"],
+        "erro": medicoes[-1]["erro"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--saida", default=os.path.join(RAIZ, "benchmarks", "resultados", "tempo_importacao.json"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio_temp:
+        # Artefatos e snapshots em diretório temporário; a API de países
+        # aponta para um endereço sem servidor para não depender da rede.
+        ambiente = dict(
+            os.environ,
+            ARTEFATOS_MODELO_NOTAS=os.path.join(diretorio_temp, "artefatos"),
+            SNAPSHOT_PAISES=os.path.join(diretorio_temp, "paises.json.gz"),
+            REST_COUNTRIES_URL=os.environ.get("REST_COUNTRIES_URL", "http://127.0.0.1:9/v3.1"),
+        )
+
+        resultados = {}
+        for app in args.apps:
+            resultados[app] = {}
+            for tardia in (False, True):
+                medicoes = [medir(app, tardia, ambiente) for _ in range(args.repeticoes)]
+                resultados[app]["tardia" if tardia else "imediata"] = resumir(medicoes)
+
+            antes, depois = resultados[app]["imediata"], resultados[app]["tardia"]
+            print(
+                f"{app:8s}  inicialização {antes['segundos_total']:6.2f}s -> {depois['segundos_total']:6.2f}s"
+                f"   RSS {antes['rss_mb']:6.1f} MB -> {depois['rss_mb']:6.1f} MB"
+                + (f"   (erro: {depois['erro']})" if depois["erro"] else "")
+            )
+
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, "w") as arquivo:
+        json.dump({
+            "python": sys.version.split()[0],
+            "repeticoes": args.repeticoes,
+            "resultados": resultados,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Verificação do cliente HTTP do exerc10 contra a API de países simulada.
+
+Sobe o servidor de benchmarks/servidor_paises.py numa porta livre e
+confere:
+- revalidação: a segunda atualização do snapshot envia If-None-Match,
+  recebe 304 e mantém os dados sem baixá-los de novo;
+- novas tentativas: respostas 503 são repetidas até dar certo, e um
+  Retry-After longo é limitado pela espera máxima do cliente;
+- agrupamento: várias threads pedindo a mesma URL ao mesmo tempo geram
+  uma requisição só e recebem a mesma resposta;
+- erros agrupados: se a requisição líder falhar, inclusive por uma
+  interrupção que não é Exception, as que esperavam recebem o erro em
+  vez de ficarem presas.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/verificacao_cliente_http.py
+
+O código de saída é 1 se alguma verificação falhar.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from servidor_paises import ServidorPaises
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "exerc10"))
+
+from cliente_http import ClienteHTTP  # noqa: E402
+from snapshot_paises import SnapshotPaises  # noqa: E402
+
+
+def verificar_revalidacao(servidor, diretorio):
+    cliente = ClienteHTTP(timeout=(1, 5))
+    snapshot = SnapshotPaises(cliente, f"{servidor.url_api}/all", os.path.join(diretorio, "paises.json.gz"))
+    antes = servidor.requisicoes.get("all", 0)
+    baixou_primeira = snapshot.atualizar()
+    versao = snapshot.versao
+    baixou_segunda = snapshot.atualizar()
+
+    falhas = []
+    if not baixou_primeira or snapshot.paises is None:
+        falhas.append("a primeira atualização não baixou a lista")
+    if baixou_segunda or snapshot.versao != versao:
+        falhas.append("a segunda atualização baixou a lista de novo em vez de receber 304")
+    if servidor.requisicoes.get("all", 0) - antes != 2:
+        falhas.append(f"{servidor.requisicoes.get('all', 0) - antes} requisições a /all (esperadas 2)")
+    return falhas
+
+
+def verificar_novas_tentativas(servidor):
+    cliente = ClienteHTTP(timeout=(1, 5), tentativas=3, fator_espera=0.01, espera_maxima=0.2)
+    url = f"{servidor.url_api}/name/{next(iter(servidor.por_nome))}"
+    falhas_antes = servidor.requisicoes.get("falhas", 0)
+    # O Retry-After pede 30 s; o cliente deve esperar só a espera máxima
+    servidor.falhar_proximas(2, status=503, retry_after=30)
+    inicio = time.perf_counter()
+    response = cliente.get(url)
+    duracao = time.perf_counter() - inicio
+
+    falhas = []
+    if response.status_code != 200:
+        falhas.append(f"resposta final {response.status_code} depois das novas tentativas (esperada 200)")
+    if servidor.requisicoes.get("falhas", 0) - falhas_antes != 2:
+        falhas.append("o cliente não repetiu as duas respostas 503")
+    if duracao > 2:
+        falhas.append(f"as novas tentativas levaram {duracao:.1f} s: o Retry-After não foi limitado")
+
+    # Mais falhas que tentativas: o erro chega a quem chamou
+    servidor.falhar_proximas(4, status=503)
+    response = cliente.get(url)
+    if response.status_code != 503:
+        falhas.append(f"com as tentativas esgotadas veio {response.status_code} (esperado 503)")
+    return falhas
+
+
+def _em_paralelo(funcao, quantidade):
+    """Chama `funcao` em `quantidade` threads liberadas juntas; devolve resultados ou exceções"""
+    barreira = threading.Barrier(quantidade)
+    resultados = [None] * quantidade
+
+    def executar(i):
+        barreira.wait()
+        try:
+            resultados[i] = funcao()
+        except BaseException as e:
+            resultados[i] = e
+
+    threads = [threading.Thread(target=executar, args=(i,), daemon=True) for i in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    presas = sum(thread.is_alive() for thread in threads)
+    return resultados, presas
+
+
+def verificar_agrupamento(servidor):
+    cliente = ClienteHTTP(timeout=(1, 5))
+    url = f"{servidor.url_base}/flags/bra.png"
+    antes = servidor.requisicoes.get("flags", 0)
+    servidor.latencia = 0.3
+    try:
+        resultados, presas = _em_paralelo(lambda: cliente.get(url), 10)
+    finally:
+        servidor.latencia = 0.0
+
+    falhas = []
+    if presas:
+        falhas.append(f"{presas} threads não terminaram")
+    respostas = [r for r in resultados if isinstance(r, requests.Response)]
+    if len(respostas) != 10:
+        falhas.append(f"{10 - len(respostas)} chamadas falharam: {[r for r in resultados if r not in respostas][:1]}")
+    elif len({id(r) for r in respostas}) != 1:
+        falhas.append("as chamadas agrupadas não receberam a mesma resposta")
+    feitas = servidor.requisicoes.get("flags", 0) - antes
+    if feitas != 1 or cliente.agrupadas != 9:
+        falhas.append(f"{feitas} requisições ao servidor e {cliente.agrupadas} agrupadas (esperadas 1 e 9)")
+    return falhas
+
+
+class _Interrupcao(BaseException):
+    """Interrupção que não é Exception, como a de uma thread sendo encerrada"""
+
+
+def verificar_erros_agrupados(servidor):
+    falhas = []
+    url = f"{servidor.url_base}/flags/arg.png"
+    for nome, erro in (("Exception", requests.exceptions.ConnectionError("recusada")), ("BaseException", _Interrupcao())):
+        cliente = ClienteHTTP(timeout=(1, 5))
+        get_original = cliente._sessao.get
+
+        # A líder espera as outras chegarem e então falha
+        def get_com_falha(*args, **kwargs):
+            time.sleep(0.3)
+            raise erro
+
+        cliente._sessao.get = get_com_falha
+        resultados, presas = _em_paralelo(lambda: cliente.get(url), 5)
+        cliente._sessao.get = get_original
+
+        if presas:
+            falhas.append(f"{nome} na líder: {presas} threads ficaram presas esperando")
+            continue
+        erros_requisicao = sum(isinstance(r, requests.exceptions.RequestException) for r in resultados)
+        # A própria líder repassa a interrupção; as demais recebem um erro de requisição
+        esperados = 5 if nome == "Exception" else 4
+        if erros_requisicao != esperados:
+            falhas.append(f"{nome} na líder: {erros_requisicao} erros de requisição (esperados {esperados})")
+    return falhas
+
+
+def main():
+    verificacoes = [
+        ("revalidação com 304", verificar_revalidacao),
+        ("novas tentativas e Retry-After", verificar_novas_tentativas),
+        ("agrupamento de chamadas iguais", verificar_agrupamento),
+        ("erros da requisição agrupada", verificar_erros_agrupados),
+    ]
+    servidor = ServidorPaises(0, quantidade_paises=20).iniciar()
+    falhou = False
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, verificar in verificacoes:
+            argumentos = (servidor, diretorio) if verificar is verificar_revalidacao else (servidor,)
+            falhas = verificar(*argumentos)
+            if falhas:
+                falhou = True
+                for falha in falhas:
+                    print(f"FALHOU ({nome}): {falha}")
+            else:
+                print(f"OK: {nome}")
+    servidor.shutdown()
+    if falhou:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
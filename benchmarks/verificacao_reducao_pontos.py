@@ -0,0 +1,67 @@
+"""
+Verificação da amostragem estratificada do exerc8 (reducao_pontos).
+
+Confere, em nuvens de pontos sintéticas de vários tamanhos e formatos,
+que a amostra tem exatamente o orçamento pedido, inclusive orçamentos
+pequenos (onde o arredondamento das cotas de cada voxel deixava a
+amostra menor), sem linhas repetidas e com todas as linhas se o
+orçamento for maior que a tabela.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/verificacao_reducao_pontos.py
+
+O código de saída é 1 se alguma verificação falhar.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "exerc8"))
+
+from reducao_pontos import amostragem_estratificada  # noqa: E402
+
+COLUNAS = ["horas_estudo", "nota_anterior"]
+
+
+def nuvem(tamanho, formato, semente):
+    """Pontos uniformes, concentrados em poucos aglomerados ou com caudas longas"""
+    gerador = np.random.default_rng(semente)
+    if formato == "uniforme":
+        pontos = gerador.uniform(0, 10, (tamanho, 2))
+    elif formato == "aglomerados":
+        centros = gerador.uniform(0, 10, (3, 2))
+        pontos = centros[gerador.integers(0, 3, tamanho)] + gerador.normal(0, 0.1, (tamanho, 2))
+    else:
+        pontos = gerador.standard_cauchy((tamanho, 2))
+    return pd.DataFrame(pontos, columns=COLUNAS)
+
+
+def main():
+    falhas = []
+    casos = 0
+    for tamanho in (50, 1_000, 20_000):
+        for formato in ("uniforme", "aglomerados", "caudas"):
+            df = nuvem(tamanho, formato, semente=tamanho)
+            for orcamento in (1, 2, 3, 5, 10, 17, 64, 100, 999, 5_000, 30_000):
+                casos += 1
+                amostra = amostragem_estratificada(df, COLUNAS, orcamento)
+                esperado = min(orcamento, tamanho)
+                if len(amostra) != esperado:
+                    falhas.append(f"{formato}, {tamanho} pontos, orçamento {orcamento}: "
+                                  f"{len(amostra)} linhas (esperadas {esperado})")
+                if not amostra.index.is_unique:
+                    falhas.append(f"{formato}, {tamanho} pontos, orçamento {orcamento}: linhas repetidas")
+
+    for falha in falhas:
+        print(f"FALHOU: {falha}")
+    if falhas:
+        sys.exit(1)
+    print(f"OK: {casos} amostras com exatamente o orçamento pedido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Código compartilhado pelos aplicativos dos exercícios."""
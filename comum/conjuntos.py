@@ -0,0 +1,354 @@
+import hashlib
+import io
+import itertools
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Limites do cache de conjuntos de dados, iguais para todos os apps
+MEMORIA_MAX_MB = float(os.environ.get("DADOS_CACHE_MEMORIA_MB", "512"))
+DISCO_MAX_MB = float(os.environ.get("DADOS_CACHE_DISCO_MB", "2048"))
+DIRETORIO_CACHE = os.environ.get("DADOS_CACHE_DIR", os.path.join(RAIZ, ".cache_dados"))
+
+
+class ErroEsquema(ValueError):
+    """Os dados não têm as colunas (ou tipos) que o app espera"""
+
+
+class Esquema:
+    """
+    Colunas esperadas de um conjunto de dados e seus tipos pandas.
+
+    `renomear` traduz nomes alternativos das colunas (por exemplo, um CSV
+    em inglês) para os nomes usados pelo app; colunas que não estão no
+    esquema são mantidas como vieram.
+    """
+
+    def __init__(self, colunas, renomear=None):
+        self.colunas = dict(colunas)
+        self.renomear = dict(renomear or {})
+
+    def aplicar(self, df):
+        df = df.rename(columns=self.renomear)
+        faltando = [coluna for coluna in self.colunas if coluna not in df.columns]
+        if faltando:
+            raise ErroEsquema(f"Colunas ausentes: {', '.join(faltando)}")
+        for coluna, tipo in self.colunas.items():
+            if str(df[coluna].dtype) != tipo:
+                if tipo.startswith("datetime64"):
+                    df[coluna] = pd.to_datetime(df[coluna])
+                else:
+                    df[coluna] = df[coluna].astype(tipo)
+        return df
+
+    def __repr__(self):
+        return f"Esquema({sorted(self.colunas.items())}, {sorted(self.renomear.items())})"
+
+
+def _assinatura_codigo(codigo):
+    """Bytecode de `ler` (e das funções aninhadas), para o cache mudar quando o código muda"""
+    partes = [codigo.co_code]
+    for constante in codigo.co_consts:
+        if isinstance(constante, types.CodeType):
+            partes.append(_assinatura_codigo(constante))
+        else:
+            partes.append(repr(constante).encode("utf-8"))
+    return b"|".join(partes)
+
+
+def impressao_digital(origem):
+    """
+    Identifica a versão de uma origem de dados:
+    - caminho de arquivo: caminho absoluto, data de modificação e tamanho;
+    - arquivo enviado (st.file_uploader) ou bytes: hash do conteúdo;
+    - None (dados gerados pelo próprio app): vazio.
+    """
+    if origem is None:
+        return ""
+    if isinstance(origem, (str, os.PathLike)):
+        info = os.stat(origem)
+        return f"arquivo:{os.path.abspath(origem)}:{info.st_mtime_ns}:{info.st_size}"
+    if hasattr(origem, "getvalue"):
+        origem = origem.getvalue()
+    if isinstance(origem, (bytes, bytearray, memoryview)):
+        return "conteudo:" + hashlib.blake2b(origem, digest_size=16).hexdigest()
+    return f"valor:{origem!r}"
+
+
+# Itens medidos por coleção; o tamanho das coleções maiores é extrapolado
+AMOSTRA_TAMANHO = 100
+
+
+def tamanho_bytes(valor, profundidade=3):
+    """
+    Memória aproximada de um conjunto de dados, sem serializá-lo: a do
+    pandas para DataFrames e Series, nbytes para arrays numpy e, para
+    listas, dicionários e objetos, sys.getsizeof somado ao dos itens (até
+    `profundidade` níveis, extrapolado de uma amostra nas coleções grandes).
+    """
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        if valor.dtype != object:
+            return int(valor.nbytes)
+        tamanho, itens, total = valor.nbytes, valor.flat, valor.size
+    else:
+        tamanho = sys.getsizeof(valor)
+        if isinstance(valor, dict):
+            itens, total = itertools.chain.from_iterable(valor.items()), 2 * len(valor)
+        elif isinstance(valor, (list, tuple, set, frozenset)):
+            itens, total = valor, len(valor)
+        elif hasattr(valor, "__dict__") and not isinstance(valor, type):
+            return tamanho + tamanho_bytes(vars(valor), profundidade)
+        else:
+            return tamanho
+    if profundidade == 0 or total == 0:
+        return int(tamanho)
+    amostra = list(itertools.islice(itens, AMOSTRA_TAMANHO))
+    soma = sum(tamanho_bytes(item, profundidade - 1) for item in amostra)
+    return int(tamanho + soma * total / len(amostra))
+
+
+class CacheDados:
+    """
+    Cache em dois níveis dos conjuntos de dados de um processo.
+
+    O primeiro nível fica em memória, compartilhado por todas as sessões e
+    limitado em bytes (sai o menos usado recentemente). O segundo fica em
+    disco (Parquet para DataFrames, pickle para o resto), sobrevive a
+    reinícios e também é limitado em bytes. Cada carga conta acertos em
+    memória, acertos em disco, leituras da origem e o tempo gasto.
+    """
+
+    def __init__(self, diretorio, memoria_max_bytes, disco_max_bytes):
+        self.diretorio = diretorio
+        self.memoria_max_bytes = memoria_max_bytes
+        self.disco_max_bytes = disco_max_bytes
+        self._memoria = OrderedDict()
+        self._memoria_bytes = 0
+        self._metricas = {}
+        self._lock = threading.Lock()
+        self._locks_chave = {}
+
+    # --- Memória -------------------------------------------------------------
+
+    def _da_memoria(self, chave):
+        with self._lock:
+            entrada = self._memoria.get(chave)
+            if entrada is not None:
+                self._memoria.move_to_end(chave)
+                return entrada[1]
+        return None
+
+    def _para_memoria(self, chave, nome, valor, tamanho):
+        if tamanho > self.memoria_max_bytes:
+            return
+        with self._lock:
+            if chave in self._memoria:
+                return
+            self._memoria[chave] = (nome, valor, tamanho)
+            self._memoria_bytes += tamanho
+            while self._memoria_bytes > self.memoria_max_bytes:
+                _, (_, _, tamanho_antigo) = self._memoria.popitem(last=False)
+                self._memoria_bytes -= tamanho_antigo
+
+    # --- Disco ---------------------------------------------------------------
+
+    def _caminhos(self, chave):
+        base = os.path.join(self.diretorio, chave)
+        return base + ".parquet", base + ".pkl"
+
+    def _do_disco(self, chave):
+        for caminho in self._caminhos(chave):
+            try:
+                if caminho.endswith(".parquet"):
+                    valor = pd.read_parquet(caminho)
+                else:
+                    with open(caminho, "rb") as arquivo:
+                        valor = pickle.load(arquivo)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # Arquivo corrompido ou de outra versão das bibliotecas
+                self._remover(caminho)
+                continue
+            # Data de modificação marca o uso mais recente, para o descarte
+            try:
+                os.utime(caminho)
+            except OSError:
+                pass
+            return valor
+        return None
+
+    def _para_disco(self, chave, valor):
+        os.makedirs(self.diretorio, exist_ok=True)
+        parquet, pkl = self._caminhos(chave)
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                if isinstance(valor, pd.DataFrame):
+                    destino = parquet
+                    valor.to_parquet(arquivo)
+                else:
+                    destino = pkl
+                    pickle.dump(valor, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, destino)
+        except Exception:
+            # Sem o nível em disco (ex.: tipos que o Parquet não aceita), o
+            # conjunto continua em memória
+            self._remover(temporario)
+            return
+        self._descartar_do_disco()
+
+    def _descartar_do_disco(self):
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith((".parquet", ".pkl")):
+                info = entrada.stat()
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.disco_max_bytes:
+                break
+            self._remover(caminho)
+            total -= tamanho
+
+    @staticmethod
+    def _remover(caminho):
+        try:
+            os.unlink(caminho)
+        except OSError:
+            pass
+
+    # --- Carga ---------------------------------------------------------------
+
+    def _contar(self, nome, evento, segundos=0.0):
+        with self._lock:
+            metricas = self._metricas.setdefault(
+                nome, {"memória": 0, "disco": 0, "origem": 0, "segundos_origem": 0.0, "segundos_disco": 0.0}
+            )
+            metricas[evento] += 1
+            if evento in ("origem", "disco"):
+                metricas[f"segundos_{evento}"] += segundos
+
+    def _entrar_na_chave(self, chave):
+        """
+        Lock da chave, contando quem o usa: ele só sai do dicionário quando
+        ninguém mais o segura nem espera por ele, então todos os que pedem a
+        mesma chave ao mesmo tempo usam o mesmo lock.
+        """
+        with self._lock:
+            entrada = self._locks_chave.setdefault(chave, [threading.Lock(), 0])
+            entrada[1] += 1
+            return entrada[0]
+
+    def _sair_da_chave(self, chave):
+        with self._lock:
+            entrada = self._locks_chave[chave]
+            entrada[1] -= 1
+            if entrada[1] == 0:
+                del self._locks_chave[chave]
+
+    def carregar(self, nome, ler, origem=None, esquema=None, parametros=(), disco=True):
+        """
+        Devolve o conjunto `nome`, lido com `ler(origem)` (ou `ler()`, para
+        dados gerados pelo app, sem origem) só quando ainda não está em
+        memória nem em disco para esta versão da origem.
+
+        A chave junta o nome, a impressão digital da origem, o esquema, os
+        parâmetros e o código de `ler`. O valor devolvido é compartilhado
+        entre as sessões: não deve ser modificado no lugar.
+        """
+        partes = [nome, impressao_digital(origem), repr(esquema), repr(parametros)]
+        hash_chave = hashlib.blake2b(digest_size=16)
+        for parte in partes:
+            hash_chave.update(parte.encode("utf-8") + b"\0")
+        codigo = getattr(ler, "__code__", None)
+        hash_chave.update(_assinatura_codigo(codigo) if codigo is not None else repr(ler).encode("utf-8"))
+        chave = f"{nome}-{hash_chave.hexdigest()}"
+
+        valor = self._da_memoria(chave)
+        if valor is not None:
+            self._contar(nome, "memória")
+            return valor
+
+        # Sessões pedindo o mesmo conjunto ao mesmo tempo esperam uma única leitura
+        lock_chave = self._entrar_na_chave(chave)
+        try:
+            with lock_chave:
+                valor = self._da_memoria(chave)
+                if valor is not None:
+                    self._contar(nome, "memória")
+                    return valor
+
+                inicio = time.perf_counter()
+                valor = self._do_disco(chave) if disco else None
+                if valor is not None:
+                    self._contar(nome, "disco", time.perf_counter() - inicio)
+                else:
+                    valor = ler(origem) if origem is not None else ler()
+                    if esquema is not None:
+                        valor = esquema.aplicar(valor)
+                    self._contar(nome, "origem", time.perf_counter() - inicio)
+                    if disco:
+                        self._para_disco(chave, valor)
+                self._para_memoria(chave, nome, valor, tamanho_bytes(valor))
+                return valor
+        finally:
+            self._sair_da_chave(chave)
+
+    def metricas(self):
+        """Tabela com os acertos e o uso de memória de cada conjunto de dados"""
+        with self._lock:
+            em_memoria = {}
+            for nome, _, tamanho in self._memoria.values():
+                em_memoria[nome] = em_memoria.get(nome, 0) + tamanho
+            linhas = [
+                {
+                    "Conjunto": nome,
+                    "Acertos memória": metricas["memória"],
+                    "Acertos disco": metricas["disco"],
+                    "Leituras da origem": metricas["origem"],
+                    "Leitura da origem (ms)": metricas["segundos_origem"] * 1000,
+                    "Leitura do disco (ms)": metricas["segundos_disco"] * 1000,
+                    "Em memória (MB)": em_memoria.get(nome, 0) / 2**20,
+                }
+                for nome, metricas in self._metricas.items()
+            ]
+        return pd.DataFrame(linhas)
+
+
+@st.cache_resource
+def obter_cache():
+    """Cache de conjuntos de dados, um por processo"""
+    return CacheDados(DIRETORIO_CACHE, int(MEMORIA_MAX_MB * 2**20), int(DISCO_MAX_MB * 2**20))
+
+
+def carregar(nome, ler, origem=None, esquema=None, parametros=(), disco=True):
+    """Carrega um conjunto de dados pelo cache do processo (ver CacheDados.carregar)"""
+    return obter_cache().carregar(nome, ler, origem, esquema, parametros, disco)
+
+
+def _ler_csv(origem, opcoes):
+    if hasattr(origem, "getvalue"):
+        origem = io.BytesIO(origem.getvalue())
+    return pd.read_csv(origem, **dict(opcoes))
+
+
+def carregar_csv(nome, origem, esquema=None, disco=True, **opcoes):
+    """Lê um CSV (caminho ou arquivo enviado) pelo cache; `opcoes` vão para pd.read_csv"""
+    opcoes = tuple(sorted(opcoes.items()))
+    return carregar(nome, lambda origem: _ler_csv(origem, opcoes), origem, esquema, opcoes, disco)
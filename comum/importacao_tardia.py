@@ -0,0 +1,48 @@
+import importlib
+import os
+import threading
+
+# Com IMPORTACAO_TARDIA=0 os módulos são importados na hora (útil para
+# comparar o tempo de inicialização com e sem a importação tardia)
+ATIVA = os.environ.get("IMPORTACAO_TARDIA", "1") != "0"
+
+
+class ModuloTardio:
+    """
+    Substituto de um módulo que só é importado no primeiro acesso a um
+    atributo. Depois disso, cada acesso vai direto ao módulo real.
+
+    O carregamento é protegido por lock, então sessões diferentes podem
+    usar o mesmo módulo ao mesmo tempo sem importá-lo duas vezes.
+    """
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    def _carregar(self):
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self):
+        estado = "carregado" if self._modulo is not None else "não carregado"
+        return f"<módulo tardio {self._nome!r} ({estado})>"
+
+
+def importar_tardio(nome):
+    """
+    Retorna o módulo `nome` para ser importado só quando for usado.
+
+    Uso: `px = importar_tardio("plotly.express")` no lugar de
+    `import plotly.express as px`.
+    """
+    if not ATIVA:
+        return importlib.import_module(nome)
+    return ModuloTardio(nome)
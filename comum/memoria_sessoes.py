@@ -0,0 +1,341 @@
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit.logger import get_logger
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from comum.conjuntos import tamanho_bytes
+
+# Limite da memória somada dos dados guardados pelas sessões; acima dele,
+# os dados das sessões usadas há mais tempo vão para o disco
+MEMORIA_MAX_MB = float(os.environ.get("MEMORIA_SESSOES_MAX_MB", "1024"))
+# Sessões sem execução por mais que isso têm os dados levados para o disco
+OCIOSA_APOS_S = float(os.environ.get("MEMORIA_SESSAO_OCIOSA_S", "300"))
+# Cópias em disco de sessões que não voltaram são apagadas depois disso
+EXPIRAR_APOS_S = float(os.environ.get("MEMORIA_SESSAO_EXPIRAR_S", "86400"))
+DIRETORIO_SESSOES = os.environ.get(
+    "MEMORIA_SESSOES_DIR", os.path.join(tempfile.gettempdir(), "sessoes_streamlit")
+)
+
+# Intervalo mínimo entre duas verificações de sessões ociosas
+INTERVALO_VERIFICACAO_S = 5.0
+
+_LOGGER = get_logger(__name__)
+
+
+class _Entrada:
+    """Um valor guardado por uma sessão: em memória, em disco, ou sendo levado para o disco"""
+
+    def __init__(self, valor, tamanho):
+        self.valor = valor
+        self.tamanho = tamanho
+        self.caminho = None
+        self.lock = threading.Lock()
+
+
+class RegistroSessoes:
+    """
+    Dados grandes guardados por cada sessão (DataFrames enviados etc.),
+    com a memória contada por sessão.
+
+    Quando a soma passa de `memoria_max_bytes`, quando uma sessão fica
+    ociosa por `ociosa_apos_s` ou quando ela perde a conexão, os valores
+    dela são gravados em disco e soltos da memória; ao voltar (o Streamlit
+    reconecta uma sessão caída com o mesmo ID), a sessão os lê de novo na
+    primeira vez que pedir. Sessões sem acesso há mais de `expirar_apos_s`
+    perdem os dados e as cópias em disco.
+    """
+
+    def __init__(self, diretorio, memoria_max_bytes, ociosa_apos_s, expirar_apos_s):
+        self.diretorio = diretorio
+        self.memoria_max_bytes = memoria_max_bytes
+        self.ociosa_apos_s = ociosa_apos_s
+        self.expirar_apos_s = expirar_apos_s
+        self._sessoes = {}
+        self._ultimo_acesso = {}
+        self._lock = threading.Lock()
+        self._verificado_em = 0.0
+        self.despejos = 0
+        self.recargas = 0
+        self._apagar_copias_expiradas()
+
+    def herdar(self, anterior):
+        """Assume as sessões de um registro substituído (ex.: cache de recursos limpo)"""
+        with anterior._lock:
+            sessoes, anterior._sessoes = anterior._sessoes, {}
+            acessos, anterior._ultimo_acesso = anterior._ultimo_acesso, {}
+            despejos, recargas = anterior.despejos, anterior.recargas
+        with self._lock:
+            for sessao, entradas in sessoes.items():
+                self._sessoes.setdefault(sessao, {}).update(entradas)
+            self._ultimo_acesso.update(acessos)
+            self.despejos += despejos
+            self.recargas += recargas
+
+    # --- Acesso --------------------------------------------------------------
+
+    def guardar(self, sessao, chave, valor):
+        with self._lock:
+            atual = self._sessoes.get(sessao, {}).get(chave)
+            if atual is not None and atual.valor is valor:
+                # O mesmo objeto guardado de novo a cada execução: nada a medir
+                self._ultimo_acesso[sessao] = time.time()
+                return
+        entrada = _Entrada(valor, tamanho_bytes(valor))
+        with self._lock:
+            antiga = self._sessoes.setdefault(sessao, {}).get(chave)
+            self._sessoes[sessao][chave] = entrada
+            self._ultimo_acesso[sessao] = time.time()
+        if antiga is not None and antiga.caminho:
+            self._apagar(antiga.caminho)
+        self._liberar(sessao)
+
+    def obter(self, sessao, chave, padrao=None):
+        with self._lock:
+            entrada = self._sessoes.get(sessao, {}).get(chave)
+            self._ultimo_acesso[sessao] = time.time()
+        if entrada is None:
+            return padrao
+        with entrada.lock:
+            if entrada.valor is None:
+                entrada.valor = self._ler(entrada.caminho)
+                with self._lock:
+                    self.recargas += 1
+            valor = entrada.valor
+        self._liberar(sessao)
+        return valor
+
+    def remover(self, sessao, chave):
+        with self._lock:
+            entrada = self._sessoes.get(sessao, {}).pop(chave, None)
+        if entrada is not None and entrada.caminho:
+            self._apagar(entrada.caminho)
+
+    # --- Disco ---------------------------------------------------------------
+
+    def _gravar(self, sessao, chave, valor):
+        diretorio = os.path.join(self.diretorio, sessao)
+        os.makedirs(diretorio, exist_ok=True)
+        extensao = ".parquet" if isinstance(valor, pd.DataFrame) else ".pkl"
+        # Nome único por cópia: uma gravação atrasada de um valor já
+        # substituído não sobrescreve a cópia do valor novo
+        descritor, caminho = tempfile.mkstemp(dir=diretorio, prefix=f"{chave}_", suffix=extensao)
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                if extensao == ".parquet":
+                    valor.to_parquet(arquivo)
+                else:
+                    pickle.dump(valor, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            self._apagar(caminho)
+            raise
+        return caminho
+
+    @staticmethod
+    def _ler(caminho):
+        if caminho.endswith(".parquet"):
+            return pd.read_parquet(caminho)
+        with open(caminho, "rb") as arquivo:
+            return pickle.load(arquivo)
+
+    @staticmethod
+    def _apagar(caminho):
+        try:
+            os.unlink(caminho)
+        except OSError:
+            pass
+
+    def _apagar_copias_expiradas(self):
+        """Cópias deixadas por sessões que não voltaram (inclusive de processos anteriores)"""
+        if not os.path.isdir(self.diretorio):
+            return
+        limite = time.time() - self.expirar_apos_s
+        for entrada in os.scandir(self.diretorio):
+            if entrada.is_dir() and entrada.name not in self._sessoes and entrada.stat().st_mtime < limite:
+                shutil.rmtree(entrada.path, ignore_errors=True)
+
+    # --- Despejo -------------------------------------------------------------
+
+    def _despejar(self, sessao, entradas):
+        """Leva para o disco os valores em memória de uma sessão"""
+        for chave, entrada in entradas.items():
+            with entrada.lock:
+                if entrada.valor is None:
+                    continue
+                if entrada.caminho is None:
+                    try:
+                        entrada.caminho = self._gravar(sessao, chave, entrada.valor)
+                    except Exception:
+                        # Sem cópia em disco, o valor continua em memória
+                        continue
+                entrada.valor = None
+                with self._lock:
+                    self.despejos += 1
+
+    def _apagar_todas(self):
+        with self._lock:
+            sessoes = list(self._sessoes)
+        for sessao in sessoes:
+            shutil.rmtree(os.path.join(self.diretorio, sessao), ignore_errors=True)
+
+    def _encerrar(self, sessao):
+        with self._lock:
+            self._sessoes.pop(sessao, None)
+            self._ultimo_acesso.pop(sessao, None)
+        shutil.rmtree(os.path.join(self.diretorio, sessao), ignore_errors=True)
+
+    def _liberar(self, sessao_atual):
+        """
+        Despeja sessões ociosas ou desconectadas, apaga as expiradas e, se
+        a memória passou do limite, despeja as usadas há mais tempo (nunca
+        a sessão atual). As cópias em disco são gravadas fora do lock
+        geral, sem travar as outras sessões.
+        """
+        agora = time.time()
+        runtime = Runtime.instance() if Runtime.exists() else None
+        with self._lock:
+            verificar = agora - self._verificado_em > INTERVALO_VERIFICACAO_S
+            if verificar:
+                self._verificado_em = agora
+            residentes = {
+                sessao: {chave: e for chave, e in entradas.items() if e.valor is not None}
+                for sessao, entradas in self._sessoes.items()
+            }
+            memoria = sum(e.tamanho for entradas in residentes.values() for e in entradas.values())
+            acessos = dict(self._ultimo_acesso)
+        if not verificar and memoria <= self.memoria_max_bytes:
+            return
+
+        if verificar:
+            for sessao in list(acessos):
+                if sessao == sessao_atual:
+                    continue
+                ociosa_ha = agora - acessos[sessao]
+                if ociosa_ha > self.expirar_apos_s:
+                    self._encerrar(sessao)
+                    memoria -= sum(e.tamanho for e in residentes.pop(sessao, {}).values())
+                    acessos.pop(sessao)
+                elif residentes.get(sessao) and (
+                    ociosa_ha > self.ociosa_apos_s
+                    or (runtime is not None and not runtime.is_active_session(sessao))
+                ):
+                    # Sessão ociosa ou desconectada: os dados esperam em disco
+                    # até ela voltar ou expirar
+                    self._despejar(sessao, residentes[sessao])
+                    memoria -= sum(e.tamanho for e in residentes.pop(sessao).values())
+            self._apagar_copias_expiradas()
+
+        for sessao in sorted(acessos, key=acessos.get):
+            if memoria <= self.memoria_max_bytes:
+                break
+            if sessao == sessao_atual or not residentes.get(sessao):
+                continue
+            self._despejar(sessao, residentes[sessao])
+            memoria -= sum(e.tamanho for e in residentes.pop(sessao).values())
+
+    # --- Totais --------------------------------------------------------------
+
+    def resumo(self):
+        """Memória e disco ocupados por sessão, da usada mais recentemente para a mais antiga"""
+        agora = time.time()
+        with self._lock:
+            linhas = []
+            for sessao, entradas in self._sessoes.items():
+                linhas.append({
+                    "Sessão": sessao[:8],
+                    "Em memória (MB)": sum(e.tamanho for e in entradas.values() if e.valor is not None) / 2**20,
+                    "Em disco (MB)": sum(e.tamanho for e in entradas.values() if e.valor is None) / 2**20,
+                    "Ociosa (s)": agora - self._ultimo_acesso.get(sessao, agora),
+                })
+        linhas.sort(key=lambda linha: linha["Ociosa (s)"])
+        return pd.DataFrame(linhas)
+
+    def total_em_memoria(self):
+        with self._lock:
+            return sum(
+                e.tamanho for entradas in self._sessoes.values() for e in entradas.values() if e.valor is not None
+            )
+
+
+# Registro em uso e a única thread de verificação do processo. Sem
+# execuções (ex.: todos os usuários saíram), é ela que despeja sessões
+# ociosas e desconectadas e apaga as expiradas
+_registro_atual = None
+_verificacao = None
+_parar_verificacao = threading.Event()
+_lock_modulo = threading.Lock()
+
+
+def _verificar_periodicamente():
+    while not _parar_verificacao.wait(INTERVALO_VERIFICACAO_S):
+        registro = _registro_atual
+        if registro is None:
+            continue
+        try:
+            registro._liberar(None)
+        except Exception:
+            _LOGGER.exception("Falha ao verificar as sessões ociosas")
+
+
+def _assumir(registro):
+    """Torna `registro` o registro em uso, herdando as sessões do anterior"""
+    global _registro_atual, _verificacao
+    with _lock_modulo:
+        anterior, _registro_atual = _registro_atual, registro
+        if anterior is not None:
+            registro.herdar(anterior)
+        if _verificacao is None:
+            _verificacao = threading.Thread(
+                target=_verificar_periodicamente, name="verificacao_sessoes", daemon=True
+            )
+            _verificacao.start()
+
+
+def _encerrar_processo():
+    # As sessões não sobrevivem ao processo, então as cópias delas também não
+    _parar_verificacao.set()
+    if _verificacao is not None:
+        _verificacao.join(timeout=INTERVALO_VERIFICACAO_S)
+    if _registro_atual is not None:
+        _registro_atual._apagar_todas()
+
+
+atexit.register(_encerrar_processo)
+
+
+@st.cache_resource
+def obter_registro():
+    """Registro das sessões, um por processo"""
+    registro = RegistroSessoes(
+        DIRETORIO_SESSOES, int(MEMORIA_MAX_MB * 2**20), OCIOSA_APOS_S, EXPIRAR_APOS_S
+    )
+    _assumir(registro)
+    return registro
+
+
+def _sessao_atual():
+    ctx = get_script_run_ctx()
+    # Fora do `streamlit run` (ex.: `python app.py`) há uma sessão só
+    return ctx.session_id if ctx is not None else "local"
+
+
+def guardar(chave, valor):
+    """Guarda `valor` para a sessão atual, com a memória contada e limitada"""
+    obter_registro().guardar(_sessao_atual(), chave, valor)
+
+
+def obter(chave, padrao=None):
+    """Valor guardado pela sessão atual (relido do disco se tiver sido despejado)"""
+    return obter_registro().obter(_sessao_atual(), chave, padrao)
+
+
+def remover(chave):
+    obter_registro().remover(_sessao_atual(), chave)
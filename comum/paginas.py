@@ -0,0 +1,55 @@
+import os
+import sys
+
+from comum.perfil import finalizar_execucao_atual
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exercícios montados como páginas do app único (raiz/app.py), na ordem
+# da barra lateral
+EXERCICIOS = {
+    "exerc1": "Dashboard de Análise de Dados com Upload de CSV",
+    "exerc2": "Filtro Dinâmico em Tabela",
+    "exerc3": "Simulador de Investimento",
+    "exerc4": "Mapa Interativo com Dados Geográficos",
+    "exerc5": "Formulário com Validação e Resultados",
+    "exerc6": "Análise de Texto com Processamento em Tempo Real",
+    "exerc7": "Sistema de Recomendação de Filmes",
+    "exerc8": "Aplicativo de Previsão de Notas",
+    "exerc9": "Painel Multi-página",
+    "exerc10": "Explorador de Países",
+}
+
+# Código compilado de cada app, refeito só quando o arquivo muda
+_compilados = {}
+
+
+def _compilar(caminho):
+    modificacao = os.stat(caminho).st_mtime_ns
+    em_cache = _compilados.get(caminho)
+    if em_cache is None or em_cache[0] != modificacao:
+        with open(caminho, encoding="utf-8") as arquivo:
+            codigo = compile(arquivo.read(), caminho, "exec")
+        em_cache = (modificacao, codigo)
+        _compilados[caminho] = em_cache
+    return em_cache[1]
+
+
+def executar_exercicio(nome):
+    """
+    Executa exercN/app.py como a página atual, no mesmo processo dos
+    outros exercícios (bibliotecas e st.cache_resource compartilhados).
+    """
+    diretorio = os.path.join(RAIZ, nome)
+    # Módulos auxiliares do exercício (ex.: exerc8/modelo_notas.py)
+    if diretorio not in sys.path:
+        sys.path.insert(0, diretorio)
+    caminho = os.path.join(diretorio, "app.py")
+    # Um __name__ por exercício separa as chaves de st.cache_data de
+    # funções homônimas em apps diferentes
+    try:
+        exec(_compilar(caminho), {"__name__": f"{nome}_app", "__file__": caminho})
+    finally:
+        # Fecha o perfil da execução mesmo se o app parar no meio
+        # (exceção, st.stop ou rerun), sem deixar o cProfile ligado
+        finalizar_execucao_atual()
@@ -0,0 +1,219 @@
+import cProfile
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import streamlit as st
+
+# numpy, pandas e os módulos de cache só são importados quando o painel é
+# desenhado, para o perfil desligado não pesar na inicialização dos apps
+
+# Ativa o perfil em todas as sessões (PERFIL_STREAMLIT=1) ou só em quem
+# abrir o app com ?perfil=1 na URL
+ATIVO_AMBIENTE = os.environ.get("PERFIL_STREAMLIT", "0") not in ("", "0")
+DIRETORIO_PERFIS = os.environ.get("DIRETORIO_PERFIS", "perfis")
+
+# Quantas execuções recentes entram nos percentis e quantos perfis cProfile
+# das execuções mais lentas ficam guardados em disco
+JANELA = 200
+PERFIS_GUARDADOS = 5
+
+TOTAL = "execução completa"
+
+# Medição em aberto na thread do script, para ser fechada mesmo se a
+# execução for interrompida (exceção, st.stop ou rerun)
+_execucao_atual = threading.local()
+
+
+class EstatisticasPerfil:
+    """
+    Tempos de cada seção nas últimas execuções de um app, compartilhados
+    por todas as sessões do processo.
+    """
+
+    def __init__(self, app, diretorio):
+        self.app = app
+        self.diretorio = diretorio
+        self.tempos = {}
+        self.ultimos = {}
+        self.mais_lentas = []
+        self._lock = threading.Lock()
+
+    def registrar(self, tempos_execucao):
+        with self._lock:
+            for secao, segundos in tempos_execucao.items():
+                self.tempos.setdefault(secao, deque(maxlen=JANELA)).append(segundos)
+            self.ultimos = dict(tempos_execucao)
+
+    def entra_nas_mais_lentas(self, segundos):
+        with self._lock:
+            return len(self.mais_lentas) < PERFIS_GUARDADOS or segundos > self.mais_lentas[-1][0]
+
+    def guardar_perfil(self, segundos, profiler):
+        """Grava o perfil em disco e descarta o que saiu da lista das mais lentas"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        momento = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        caminho = os.path.join(self.diretorio, f"{self.app}_{momento}_{segundos * 1000:.0f}ms.prof")
+        profiler.dump_stats(caminho)
+        with self._lock:
+            self.mais_lentas.append((segundos, caminho))
+            self.mais_lentas.sort(reverse=True)
+            descartadas = self.mais_lentas[PERFIS_GUARDADOS:]
+            del self.mais_lentas[PERFIS_GUARDADOS:]
+        for _, antigo in descartadas:
+            try:
+                os.unlink(antigo)
+            except OSError:
+                pass
+
+    def resumo(self):
+        """Tabela com a última medição e os percentis de cada seção (em ms)"""
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            linhas = [
+                {
+                    "Seção": secao,
+                    "Última (ms)": self.ultimos.get(secao, np.nan) * 1000,
+                    "p50 (ms)": np.percentile(valores, 50) * 1000,
+                    "p95 (ms)": np.percentile(valores, 95) * 1000,
+                    "Execuções": len(valores),
+                }
+                for secao, valores in self.tempos.items()
+            ]
+            perfis = list(self.mais_lentas)
+        return pd.DataFrame(linhas), perfis
+
+
+@st.cache_resource
+def obter_estatisticas(app):
+    """Estatísticas do app, uma por processo"""
+    return EstatisticasPerfil(app, os.path.join(DIRETORIO_PERFIS, app))
+
+
+class PerfilExecucao:
+    """
+    Mede uma execução (rerun) do script.
+
+    `secao(nome)` cronometra um trecho; no fim, `finalizar()` junta os
+    tempos às estatísticas do processo, grava o perfil cProfile se a
+    execução estiver entre as mais lentas e atualiza o painel da barra
+    lateral. Desativado, `secao` não faz nada e o custo é desprezível.
+
+    Também é um context manager (`with iniciar_perfil(app) as perfil:`),
+    que finaliza na saída do bloco mesmo se o script for interrompido.
+    Rodando como página (comum.paginas), o wrapper já garante isso.
+    """
+
+    def __init__(self, app, ativo):
+        self.ativo = ativo
+        if not ativo:
+            return
+        self.estatisticas = obter_estatisticas(app)
+        self.tempos = {}
+        self._painel = st.sidebar.empty()
+        self._desenhar_painel()
+
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # Outro profiler já está ativo nesta thread
+            self._profiler = None
+        self._inicio = time.perf_counter()
+        self._finalizado = False
+        _execucao_atual.perfil = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, excecao, rastreamento):
+        # Interrompida, a execução ainda entra nas estatísticas, mas o
+        # painel não é redesenhado
+        self.finalizar(desenhar_painel=tipo is None)
+        return False
+
+    @contextmanager
+    def _medir(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] = self.tempos.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def secao(self, nome):
+        """Context manager que soma o tempo do trecho à seção `nome`"""
+        return self._medir(nome) if self.ativo else nullcontext()
+
+    def finalizar(self, desenhar_painel=True):
+        """Fecha a medição da execução; chamar no fim do script (ou antes de st.stop)"""
+        if not self.ativo or self._finalizado:
+            return
+        self._finalizado = True
+        total = time.perf_counter() - self._inicio
+        if self._profiler is not None:
+            self._profiler.disable()
+        if getattr(_execucao_atual, "perfil", None) is self:
+            _execucao_atual.perfil = None
+
+        self.tempos[TOTAL] = total
+        self.estatisticas.registrar(self.tempos)
+        if self._profiler is not None and self.estatisticas.entra_nas_mais_lentas(total):
+            self.estatisticas.guardar_perfil(total, self._profiler)
+        if desenhar_painel:
+            self._desenhar_painel()
+
+    def _desenhar_painel(self):
+        from comum.conjuntos import obter_cache as obter_cache_conjuntos
+        from comum.memoria_sessoes import obter_registro as obter_registro_sessoes
+
+        tabela, perfis = self.estatisticas.resumo()
+        with self._painel.container():
+            with st.expander("⏱️ Perfil de execução", expanded=True):
+                if tabela.empty:
+                    st.caption("Nenhuma execução medida ainda.")
+                else:
+                    st.dataframe(tabela.round(1), hide_index=True, use_container_width=True)
+                metricas_conjuntos = obter_cache_conjuntos().metricas()
+                if not metricas_conjuntos.empty:
+                    st.caption("Cache de conjuntos de dados do processo:")
+                    st.dataframe(metricas_conjuntos.round(1), hide_index=True, use_container_width=True)
+                registro = obter_registro_sessoes()
+                sessoes = registro.resumo()
+                if not sessoes.empty:
+                    st.caption(
+                        f"Dados guardados pelas sessões: {registro.total_em_memoria() / 2**20:,.1f} MB em memória "
+                        f"(limite {registro.memoria_max_bytes / 2**20:,.0f} MB), "
+                        f"{registro.despejos} despejos para o disco, {registro.recargas} recargas"
+                    )
+                    st.dataframe(sessoes.round(1), hide_index=True, use_container_width=True)
+                if perfis:
+                    st.caption("Perfis cProfile das execuções mais lentas (abrir com pstats ou snakeviz):")
+                    for segundos, caminho in perfis:
+                        st.caption(f"{segundos * 1000:.0f} ms — `{caminho}`")
+
+
+def finalizar_execucao_atual():
+    """
+    Fecha a medição ainda aberta nesta thread, se houver. Chamado pelo
+    wrapper das páginas num finally, e no início da execução seguinte
+    para apps rodados sozinhos (o Streamlit reaproveita a thread no rerun,
+    e o cProfile deixado ligado impediria de medir as próximas).
+    """
+    perfil = getattr(_execucao_atual, "perfil", None)
+    if perfil is not None:
+        perfil.finalizar(desenhar_painel=False)
+
+
+def iniciar_perfil(app):
+    """
+    Começa a medir a execução atual do app. Fica ativo com a variável de
+    ambiente PERFIL_STREAMLIT=1 ou com ?perfil=1 na URL.
+    """
+    finalizar_execucao_atual()
+    ativo = ATIVO_AMBIENTE or st.query_params.get("perfil", "0") == "1"
+    return PerfilExecucao(app, ativo)
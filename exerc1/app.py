@@ -1,8 +1,18 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+
+px = importar_tardio("plotly.express")
 
 st.title("Dashboard de Análise de Dados com Upload de CSV")
+perfil = iniciar_perfil("exerc1")
 
 # Upload de arquivo
 uploaded_file = st.file_uploader("Escolha um arquivo CSV", type="csv")
@@ -10,7 +20,10 @@ uploaded_file = st.file_uploader("Escolha um arquivo CSV", type="csv")
 if uploaded_file is not None:
     # Carregar dados
     try:
-        df = pd.read_csv(uploaded_file)
+        with perfil.secao("carregamento"):
+            # Mesmo conteúdo enviado de novo (ou por outra sessão) não é lido
+            # outra vez; arquivos dos usuários ficam só em memória
+            df = conjuntos.carregar_csv("exerc1_upload", uploaded_file, disco=False)
         
         # Exibir prévia dos dados
         st.subheader("Prévia dos Dados")
@@ -24,9 +37,10 @@ if uploaded_file is not None:
             
             # Calcular estatísticas
             st.subheader("Estatísticas")
-            media = df[selected_column].mean()
-            mediana = df[selected_column].median()
-            desvio = df[selected_column].std()
+            with perfil.secao("estatísticas"):
+                media = df[selected_column].mean()
+                mediana = df[selected_column].median()
+                desvio = df[selected_column].std()
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Média", f"{media:.2f}")
@@ -35,8 +49,10 @@ if uploaded_file is not None:
             
             # Gráfico
             st.subheader("Visualização")
-            fig = px.histogram(df, x=selected_column, nbins=20, title=f"Histograma de {selected_column}")
-            st.plotly_chart(fig, use_container_width=True)
+            with perfil.secao("gráfico"):
+                fig = px.histogram(df, x=selected_column, nbins=20, title=f"Histograma de {selected_column}")
+            with perfil.secao("serialização"):
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("O arquivo não contém colunas numéricas para análise.")
     
@@ -44,3 +60,5 @@ if uploaded_file is not None:
         st.error(f"Erro ao processar o arquivo: {e}")
 else:
     st.info("Por favor, faça upload de um arquivo CSV para começar.")
+
+perfil.finalizar()
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class AgregadosRegiao:
+    """Resumo pré-calculado de uma região"""
+    top_populacao: pd.DataFrame
+    top_area: pd.DataFrame
+    populacao_total: int
+    area_total: float
+    quantidade_paises: int
+
+    @property
+    def densidade(self):
+        return self.populacao_total / self.area_total if self.area_total > 0 else 0.0
+
+
+def tabela_paises(paises):
+    """Tabela colunar com os campos numéricos usados nos gráficos"""
+    tabela = pd.DataFrame({
+        'pais': [p.nome for p in paises],
+        'regiao': [p.regiao for p in paises],
+        'populacao': [p.populacao for p in paises],
+        'area': [p.area for p in paises],
+    })
+    tabela['regiao'] = tabela['regiao'].astype('category')
+    return tabela
+
+
+def calcular_agregados(paises, top_n=15):
+    """
+    Calcula de uma vez os agregados de todas as regiões: os top_n países
+    por população e por área, totais e quantidade de países.
+    """
+    tabela = tabela_paises(paises)
+    agregados = {}
+    for regiao, grupo in tabela.groupby('regiao', observed=True):
+        com_area = grupo[grupo['area'] > 0]
+        agregados[regiao] = AgregadosRegiao(
+            top_populacao=grupo.nlargest(top_n, 'populacao')[['pais', 'populacao']].reset_index(drop=True),
+            top_area=com_area.nlargest(top_n, 'area')[['pais', 'area']].reset_index(drop=True),
+            populacao_total=int(grupo['populacao'].sum()),
+            area_total=float(com_area['area'].sum()),
+            quantidade_paises=len(grupo),
+        )
+    return agregados
@@ -1,10 +1,35 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 import requests
-import json
+import os
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+from cliente_http import ClienteHTTP
+from snapshot_paises import SnapshotPaises
+from indice_paises import IndicePaises
+from agregados_regiao import calcular_agregados
+from bandeiras import CacheBandeiras
+from registro_pais import converter_paises
+
+px = importar_tardio("plotly.express")
+go = importar_tardio("plotly.graph_objects")
+
+# Endereço da API (pode apontar para um servidor local de testes)
+URL_API = os.environ.get("REST_COUNTRIES_URL", "https://restcountries.com/v3.1").rstrip("/")
+
+# Arquivo com a cópia local da lista de países
+CAMINHO_SNAPSHOT = os.environ.get(
+    "SNAPSHOT_PAISES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados", "paises.json.gz")
+)
 
 # Configuração da página
 st.set_page_config(
@@ -12,6 +37,7 @@ st.set_page_config(
     page_icon="🌍",
     layout="wide"
 )
+perfil = iniciar_perfil("exerc10")
 
 # Título do aplicativo
 st.title("🌍 Explorador de Países")
@@ -20,37 +46,130 @@ Este aplicativo usa a API REST Countries para mostrar informações sobre os pa
 Digite o nome de um país para explorar seus dados demográficos, econômicos e geográficos.
 """)
 
+# Cliente HTTP do processo: pool de conexões, timeouts, novas tentativas
+# e agrupamento de requisições iguais feitas por sessões diferentes
+@st.cache_resource
+def obter_cliente_http():
+    return ClienteHTTP(timeout=(3.05, 10), tentativas=3, fator_espera=0.5)
+
+# Cópia local dos países, compartilhada por todas as sessões do processo
+# e atualizada em segundo plano a cada hora
+@st.cache_resource
+def obter_snapshot():
+    return SnapshotPaises(obter_cliente_http(), f"{URL_API}/all", CAMINHO_SNAPSHOT, intervalo=3600,
+                          converter=converter_paises)
+
 # Função para buscar dados da API
-@st.cache_data(ttl=3600)  # Cache por 1 hora
 def buscar_paises():
-    """Busca todos os países da API REST Countries"""
+    """Busca todos os países (da cópia local ou da API REST Countries)"""
     try:
-        url = "https://restcountries.com/v3.1/all"
-        response = requests.get(url)
-        response.raise_for_status()  # Verificar se a requisição foi bem-sucedida
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        paises, versao = obter_snapshot().obter_com_versao()
+        # A lista entra nas métricas e no limite de memória do cache de
+        # conjuntos, com a versão do snapshot na chave; o nível em disco
+        # continua sendo o próprio snapshot (revalidado por ETag), por isso
+        # disco=False
+        return conjuntos.carregar("exerc10_paises", lambda: paises, parametros=("snapshot", versao), disco=False)
+    except (requests.exceptions.RequestException, ValueError) as e:
         st.error(f"Erro ao acessar a API: {e}")
         return None
 
-@st.cache_data(ttl=3600)  # Cache por 1 hora
+# Bandeiras guardadas localmente na largura de exibição
+@st.cache_resource
+def obter_cache_bandeiras():
+    return CacheBandeiras(
+        obter_cliente_http(),
+        os.path.join(os.path.dirname(CAMINHO_SNAPSHOT), "bandeiras"),
+        largura=200
+    )
+
+# Pré-carregar todas as bandeiras uma vez por versão do snapshot
+@st.cache_resource(max_entries=1)
+def pre_carregar_bandeiras(versao):
+    urls = [p.bandeira_url for p in obter_snapshot().paises]
+    return obter_cache_bandeiras().pre_carregar(urls)
+
+# Índice dos países em memória, refeito só quando o snapshot muda de versão
+@st.cache_resource(max_entries=1)
+def obter_indice(versao):
+    return IndicePaises(obter_snapshot().paises)
+
 def buscar_pais_por_nome(nome):
-    """Busca um país específico pelo nome"""
+    """Busca um país pelo nome no índice local, recorrendo à API só se não encontrar"""
+    snapshot = obter_snapshot()
+    if snapshot.paises is not None:
+        pais = obter_indice(snapshot.versao).buscar(nome)
+        if pais is not None:
+            return [pais]
+    return buscar_pais_na_api(nome)
+
+# Agregados por região, calculados uma vez por versão do snapshot
+@st.cache_resource(max_entries=1)
+def obter_agregados(versao):
+    return calcular_agregados(obter_snapshot().paises)
+
+# Gráficos de barras de cada região (sem destaque), montados uma vez por versão
+@st.cache_resource(max_entries=64)
+def montar_graficos_regiao(versao, regiao):
+    agregados = obter_agregados(versao)[regiao]
+    
+    # Criar gráfico de barras para população
+    fig_pop = px.bar(
+        agregados.top_populacao,
+        x='pais',
+        y='populacao',
+        title=f"População dos Maiores Países da Região {regiao}",
+        labels={'pais': 'País', 'populacao': 'População'},
+        height=500
+    )
+    
+    # Melhorar layout
+    fig_pop.update_layout(
+        xaxis_title="País",
+        yaxis_title="População",
+        xaxis={'categoryorder': 'total descending'}
+    )
+    
+    # Criar gráfico de barras para área
+    fig_area = px.bar(
+        agregados.top_area,
+        x='pais',
+        y='area',
+        title=f"Área dos Maiores Países da Região {regiao} (km²)",
+        labels={'pais': 'País', 'area': 'Área (km²)'},
+        height=500
+    )
+    
+    # Melhorar layout
+    fig_area.update_layout(
+        xaxis_title="País",
+        yaxis_title="Área (km²)",
+        xaxis={'categoryorder': 'total descending'}
+    )
+    return fig_pop, fig_area
+
+@st.cache_data(ttl=3600)  # Cache por 1 hora
+def buscar_pais_na_api(nome):
+    """Busca um país específico pelo nome na API"""
     try:
-        url = f"https://restcountries.com/v3.1/name/{nome}"
-        response = requests.get(url)
+        url = f"{URL_API}/name/{nome}"
+        response = obter_cliente_http().get(url)
         response.raise_for_status()
-        return response.json()
+        return converter_paises(response.json())
     except requests.exceptions.RequestException as e:
         st.error(f"Erro ao buscar dados do país: {e}")
         return None
 
 # Carregar lista de países para o autocomplete
-todos_paises = buscar_paises()
+with perfil.secao("carregamento"):
+    todos_paises = buscar_paises()
 
 if todos_paises:
+    with perfil.secao("carregamento"):
+        indice = obter_indice(obter_snapshot().versao)
+        pre_carregar_bandeiras(obter_snapshot().versao)
+    
     # Extrair nomes dos países para o autocomplete
-    nomes_paises = [pais.get('name', {}).get('common', '') for pais in todos_paises]
+    nomes_paises = [pais.nome for pais in todos_paises]
     nomes_paises = sorted([nome for nome in nomes_paises if nome])
     
     # Interface para buscar país
@@ -75,19 +194,20 @@ if todos_paises:
             nome_pais = st.session_state.ultimo_pais
         
         # Buscar dados do país selecionado
-        dados_pais = buscar_pais_por_nome(nome_pais)
+        with perfil.secao("busca do país"):
+            dados_pais = buscar_pais_por_nome(nome_pais)
         
         if dados_pais and len(dados_pais) > 0:
             pais = dados_pais[0]  # Pegar o primeiro resultado
             
             # Extrair dados principais
-            bandeira_url = pais.get('flags', {}).get('png', '')
-            nome_oficial = pais.get('name', {}).get('official', 'N/A')
-            capital = pais.get('capital', ['N/A'])[0] if pais.get('capital') else 'N/A'
-            regiao = pais.get('region', 'N/A')
-            subregiao = pais.get('subregion', 'N/A')
-            populacao = pais.get('population', 0)
-            area = pais.get('area', 0)
+            bandeira_url = pais.bandeira_url
+            nome_oficial = pais.nome_oficial
+            capital = pais.capital
+            regiao = pais.regiao
+            subregiao = pais.subregiao
+            populacao = pais.populacao
+            area = pais.area
             
             # Criando tabs para organizar a informação
             tab1, tab2, tab3 = st.tabs(["Informações Básicas", "Demografia", "Mapa"])
@@ -98,7 +218,10 @@ if todos_paises:
                 
                 with col1:
                     if bandeira_url:
-                        st.image(bandeira_url, caption=f"Bandeira de {nome_pais}", width=200)
+                        # Servir do cache local; se não der, deixar o navegador buscar no CDN
+                        with perfil.secao("bandeira"):
+                            bandeira = obter_cache_bandeiras().obter(bandeira_url)
+                        st.image(bandeira or bandeira_url, caption=f"Bandeira de {nome_pais}", width=200)
                 
                 with col2:
                     st.subheader(nome_oficial)
@@ -107,21 +230,15 @@ if todos_paises:
                     st.write(f"**Sub-região:** {subregiao}")
                     
                     # Moedas
-                    moedas = pais.get('currencies', {})
-                    if moedas:
-                        moedas_str = ", ".join([f"{info.get('name', 'N/A')} ({code})" 
-                                              for code, info in moedas.items()])
-                        st.write(f"**Moeda(s):** {moedas_str}")
+                    if pais.moedas:
+                        st.write(f"**Moeda(s):** {', '.join(pais.moedas)}")
                     
                     # Idiomas
-                    idiomas = pais.get('languages', {})
-                    if idiomas:
-                        idiomas_str = ", ".join(idiomas.values())
-                        st.write(f"**Idioma(s):** {idiomas_str}")
+                    if pais.idiomas:
+                        st.write(f"**Idioma(s):** {', '.join(pais.idiomas)}")
                     
                     # Fuso horário
-                    fusos = pais.get('timezones', ['N/A'])
-                    st.write(f"**Fuso(s) horário(s):** {', '.join(fusos)}")
+                    st.write(f"**Fuso(s) horário(s):** {', '.join(pais.fusos)}")
                 
                 # Informações adicionais
                 st.subheader("Detalhes Adicionais")
@@ -142,88 +259,46 @@ if todos_paises:
             with tab2:
                 st.subheader("Dados Demográficos")
                 
-                # Criar dados comparativos com países da mesma região
-                paises_regiao = [p for p in todos_paises if p.get('region') == regiao]
-                
-                # Dados para o gráfico de população
-                df_pop = pd.DataFrame([
-                    {
-                        'pais': p.get('name', {}).get('common', ''),
-                        'populacao': p.get('population', 0)
-                    }
-                    for p in paises_regiao
-                ])
-                
-                # Ordenar e pegar os 15 maiores
-                df_pop = df_pop.sort_values('populacao', ascending=False).head(15)
-                
-                # Destacar o país selecionado
-                df_pop['destacado'] = df_pop['pais'] == nome_pais
-                
-                # Criar gráfico de barras para população
-                fig_pop = px.bar(
-                    df_pop,
-                    x='pais',
-                    y='populacao',
-                    title=f"População dos Maiores Países da Região {regiao}",
-                    color='destacado',
-                    color_discrete_map={True: 'red', False: 'blue'},
-                    labels={'pais': 'País', 'populacao': 'População'},
-                    height=500
-                )
-                
-                # Melhorar layout
-                fig_pop.update_layout(
-                    xaxis_title="País",
-                    yaxis_title="População",
-                    xaxis={'categoryorder': 'total descending'}
-                )
-                
-                st.plotly_chart(fig_pop, use_container_width=True)
-                
-                # Gráfico de área
-                df_area = pd.DataFrame([
-                    {
-                        'pais': p.get('name', {}).get('common', ''),
-                        'area': p.get('area', 0)
-                    }
-                    for p in paises_regiao if p.get('area', 0) > 0
-                ])
-                
-                # Ordenar e pegar os 15 maiores
-                df_area = df_area.sort_values('area', ascending=False).head(15)
-                
-                # Destacar o país selecionado
-                df_area['destacado'] = df_area['pais'] == nome_pais
-                
-                # Criar gráfico de barras para área
-                fig_area = px.bar(
-                    df_area,
-                    x='pais',
-                    y='area',
-                    title=f"Área dos Maiores Países da Região {regiao} (km²)",
-                    color='destacado',
-                    color_discrete_map={True: 'red', False: 'green'},
-                    labels={'pais': 'País', 'area': 'Área (km²)'},
-                    height=500
-                )
+                # Agregados e gráficos da região vêm prontos do cache;
+                # só o destaque do país selecionado é aplicado aqui
+                with perfil.secao("estatísticas"):
+                    agregados = obter_agregados(obter_snapshot().versao).get(regiao)
                 
-                # Melhorar layout
-                fig_area.update_layout(
-                    xaxis_title="País",
-                    yaxis_title="Área (km²)",
-                    xaxis={'categoryorder': 'total descending'}
-                )
-                
-                st.plotly_chart(fig_area, use_container_width=True)
+                if agregados is None:
+                    st.info(f"Sem dados comparativos para a região {regiao}.")
+                else:
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric(f"População da Região ({agregados.quantidade_paises} países)",
+                                  f"{agregados.populacao_total:,}".replace(",", "."))
+                    with col2:
+                        st.metric("Área da Região", f"{agregados.area_total:,.0f} km²".replace(",", "."))
+                    with col3:
+                        st.metric("Densidade da Região", f"{agregados.densidade:.1f} hab/km²".replace(".", ","))
+                    
+                    with perfil.secao("gráfico"):
+                        fig_pop_base, fig_area_base = montar_graficos_regiao(obter_snapshot().versao, regiao)
+                        
+                        # Destacar o país selecionado
+                        fig_pop = go.Figure(fig_pop_base)
+                        fig_pop.update_traces(marker_color=[
+                            'red' if p == nome_pais else 'blue' for p in agregados.top_populacao['pais']
+                        ])
+                        fig_area = go.Figure(fig_area_base)
+                        fig_area.update_traces(marker_color=[
+                            'red' if p == nome_pais else 'green' for p in agregados.top_area['pais']
+                        ])
+                    
+                    with perfil.secao("serialização"):
+                        st.plotly_chart(fig_pop, use_container_width=True)
+                        st.plotly_chart(fig_area, use_container_width=True)
             
             # Tab 3: Mapa
             with tab3:
                 st.subheader("Localização")
                 
                 # Extrair coordenadas do país
-                lat = pais.get('latlng', [0, 0])[0] if pais.get('latlng') else 0
-                lon = pais.get('latlng', [0, 0])[1] if pais.get('latlng') else 0
+                lat, lon = pais.latlng
                 
                 # Criar DataFrame para o mapa
                 df_mapa = pd.DataFrame({
@@ -234,38 +309,61 @@ if todos_paises:
                 })
                 
                 # Criar mapa com Plotly
-                fig_mapa = px.scatter_geo(
-                    df_mapa,
-                    lat='lat',
-                    lon='lon',
-                    text='pais',
-                    size='populacao',
-                    projection='natural earth',
-                    title=f"Localização de {nome_pais}",
-                    size_max=30,
-                    color_discrete_sequence=['red']
-                )
-                
-                # Centralizar o mapa no país
-                fig_mapa.update_geos(
-                    center=dict(lat=lat, lon=lon),
-                    projection_scale=3 if pais.get('area', 0) < 500000 else 2
-                )
+                with perfil.secao("gráfico"):
+                    fig_mapa = px.scatter_geo(
+                        df_mapa,
+                        lat='lat',
+                        lon='lon',
+                        text='pais',
+                        size='populacao',
+                        projection='natural earth',
+                        title=f"Localização de {nome_pais}",
+                        size_max=30,
+                        color_discrete_sequence=['red']
+                    )
+                    
+                    # Centralizar o mapa no país
+                    fig_mapa.update_geos(
+                        center=dict(lat=lat, lon=lon),
+                        projection_scale=3 if area < 500000 else 2
+                    )
                 
-                st.plotly_chart(fig_mapa, use_container_width=True)
+                with perfil.secao("serialização"):
+                    st.plotly_chart(fig_mapa, use_container_width=True)
                 
                 # Informações de fronteiras
-                fronteiras = pais.get('borders', [])
+                fronteiras = pais.fronteiras
                 if fronteiras:
-                    # Buscar nomes dos países vizinhos
-                    nomes_vizinhos = []
-                    for codigo in fronteiras:
-                        for p in todos_paises:
-                            if p.get('cca3') == codigo:
-                                nomes_vizinhos.append(p.get('name', {}).get('common', codigo))
-                                break
+                    # Buscar nomes dos países vizinhos no índice por cca3
+                    nomes_vizinhos = [indice.nome(codigo) for codigo in fronteiras]
                     
                     st.write(f"**Países Vizinhos:** {', '.join(sorted(nomes_vizinhos))}")
+                    
+                    # Consultas no grafo de fronteiras
+                    st.subheader("Conexões Terrestres")
+                    codigo_pais = pais.cca3
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        saltos = st.slider("Fronteiras cruzadas:", min_value=1, max_value=5, value=2)
+                        with perfil.secao("grafo de fronteiras"):
+                            vizinhanca = indice.vizinhanca(codigo_pais, saltos)
+                        df_vizinhanca = pd.DataFrame({
+                            'País': [indice.nome(codigo) for codigo in vizinhanca],
+                            'Fronteiras': list(vizinhanca.values())
+                        }).sort_values(['Fronteiras', 'País'])
+                        st.write(f"**{len(df_vizinhanca)} países** a até {saltos} fronteira(s) de distância")
+                        st.dataframe(df_vizinhanca, hide_index=True, use_container_width=True)
+                    
+                    with col2:
+                        destino = st.selectbox("Rota terrestre até:", options=nomes_paises)
+                        pais_destino = indice.buscar(destino)
+                        with perfil.secao("grafo de fronteiras"):
+                            rota = indice.rota_terrestre(codigo_pais, pais_destino.cca3 if pais_destino else None)
+                        if rota is None:
+                            st.write(f"Não há rota terrestre entre {nome_pais} e {destino}.")
+                        else:
+                            st.write(f"**{len(rota) - 1} fronteira(s):** {' → '.join(indice.nome(codigo) for codigo in rota)}")
                 else:
                     st.write("**País sem fronteiras terrestres**")
         else:
@@ -275,6 +373,25 @@ else:
 
 # Rodapé com informações
 st.divider()
+snapshot = obter_snapshot()
+if snapshot.baixado_em:
+    st.caption(
+        "Dados dos países baixados em "
+        f"{datetime.fromtimestamp(snapshot.baixado_em).strftime('%d/%m/%Y %H:%M')}"
+    )
+if snapshot.ultimo_erro is not None:
+    st.caption(f"⚠️ Não foi possível atualizar os dados; exibindo a cópia local. ({snapshot.ultimo_erro})")
+
+with st.expander("Conexão com a API"):
+    metricas_http = obter_cliente_http().metricas()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Requisições", metricas_http["requisicoes"])
+    col2.metric("Erros", metricas_http["erros"])
+    col3.metric("Agrupadas", metricas_http["agrupadas"])
+    st.write(
+        f"**Latência:** p50 {metricas_http['latencia_p50_ms']:.0f} ms | "
+        f"p95 {metricas_http['latencia_p95_ms']:.0f} ms"
+    )
 st.markdown("""
 **Sobre este aplicativo:**
 - Dados fornecidos pela API [REST Countries](https://restcountries.com)
@@ -282,6 +399,4 @@ st.markdown("""
 - Última atualização: Abril 2025
 """)
 
-# Adicionar cache para melhorar a performance
-if "paises_cache" not in st.session_state:
-    st.session_state.paises_cache = {}
+perfil.finalizar()
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+
+import requests
+from PIL import Image
+
+
+class CacheBandeiras:
+    """
+    Cache local das imagens de bandeiras.
+
+    Cada bandeira é baixada uma única vez, redimensionada para a largura
+    de exibição e guardada em disco e em memória; depois disso a exibição
+    não depende mais do CDN. `pre_carregar` baixa todas as bandeiras em
+    segundo plano com concorrência limitada.
+    """
+
+    def __init__(self, cliente, diretorio, largura=200, concorrencia=8):
+        self.cliente = cliente
+        self.diretorio = diretorio
+        self.largura = largura
+        self.concorrencia = concorrencia
+        self._memoria = {}
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, url):
+        nome = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.diretorio, f"{nome}_{self.largura}.png")
+
+    def _redimensionar(self, conteudo):
+        imagem = Image.open(io.BytesIO(conteudo))
+        if imagem.width > self.largura:
+            altura = round(imagem.height * self.largura / imagem.width)
+            imagem = imagem.resize((self.largura, altura), Image.LANCZOS)
+        saida = io.BytesIO()
+        imagem.save(saida, format="PNG", optimize=True)
+        return saida.getvalue()
+
+    def obter(self, url):
+        """Bytes PNG da bandeira (memória → disco → download), ou None se falhar"""
+        with self._lock:
+            if url in self._memoria:
+                return self._memoria[url]
+
+        caminho = self._caminho(url)
+        try:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            try:
+                response = self.cliente.get(url)
+                response.raise_for_status()
+                conteudo = self._redimensionar(response.content)
+            except (requests.exceptions.RequestException, OSError):
+                return None
+            temporario = f"{caminho}.{threading.get_ident()}.tmp"
+            try:
+                with open(temporario, "wb") as arquivo:
+                    arquivo.write(conteudo)
+                os.replace(temporario, caminho)
+            except OSError:
+                # Sem disco (cheio, sem permissão...), a bandeira fica só em memória
+                try:
+                    os.unlink(temporario)
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._memoria[url] = conteudo
+        return conteudo
+
+    async def _baixar_todas(self, urls):
+        semaforo = asyncio.Semaphore(self.concorrencia)
+
+        async def baixar(url):
+            async with semaforo:
+                await asyncio.to_thread(self.obter, url)
+
+        await asyncio.gather(*(baixar(url) for url in urls))
+
+    def pre_carregar(self, urls):
+        """Baixa todas as bandeiras numa thread em segundo plano"""
+        urls = sorted({url for url in urls if url})
+        thread = threading.Thread(target=asyncio.run, args=(self._baixar_todas(urls),), daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as TempoEsgotadoFuturo
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class _RetryLimitado(Retry):
+    """Retry que não espera mais que `espera_maxima` segundos por um Retry-After"""
+
+    def __init__(self, *args, espera_maxima=5.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.espera_maxima = espera_maxima
+
+    def new(self, **kwargs):
+        # O urllib3 cria uma cópia a cada tentativa; o limite vai junto
+        novo = super().new(**kwargs)
+        novo.espera_maxima = self.espera_maxima
+        return novo
+
+    def get_retry_after(self, response):
+        espera = super().get_retry_after(response)
+        return None if espera is None else min(espera, self.espera_maxima)
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP compartilhado pelo processo.
+
+    - Reaproveita conexões (pool por host) em vez de abrir TCP/TLS a cada
+      chamada;
+    - aplica timeout de conexão e de leitura em toda requisição;
+    - repete falhas transitórias (erros de conexão, 429 e 5xx) com espera
+      exponencial, respeitando Retry-After até `espera_maxima` segundos
+      (um servidor pedindo minutos não prende a sessão);
+    - agrupa requisições iguais simultâneas: se várias sessões pedem a
+      mesma URL ao mesmo tempo, só uma vai à rede e as demais recebem a
+      mesma resposta (ou o mesmo erro), esperando no máximo o tempo que
+      a requisição levaria com todas as tentativas;
+    - registra latência, erros e requisições agrupadas.
+    """
+
+    def __init__(self, timeout=(3.05, 10), tentativas=3, fator_espera=0.5, tamanho_pool=20, espera_maxima=5.0):
+        self.timeout = timeout
+        # Pior caso de uma requisição: todas as tentativas esgotando o
+        # timeout, com a espera máxima entre elas
+        self.timeout_agrupadas = (tentativas + 1) * sum(timeout) + tentativas * espera_maxima
+        retry = _RetryLimitado(
+            espera_maxima=espera_maxima,
+            total=tentativas,
+            backoff_factor=fator_espera,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=retry)
+        self._sessao = requests.Session()
+        self._sessao.mount("http://", adaptador)
+        self._sessao.mount("https://", adaptador)
+
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self._latencias = deque(maxlen=1000)
+        self.requisicoes = 0
+        self.erros = 0
+        self.agrupadas = 0
+
+    def get(self, url, headers=None):
+        """GET com pool, timeout, novas tentativas e agrupamento de chamadas iguais"""
+        chave = (url, tuple(sorted((headers or {}).items())))
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                self.agrupadas += 1
+                lider = False
+            else:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+                lider = True
+
+        if not lider:
+            try:
+                return futuro.result(timeout=self.timeout_agrupadas)
+            except TempoEsgotadoFuturo:
+                raise requests.exceptions.Timeout(f"Sem resposta da requisição agrupada para {url}") from None
+
+        inicio = time.perf_counter()
+        try:
+            response = self._sessao.get(url, headers=headers, timeout=self.timeout)
+            # Garantir que o corpo já foi lido antes de compartilhar a resposta
+            response.content
+            self._registrar(inicio, erro=response.status_code >= 500)
+            futuro.set_result(response)
+            return response
+        except Exception as e:
+            self._registrar(inicio, erro=True)
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            if not futuro.done():
+                # Líder interrompida por algo que não é Exception (ex.: fim da
+                # thread): as que esperavam recebem um erro de requisição
+                futuro.set_exception(requests.exceptions.RequestException(f"Requisição agrupada interrompida: {url}"))
+
+    def _registrar(self, inicio, erro):
+        with self._lock:
+            self.requisicoes += 1
+            self.erros += int(erro)
+            self._latencias.append(time.perf_counter() - inicio)
+
+    def metricas(self):
+        with self._lock:
+            latencias = np.array(self._latencias) * 1000
+            return {
+                "requisicoes": self.requisicoes,
+                "erros": self.erros,
+                "agrupadas": self.agrupadas,
+                "latencia_p50_ms": float(np.percentile(latencias, 50)) if len(latencias) else 0.0,
+                "latencia_p95_ms": float(np.percentile(latencias, 95)) if len(latencias) else 0.0,
+            }
@@ -0,0 +1,90 @@
+from collections import deque
+
+
+class IndicePaises:
+    """
+    Índice em memória da lista de países, montado uma vez por versão dos
+    dados. Cada país pode ser encontrado em O(1) pelo nome comum, nome
+    oficial, cca2 ou cca3, sem diferenciar maiúsculas de minúsculas.
+
+    Também guarda o grafo de fronteiras terrestres (lista de adjacência
+    por cca3), usado para vizinhos, rotas e vizinhanças de n fronteiras.
+    """
+
+    def __init__(self, paises):
+        self.paises = paises
+        self._por_chave = {}
+        self.por_cca3 = {}
+        for pais in paises:
+            for chave in (pais.nome, pais.nome_oficial, pais.cca2, pais.cca3):
+                if chave:
+                    # Em caso de chave repetida, vale o primeiro país da lista
+                    self._por_chave.setdefault(chave.casefold(), pais)
+            if pais.cca3:
+                self.por_cca3.setdefault(pais.cca3, pais)
+
+        # Fronteiras são simétricas; a união cobre países com dados incompletos
+        adjacencia = {codigo: set() for codigo in self.por_cca3}
+        for codigo, pais in self.por_cca3.items():
+            for vizinho in pais.fronteiras:
+                if vizinho in adjacencia and vizinho != codigo:
+                    adjacencia[codigo].add(vizinho)
+                    adjacencia[vizinho].add(codigo)
+        self.adjacencia = {codigo: tuple(sorted(vizinhos)) for codigo, vizinhos in adjacencia.items()}
+
+    def buscar(self, chave):
+        """Retorna o país para a chave dada, ou None se não estiver no índice"""
+        if not chave:
+            return None
+        return self._por_chave.get(chave.casefold())
+
+    def nome(self, cca3):
+        """Nome comum do país com o código cca3 (ou o próprio código)"""
+        pais = self.por_cca3.get(cca3)
+        return pais.nome if pais else cca3
+
+    def vizinhos(self, cca3):
+        """Códigos cca3 dos países que fazem fronteira terrestre com cca3"""
+        return self.adjacencia.get(cca3, ())
+
+    def vizinhanca(self, cca3, saltos):
+        """
+        Países alcançáveis a partir de cca3 cruzando até `saltos`
+        fronteiras, como {cca3: número de fronteiras}.
+        """
+        distancias = {cca3: 0}
+        fila = deque([cca3])
+        while fila:
+            atual = fila.popleft()
+            if distancias[atual] == saltos:
+                continue
+            for vizinho in self.vizinhos(atual):
+                if vizinho not in distancias:
+                    distancias[vizinho] = distancias[atual] + 1
+                    fila.append(vizinho)
+        del distancias[cca3]
+        return distancias
+
+    def rota_terrestre(self, origem, destino):
+        """
+        Menor rota por terra (em número de fronteiras) entre dois países,
+        como lista de códigos cca3 de origem a destino, ou None se não
+        houver ligação terrestre.
+        """
+        if origem not in self.adjacencia or destino not in self.adjacencia:
+            return None
+        anterior = {origem: None}
+        fila = deque([origem])
+        while fila:
+            atual = fila.popleft()
+            if atual == destino:
+                rota = []
+                while atual is not None:
+                    rota.append(atual)
+                    atual = anterior[atual]
+                return rota[::-1]
+            for vizinho in self.vizinhos(atual):
+                if vizinho not in anterior:
+                    anterior[vizinho] = atual
+                    fila.append(vizinho)
+        return None
@@ -0,0 +1,74 @@
+class Pais:
+    """
+    Registro compacto de um país com só os campos usados pelo aplicativo.
+
+    O JSON da API traz muito mais (traduções, gentílicos, links de mapas,
+    etc.); aqui ele é lido uma única vez e o resto é descartado. Com
+    __slots__ cada registro não carrega um __dict__ próprio, o que reduz a
+    memória e o custo de serializar a lista.
+    """
+
+    __slots__ = (
+        "nome", "nome_oficial", "cca2", "cca3", "capital", "regiao", "subregiao",
+        "populacao", "area", "latlng", "fronteiras", "moedas", "idiomas", "fusos",
+        "bandeira_url",
+    )
+
+    def __init__(self, nome, nome_oficial, cca2, cca3, capital, regiao, subregiao,
+                 populacao, area, latlng, fronteiras, moedas, idiomas, fusos, bandeira_url):
+        self.nome = nome
+        self.nome_oficial = nome_oficial
+        self.cca2 = cca2
+        self.cca3 = cca3
+        self.capital = capital
+        self.regiao = regiao
+        self.subregiao = subregiao
+        self.populacao = populacao
+        self.area = area
+        self.latlng = latlng
+        self.fronteiras = fronteiras
+        self.moedas = moedas
+        self.idiomas = idiomas
+        self.fusos = fusos
+        self.bandeira_url = bandeira_url
+
+    @classmethod
+    def de_json(cls, dados):
+        """Converte um item da resposta da API REST Countries"""
+        nome = dados.get('name', {})
+        capitais = dados.get('capital')
+        return cls(
+            nome=nome.get('common', ''),
+            nome_oficial=nome.get('official', 'N/A'),
+            cca2=dados.get('cca2'),
+            cca3=dados.get('cca3'),
+            capital=capitais[0] if capitais else 'N/A',
+            regiao=dados.get('region', 'N/A'),
+            subregiao=dados.get('subregion', 'N/A'),
+            populacao=dados.get('population', 0),
+            area=dados.get('area', 0),
+            latlng=tuple(dados.get('latlng') or (0, 0))[:2],
+            fronteiras=tuple(dados.get('borders', ())),
+            moedas=tuple(
+                f"{info.get('name', 'N/A')} ({codigo})"
+                for codigo, info in dados.get('currencies', {}).items()
+            ),
+            idiomas=tuple(dados.get('languages', {}).values()),
+            fusos=tuple(dados.get('timezones', ['N/A'])),
+            bandeira_url=dados.get('flags', {}).get('png', ''),
+        )
+
+    def __getstate__(self):
+        return tuple(getattr(self, campo) for campo in self.__slots__)
+
+    def __setstate__(self, estado):
+        for campo, valor in zip(self.__slots__, estado):
+            setattr(self, campo, valor)
+
+    def __repr__(self):
+        return f"Pais({self.nome!r}, cca3={self.cca3!r})"
+
+
+def converter_paises(dados):
+    """Converte a lista da API em registros Pais"""
+    return [Pais.de_json(item) for item in dados]
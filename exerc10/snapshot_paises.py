@@ -0,0 +1,143 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+
+class SnapshotPaises:
+    """
+    Cópia local da lista completa de países da API REST Countries.
+
+    A lista fica num arquivo JSON compactado (gzip) junto com o ETag e o
+    Last-Modified da última resposta. Ao iniciar, o processo lê o arquivo e
+    já pode servir os dados; quando a cópia passa de `intervalo` segundos,
+    uma thread em segundo plano faz uma requisição condicional
+    (If-None-Match / If-Modified-Since) e só baixa o corpo se os dados
+    mudaram. Sem rede, continua servindo o que está em disco.
+
+    As requisições passam pelo cliente HTTP compartilhado do processo. Se
+    `converter` for informado, a lista em memória é o resultado dele (ex.:
+    registros compactos) e o JSON bruto só fica no arquivo.
+    """
+
+    def __init__(self, cliente, url, caminho, intervalo=3600, converter=None):
+        self.cliente = cliente
+        self.converter = converter
+        self.url = url
+        self.caminho = caminho
+        self.intervalo = intervalo
+
+        self.paises = None
+        self.etag = None
+        self.last_modified = None
+        self.baixado_em = None
+        self.verificado_em = 0.0
+        self.ultimo_erro = None
+        self.versao = 0
+
+        self._lock = threading.Lock()
+        self._atualizando = False
+        self._ler_arquivo()
+
+    def _ler_arquivo(self):
+        try:
+            with gzip.open(self.caminho, "rt", encoding="utf-8") as arquivo:
+                conteudo = json.load(arquivo)
+        except (OSError, ValueError):
+            return
+        self._aplicar(conteudo)
+
+    def _aplicar(self, conteudo):
+        paises = conteudo["paises"]
+        self.paises = self.converter(paises) if self.converter else paises
+        self.etag = conteudo.get("etag")
+        self.last_modified = conteudo.get("last_modified")
+        self.baixado_em = conteudo.get("baixado_em")
+        self.verificado_em = conteudo.get("verificado_em", 0.0)
+        self.versao += 1
+
+    def _gravar_arquivo(self, conteudo):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        diretorio = os.path.dirname(self.caminho) or "."
+        os.makedirs(diretorio, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as bruto, gzip.open(bruto, "wt", encoding="utf-8") as arquivo:
+                json.dump(conteudo, arquivo, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def atualizar(self):
+        """
+        Consulta a API com uma requisição condicional. Retorna True se
+        dados novos foram baixados, False se a cópia local continua válida.
+        """
+        cabecalhos = {}
+        if self.paises is not None:
+            if self.etag:
+                cabecalhos["If-None-Match"] = self.etag
+            if self.last_modified:
+                cabecalhos["If-Modified-Since"] = self.last_modified
+
+        response = self.cliente.get(self.url, headers=cabecalhos)
+        agora = time.time()
+
+        if response.status_code == 304:
+            with self._lock:
+                self.verificado_em = agora
+            return False
+
+        response.raise_for_status()
+        conteudo = {
+            "paises": response.json(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "baixado_em": agora,
+            "verificado_em": agora,
+        }
+        self._gravar_arquivo(conteudo)
+        with self._lock:
+            self._aplicar(conteudo)
+        return True
+
+    def _atualizar_em_segundo_plano(self):
+        try:
+            self.atualizar()
+            self.ultimo_erro = None
+        except (requests.exceptions.RequestException, ValueError, OSError) as e:
+            self.ultimo_erro = e
+            # Tentar de novo só no próximo intervalo
+            self.verificado_em = time.time()
+        finally:
+            with self._lock:
+                self._atualizando = False
+
+    def obter(self):
+        """
+        Retorna a lista de países. Sem cópia local, baixa de forma síncrona
+        (e propaga o erro se não houver rede); com cópia vencida, dispara
+        a atualização em segundo plano e devolve a cópia atual na hora.
+        """
+        if self.paises is None:
+            self.atualizar()
+            return self.paises
+
+        with self._lock:
+            vencida = time.time() - self.verificado_em > self.intervalo
+            if vencida and not self._atualizando:
+                self._atualizando = True
+                threading.Thread(target=self._atualizar_em_segundo_plano, daemon=True).start()
+        return self.paises
+
+    def obter_com_versao(self):
+        """Como obter(), devolvendo também a versão da lista devolvida"""
+        self.obter()
+        # Lidos juntos: uma atualização em segundo plano troca os dois sob o lock
+        with self._lock:
+            return self.paises, self.versao
@@ -1,25 +1,55 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos
+from comum.perfil import iniciar_perfil
 
 st.title("Filtro Dinâmico em Tabela")
+perfil = iniciar_perfil("exerc2")
+
+# Relativo ao próprio app, e não ao diretório de onde o Streamlit foi iniciado
+CAMINHO_PRODUTOS = os.environ.get(
+    "DADOS_PRODUTOS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "products_data.csv")
+)
+
+# Colunas usadas pelo app; o products_data.csv do repositório vem em inglês
+ESQUEMA_PRODUTOS = conjuntos.Esquema(
+    {"Cidade": "category", "Categoria": "category", "Preço": "float64", "Avaliação": "float64"},
+    renomear={
+        "product_name": "Produto",
+        "category": "Categoria",
+        "price": "Preço",
+        "city": "Cidade",
+        "rating": "Avaliação",
+    }
+)
 
-# Criar dados de exemplo
-@st.cache_data
 def load_data():
  try:
-        df = pd.read_csv('products_data.csv')
-        return df
+        return conjuntos.carregar_csv("exerc2_produtos", CAMINHO_PRODUTOS, esquema=ESQUEMA_PRODUTOS)
  except FileNotFoundError:
-        st.error("Arquivo 'products_data.csv' não encontrado. Verifique se o arquivo está no diretório correto.")
-        # Return an empty DataFrame or fallback to sample data
-        return pd.DataFrame()
+        st.error(f"Arquivo '{CAMINHO_PRODUTOS}' não encontrado. Verifique se o arquivo está no diretório correto.")
+        perfil.finalizar()
+        st.stop()
+ except conjuntos.ErroEsquema as e:
+        st.error(f"Arquivo '{CAMINHO_PRODUTOS}' em formato inesperado: {e}")
+        perfil.finalizar()
+        st.stop()
 
-df = load_data()
+with perfil.secao("carregamento"):
+    df = load_data()
 
 # Exibir todos os dados
 st.subheader("Dados Completos")
-st.dataframe(df)
+with perfil.secao("serialização"):
+    st.dataframe(df)
 
 # Filtros
 st.subheader("Filtros")
@@ -41,9 +71,9 @@ with col2:
 col3, col4 = st.columns(2)
 
 with col3:
-    # Slider para vendas
-    vendas_min, vendas_max = int(df['Vendas'].min()), int(df['Vendas'].max())
-    vendas_range = st.slider('Faixa de Vendas:', vendas_min, vendas_max, (vendas_min, vendas_max))
+    # Slider para preço (limites arredondados para fora, para não cortar os extremos)
+    preco_min, preco_max = int(np.floor(df['Preço'].min())), int(np.ceil(df['Preço'].max()))
+    preco_range = st.slider('Faixa de Preço:', preco_min, preco_max, (preco_min, preco_max))
 
 with col4:
     # Slider para avaliação
@@ -51,18 +81,22 @@ with col4:
     aval_range = st.slider('Faixa de Avaliação:', aval_min, aval_max, (aval_min, aval_max))
 
 # Aplicar filtros
-filtered_df = df[
-    (df['Cidade'].isin(cidades_selecionadas)) &
-    (df['Categoria'].isin(categorias_selecionadas)) &
-    (df['Vendas'] >= vendas_range[0]) & (df['Vendas'] <= vendas_range[1]) &
-    (df['Avaliação'] >= aval_range[0]) & (df['Avaliação'] <= aval_range[1])
-]
+with perfil.secao("filtro"):
+    filtered_df = df[
+        (df['Cidade'].isin(cidades_selecionadas)) &
+        (df['Categoria'].isin(categorias_selecionadas)) &
+        (df['Preço'] >= preco_range[0]) & (df['Preço'] <= preco_range[1]) &
+        (df['Avaliação'] >= aval_range[0]) & (df['Avaliação'] <= aval_range[1])
+    ]
 
 # Exibir resultados filtrados
 st.subheader("Resultados Filtrados")
-st.dataframe(filtered_df)
+with perfil.secao("serialização"):
+    st.dataframe(filtered_df)
 
 # Estatísticas
 st.subheader("Estatísticas")
 st.metric("Total de Registros", filtered_df.shape[0])
-st.metric("Média de Vendas", f"R$ {filtered_df['Vendas'].mean():.2f}")
+st.metric("Preço Médio", f"R$ {filtered_df['Preço'].mean():.2f}")
+
+perfil.finalizar()
@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+
+px = importar_tardio("plotly.express")
 
 st.title("Simulador de Investimento")
+perfil = iniciar_perfil("exerc3")
 
 # Parâmetros do investimento
 st.subheader("Parâmetros do Investimento")
@@ -47,7 +57,8 @@ def calcular_investimento(principal, taxa, anos):
     })
 
 # Calcular crescimento do investimento
-df_investimento = calcular_investimento(valor_inicial, taxa_juros, periodos)
+with perfil.secao("cálculo"):
+    df_investimento = calcular_investimento(valor_inicial, taxa_juros, periodos)
 
 # Resultados
 st.subheader("Resultados")
@@ -71,21 +82,25 @@ with col2:
 
 # Gráfico do crescimento
 st.subheader("Crescimento ao Longo do Tempo")
-fig = px.line(
-    df_investimento,
-    x='Ano',
-    y='Valor (R$)',
-    title='Crescimento do Investimento',
-    markers=True
-)
-fig.update_layout(
-    xaxis_title='Ano',
-    yaxis_title='Valor (R$)',
-    xaxis={'tickmode': 'linear', 'tick0': 0, 'dtick': max(1, periodos // 10)}
-)
-st.plotly_chart(fig, use_container_width=True)
+with perfil.secao("gráfico"):
+    fig = px.line(
+        df_investimento,
+        x='Ano',
+        y='Valor (R$)',
+        title='Crescimento do Investimento',
+        markers=True
+    )
+    fig.update_layout(
+        xaxis_title='Ano',
+        yaxis_title='Valor (R$)',
+        xaxis={'tickmode': 'linear', 'tick0': 0, 'dtick': max(1, periodos // 10)}
+    )
+with perfil.secao("serialização"):
+    st.plotly_chart(fig, use_container_width=True)
 
 # Tabela de valores
 with st.expander("Detalhes por Ano"):
     df_investimento['Valor (R$)'] = df_investimento['Valor (R$)'].round(2)
     st.dataframe(df_investimento, hide_index=True)
+
+perfil.finalizar()
@@ -1,14 +1,40 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos
+from comum.perfil import iniciar_perfil
 
 st.title("Mapa Interativo com Dados Geográficos")
+perfil = iniciar_perfil("exerc4")
+
+ESQUEMA_GEO = conjuntos.Esquema({
+    'cidade': 'category',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'categoria': 'category',
+    'valor': 'int64'
+})
 
 # Criar dados de exemplo para o mapa
-@st.cache_data
 def gerar_dados_geo():
     # Coordenadas aproximadas de algumas cidades brasileiras
-    
+    cidades = {
+        'São Paulo': (-23.5505, -46.6333),
+        'Rio de Janeiro': (-22.9068, -43.1729),
+        'Belo Horizonte': (-19.9167, -43.9345),
+        'Salvador': (-12.9714, -38.5014),
+        'Brasília': (-15.7939, -47.8828),
+        'Curitiba': (-25.4284, -49.2733),
+        'Recife': (-8.0476, -34.8770),
+        'Porto Alegre': (-30.0346, -51.2177)
+    }
+    dados = []
     
     for cidade, coords in cidades.items():
         # Adicionar entre 3 e 8 pontos para cada cidade
@@ -31,7 +57,8 @@ def gerar_dados_geo():
     return pd.DataFrame(dados)
 
 # Carregar dados
-dados_geo = gerar_dados_geo()
+with perfil.secao("carregamento"):
+    dados_geo = conjuntos.carregar("exerc4_geo", gerar_dados_geo, esquema=ESQUEMA_GEO)
 
 # Filtros
 st.sidebar.header("Filtros")
@@ -45,19 +72,21 @@ categorias_disponiveis = ['Todas'] + sorted(dados_geo['categoria'].unique().toli
 categoria_selecionada = st.sidebar.selectbox('Filtrar por Categoria:', categorias_disponiveis)
 
 # Aplicar filtros
-dados_filtrados = dados_geo.copy()
+with perfil.secao("filtro"):
+    dados_filtrados = dados_geo.copy()
 
-if cidade_selecionada != 'Todas':
-    dados_filtrados = dados_filtrados[dados_filtrados['cidade'] == cidade_selecionada]
+    if cidade_selecionada != 'Todas':
+        dados_filtrados = dados_filtrados[dados_filtrados['cidade'] == cidade_selecionada]
 
-if categoria_selecionada != 'Todas':
-    dados_filtrados = dados_filtrados[dados_filtrados['categoria'] == categoria_selecionada]
+    if categoria_selecionada != 'Todas':
+        dados_filtrados = dados_filtrados[dados_filtrados['categoria'] == categoria_selecionada]
 
 # Exibir informações
 st.write(f"Exibindo {len(dados_filtrados)} pontos no mapa")
 
 # Exibir mapa
-st.map(dados_filtrados)
+with perfil.secao("serialização"):
+    st.map(dados_filtrados)
 
 # Tabela de dados
 with st.expander("Ver detalhes dos pontos"):
@@ -72,3 +101,5 @@ with col1:
     st.metric("Total de pontos", len(dados_filtrados))
 with col2:
     st.metric("Valor médio", f"{dados_filtrados['valor'].mean():.2f}")
+
+perfil.finalizar()
@@ -1,6 +1,14 @@
 import streamlit as st
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum.perfil import iniciar_perfil
 
 st.title("Formulário com Validação e Resultados")
+perfil = iniciar_perfil("exerc5")
 
 # Função para limpar o formulário
 def limpar_formulario():
@@ -72,11 +80,12 @@ def validar_form(nome, idade, cores):
 
 # Exibir resultados ou erros após submissão
 if st.session_state.submit_pressed:
-    erros = validar_form(
-        st.session_state.nome,
-        st.session_state.idade,
-        st.session_state.cores
-    )
+    with perfil.secao("validação"):
+        erros = validar_form(
+            st.session_state.nome,
+            st.session_state.idade,
+            st.session_state.cores
+        )
     
     if erros:
         st.error("Por favor, corrija os seguintes erros:")
@@ -121,3 +130,5 @@ if st.session_state.submit_pressed:
             """
         
         st.markdown(cores_html, unsafe_allow_html=True)
+
+perfil.finalizar()
@@ -1,11 +1,23 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 from collections import Counter
+import io
+import os
 import re
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+
+figura_mpl = importar_tardio("matplotlib.figure")
+backend_agg = importar_tardio("matplotlib.backends.backend_agg")
+wc = importar_tardio("wordcloud")
 
 st.title("Análise de Texto com Processamento em Tempo Real")
+perfil = iniciar_perfil("exerc6")
 
 # Função para processar o texto
 def processar_texto(texto):
@@ -39,21 +51,53 @@ def processar_texto(texto):
                     'está', 'estamos', 'estão', 'estive', 'esteve', 'estivemos', 'estiveram'])
     
     palavras_filtradas = [p for p in palavras if p not in stopwords and len(p) > 2]
-    contador_filtrado = Counter(palavras_filtradas)
     
-    # Gerar nuvem de palavras
-    if palavras_filtradas:
-        wordcloud = WordCloud(
-            width=800, 
-            height=400, 
-            background_color='white',
-            colormap='viridis',
-            max_words=100
-        ).generate(' '.join(palavras_filtradas))
-    else:
-        wordcloud = None
+    # Texto da nuvem de palavras (a imagem é gerada e guardada em cache à parte)
+    texto_nuvem = ' '.join(palavras_filtradas) if palavras_filtradas else None
+    
+    return num_caracteres, num_palavras, palavras_frequentes, texto_nuvem
+
+# Opções da nuvem de palavras; entram na chave do cache junto com o texto
+OPCOES_NUVEM = {
+    'width': 800,
+    'height': 400,
+    'background_color': 'white',
+    'colormap': 'viridis',
+    'max_words': 100,
+}
+
+# Gerar a nuvem de palavras só uma vez por texto e opções. O cache guarda
+# o PNG, e não o array do to_array(): o array de 800x400 ocupa quase 1 MB,
+# e o st.image teria de recodificá-lo a cada rerun.
+@st.cache_data(max_entries=256)
+def renderizar_nuvem(texto_nuvem, opcoes):
+    imagem = wc.WordCloud(**opcoes).generate(texto_nuvem).to_image()
+    buffer = io.BytesIO()
+    imagem.save(buffer, format='png')
+    return buffer.getvalue()
+
+# Renderizar o gráfico de barras como PNG sem passar pelo pyplot.
+# Figure + FigureCanvasAgg não registra a figura no gerenciador global do
+# pyplot, então ela é liberada ao sair da função; o cache evita redesenhar
+# o mesmo gráfico a cada rerun.
+@st.cache_data(max_entries=256)
+def renderizar_barras(palavras_freq):
+    fig = figura_mpl.Figure(figsize=(10, 6))
+    backend_agg.FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.barh(
+        [p[0] for p in palavras_freq[:5]], 
+        [p[1] for p in palavras_freq[:5]],
+        color='skyblue'
+    )
+    ax.set_xlabel('Frequência')
+    ax.set_title('5 Palavras Mais Frequentes')
+    fig.tight_layout()
     
-    return num_caracteres, num_palavras, palavras_frequentes, wordcloud
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    fig.clear()
+    return buffer.getvalue()
 
 # Interface do usuário
 texto = st.text_area(
@@ -63,7 +107,8 @@ texto = st.text_area(
 )
 
 # Processar o texto em tempo real
-caracteres, palavras, palavras_freq, nuvem = processar_texto(texto)
+with perfil.secao("processamento do texto"):
+    caracteres, palavras, palavras_freq, texto_nuvem = processar_texto(texto)
 
 if caracteres is not None:
     # Exibir estatísticas básicas
@@ -84,16 +129,9 @@ if caracteres is not None:
         
         with col1:
             # Criar gráfico de barras
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.barh(
-                [p[0] for p in palavras_freq[:5]], 
-                [p[1] for p in palavras_freq[:5]],
-                color='skyblue'
-            )
-            ax.set_xlabel('Frequência')
-            ax.set_title('5 Palavras Mais Frequentes')
-            plt.tight_layout()
-            st.pyplot(fig)
+            with perfil.secao("gráfico"):
+                barras_png = renderizar_barras(palavras_freq)
+            st.image(barras_png, use_column_width=True)
             
         with col2:
             st.dataframe(df_palavras, hide_index=True)
@@ -102,12 +140,15 @@ if caracteres is not None:
     
     # Exibir nuvem de palavras
     st.subheader("Nuvem de Palavras")
-    if nuvem is not None:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.imshow(nuvem, interpolation='bilinear')
-        ax.axis('off')
-        st.pyplot(fig)
+    if texto_nuvem is not None:
+        with perfil.secao("nuvem de palavras"):
+            nuvem = renderizar_nuvem(texto_nuvem, OPCOES_NUVEM)
+        # A nuvem já é uma imagem: exibimos o array direto, sem figura do matplotlib
+        with perfil.secao("serialização"):
+            st.image(nuvem, use_column_width=True)
     else:
         st.info("Texto insuficiente para gerar uma nuvem de palavras.")
 else:
     st.info("Digite algum texto para iniciar a análise.")
+
+perfil.finalizar()
@@ -1,53 +1,130 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+from catalogo_filmes import EPOCAS, IndiceTitulos, assinatura_arquivo, ler_catalogo, recomendar
+from similaridade_filmes import IndiceLSH, montar_vetores
+from cache_recomendacoes import CacheRecomendacoes, mascara_preferencias
+
+px = importar_tardio("plotly.express")
+pio = importar_tardio("plotly.io")
 
 st.title("Sistema de Recomendação de Filmes")
+perfil = iniciar_perfil("exerc7")
 
-# Base de dados de filmes
-@st.cache_data
-def carregar_filmes():
-    filmes = {
-        "Ação": [
-            {"titulo": "Vingadores: Ultimato", "pontuacao_base": 92, "ano": 2019},
-            {"titulo": "Duro de Matar", "pontuacao_base": 88, "ano": 1988},
-            {"titulo": "Mad Max: Estrada da Fúria", "pontuacao_base": 91, "ano": 2015},
-            {"titulo": "John Wick", "pontuacao_base": 86, "ano": 2014},
-            {"titulo": "Velozes e Furiosos 7", "pontuacao_base": 82, "ano": 2015}
-        ],
-        "Comédia": [
-            {"titulo": "Superbad", "pontuacao_base": 85, "ano": 2007},
-            {"titulo": "O Grande Lebowski", "pontuacao_base": 90, "ano": 1998},
-            {"titulo": "Debi & Lóide", "pontuacao_base": 86, "ano": 1994},
-            {"titulo": "Borat", "pontuacao_base": 84, "ano": 2006},
-            {"titulo": "Deadpool", "pontuacao_base": 87, "ano": 2016}
-        ],
-        "Drama": [
-            {"titulo": "O Poderoso Chefão", "pontuacao_base": 95, "ano": 1972},
-            {"titulo": "Um Sonho de Liberdade", "pontuacao_base": 94, "ano": 1994},
-            {"titulo": "Cidade de Deus", "pontuacao_base": 91, "ano": 2002},
-            {"titulo": "Interestelar", "pontuacao_base": 89, "ano": 2014},
-            {"titulo": "Clube da Luta", "pontuacao_base": 92, "ano": 1999}
-        ],
-        "Ficção Científica": [
-            {"titulo": "Blade Runner 2049", "pontuacao_base": 90, "ano": 2017},
-            {"titulo": "Matriz", "pontuacao_base": 93, "ano": 1999},
-            {"titulo": "Duna", "pontuacao_base": 88, "ano": 2021},
-            {"titulo": "Star Wars: O Império Contra-Ataca", "pontuacao_base": 94, "ano": 1980},
-            {"titulo": "Chegada", "pontuacao_base": 89, "ano": 2016}
-        ],
-        "Terror": [
-            {"titulo": "O Iluminado", "pontuacao_base": 88, "ano": 1980},
-            {"titulo": "Hereditário", "pontuacao_base": 87, "ano": 2018},
-            {"titulo": "Um Lugar Silencioso", "pontuacao_base": 86, "ano": 2018},
-            {"titulo": "Invocação do Mal", "pontuacao_base": 85, "ano": 2013},
-            {"titulo": "Corra!", "pontuacao_base": 90, "ano": 2017}
-        ]
-    }
-    return filmes
+# Arquivo do catálogo (CSV ou Parquet), configurável por variável de ambiente
+CAMINHO_CATALOGO = os.environ.get(
+    "CATALOGO_FILMES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "filmes.csv")
+)
+
+# Catálogo colunar carregado uma vez por processo e compartilhado entre as
+# sessões. A assinatura do arquivo faz parte da chave: se o arquivo mudar,
+# o próximo rerun recarrega e a versão antiga sai do cache.
+@st.cache_resource(max_entries=1, show_spinner="Carregando catálogo de filmes...")
+def carregar_catalogo(caminho, assinatura):
+    return ler_catalogo(caminho)
+
+try:
+    assinatura_catalogo = assinatura_arquivo(CAMINHO_CATALOGO)
+except FileNotFoundError:
+    st.error(f"Arquivo do catálogo '{CAMINHO_CATALOGO}' não encontrado.")
+    st.stop()
+
+with perfil.secao("carregamento"):
+    catalogo = carregar_catalogo(CAMINHO_CATALOGO, assinatura_catalogo)
 
-filmes = carregar_filmes()
+# Índice de similaridade montado uma vez por processo. Embeddings de texto
+# calculados offline (arquivo .npy alinhado com o catálogo) são opcionais;
+# a assinatura deles também faz parte da chave, como a do catálogo.
+@st.cache_resource(max_entries=1)
+def carregar_indice_similaridade(caminho, assinatura, caminho_embeddings, assinatura_embeddings):
+    catalogo = carregar_catalogo(caminho, assinatura)
+    if caminho_embeddings is None:
+        return IndiceLSH(montar_vetores(catalogo)), None
+    try:
+        vetores = montar_vetores(catalogo, np.load(caminho_embeddings, mmap_mode="r"))
+    except ValueError as erro:
+        # Embeddings de outra versão do catálogo: seguir só com gênero, ano e pontuação
+        return IndiceLSH(montar_vetores(catalogo)), str(erro)
+    return IndiceLSH(vetores), None
+
+# Busca de títulos montada uma vez por versão do catálogo
+@st.cache_resource(max_entries=1)
+def carregar_indice_titulos(caminho, assinatura):
+    return IndiceTitulos(carregar_catalogo(caminho, assinatura).titulos)
+
+CAMINHO_EMBEDDINGS = os.environ.get("EMBEDDINGS_FILMES")
+MAXIMO_OPCOES_TITULO = 50
+
+modo = st.sidebar.radio(
+    "Modo de recomendação:",
+    ["Por preferências", "Semelhantes a um título"]
+)
+
+# Modo "Semelhantes a um título"
+if modo == "Semelhantes a um título":
+    st.sidebar.header("Título de Referência")
+    # Só os títulos que começam com o texto buscado vão para o navegador,
+    # não o catálogo inteiro
+    busca = st.sidebar.text_input("Buscar filme pelo início do título:")
+    with perfil.secao("busca de títulos"):
+        encontrados, total_encontrados = carregar_indice_titulos(CAMINHO_CATALOGO, assinatura_catalogo).buscar(
+            busca, limite=MAXIMO_OPCOES_TITULO
+        )
+    if total_encontrados == 0:
+        st.sidebar.warning("Nenhum título começa com esse texto.")
+        perfil.finalizar()
+        st.stop()
+    if total_encontrados > len(encontrados):
+        st.sidebar.caption(
+            f"Mostrando {len(encontrados)} de {total_encontrados:,} títulos; digite mais para refinar a busca."
+        )
+    # Cada opção aponta para uma posição do catálogo; títulos repetidos no
+    # mesmo ano levam a posição no rótulo para continuarem distintos
+    rotulos = [f"{catalogo.titulos[i]} ({catalogo.anos[i]})" for i in encontrados]
+    repetidos = {rotulo for rotulo in rotulos if rotulos.count(rotulo) > 1}
+    opcoes = {
+        (f"{rotulo} nº {i}" if rotulo in repetidos else rotulo): int(i)
+        for rotulo, i in zip(rotulos, encontrados)
+    }
+    indice_referencia = opcoes[st.sidebar.selectbox("Escolha um filme:", list(opcoes))]
+    titulo_referencia = catalogo.titulos[indice_referencia]
+    quantidade = st.sidebar.slider("Quantidade de sugestões", min_value=1, max_value=20, value=5)
+    
+    try:
+        assinatura_embeddings = assinatura_arquivo(CAMINHO_EMBEDDINGS) if CAMINHO_EMBEDDINGS else None
+    except FileNotFoundError:
+        assinatura_embeddings = None
+    
+    with perfil.secao("similaridade"):
+        indice_similaridade, erro_embeddings = carregar_indice_similaridade(
+            CAMINHO_CATALOGO, assinatura_catalogo,
+            CAMINHO_EMBEDDINGS if assinatura_embeddings else None, assinatura_embeddings
+        )
+        indices, similaridades = indice_similaridade.semelhantes(indice_referencia, k=quantidade)
+    if erro_embeddings:
+        st.warning(f"Embeddings ignorados ({erro_embeddings}); similaridade calculada só por gênero, ano e pontuação.")
+    
+    st.subheader(f"Filmes semelhantes a {titulo_referencia}")
+    semelhantes_df = pd.DataFrame({
+        "Título": catalogo.titulos[indices],
+        "Gênero": np.asarray(catalogo.generos, dtype=object)[catalogo.codigos_genero[indices]],
+        "Ano": catalogo.anos[indices],
+        "Pontuação": catalogo.pontuacoes[indices],
+        "Similaridade": similaridades
+    })
+    with perfil.secao("serialização"):
+        st.dataframe(semelhantes_df, hide_index=True, use_container_width=True)
+    perfil.finalizar()
+    st.stop()
 
 # Configurações de preferência
 st.sidebar.header("Suas Preferências")
@@ -55,67 +132,80 @@ st.sidebar.header("Suas Preferências")
 # Preferências de gênero
 st.sidebar.subheader("Gêneros de Filmes")
 generos_preferidos = {}
-for genero in filmes.keys():
+for genero in catalogo.generos:
     generos_preferidos[genero] = st.sidebar.checkbox(f"{genero}", key=f"genero_{genero}")
 
 # Preferências de época
 st.sidebar.subheader("Época")
-epocas = {
-    "Clássicos (Antes de 1990)": st.sidebar.checkbox("Clássicos (Antes de 1990)", value=True),
-    "Modernos (1990-2010)": st.sidebar.checkbox("Modernos (1990-2010)", value=True),
-    "Recentes (Após 2010)": st.sidebar.checkbox("Recentes (Após 2010)", value=True)
-}
+epocas = {epoca: st.sidebar.checkbox(epoca, value=True) for epoca in EPOCAS}
+
+# Cache de resultados compartilhado por todas as sessões do processo
+@st.cache_resource
+def obter_cache_recomendacoes():
+    return CacheRecomendacoes(capacidade=512)
+
+# Calcular o ranking e montar os gráficos de um perfil de preferências. Os
+# gráficos vão para o cache em JSON: cada exibição remonta a sua própria
+# figura, e o st.plotly_chart de uma sessão não altera a de outra
+def montar_resultado(generos_selecionados, epocas_selecionadas):
+    with perfil.secao("recomendação"):
+        recomendacoes = recomendar(catalogo, generos_selecionados, epocas_selecionadas, top_k=10)
+    if recomendacoes.total == 0:
+        return recomendacoes, None, None
+    
+    with perfil.secao("gráfico"):
+        # Gráfico de barras para as pontuações
+        fig = px.bar(
+            recomendacoes.top,
+            x='Título',
+            y='Pontuação',
+            color='Gênero',
+            title='Pontuação dos Filmes Recomendados',
+            hover_data=['Ano']
+        )
+        fig.update_layout(xaxis_title='Filme', yaxis_title='Pontuação')
+        
+        # Análise de gêneros
+        fig_pie = px.pie(
+            recomendacoes.contagem_generos, 
+            values='Quantidade', 
+            names='Gênero',
+            title='Distribuição de Gêneros nas Recomendações'
+        )
+    return recomendacoes, fig.to_json(), fig_pie.to_json()
 
 # Gerar recomendações
 def gerar_recomendacoes():
     # Verificar se pelo menos um gênero foi selecionado
     if not any(generos_preferidos.values()):
         st.warning("Selecione pelo menos um gênero para obter recomendações.")
-        return []
+        return None, None, None
     
-    recomendacoes = []
+    generos_selecionados = {genero for genero, selecionado in generos_preferidos.items() if selecionado}
+    epocas_selecionadas = {epoca for epoca, selecionada in epocas.items() if selecionada}
     
-    # Processar cada gênero selecionado
-    for genero, selecionado in generos_preferidos.items():
-        if selecionado:
-            for filme in filmes[genero]:
-                # Verificar se o filme se encaixa nas preferências de época
-                if (filme["ano"] < 1990 and epocas["Clássicos (Antes de 1990)"]) or \
-                   (1990 <= filme["ano"] <= 2010 and epocas["Modernos (1990-2010)"]) or \
-                   (filme["ano"] > 2010 and epocas["Recentes (Após 2010)"]):
-                    
-                    # Calcular pontuação ajustada com base nas preferências
-                    pontuacao_ajustada = filme["pontuacao_base"]
-                    
-                    # Adicionar dados do filme e pontuação às recomendações
-                    recomendacoes.append({
-                        "Título": filme["titulo"],
-                        "Gênero": genero,
-                        "Ano": filme["ano"],
-                        "Pontuação": pontuacao_ajustada
-                    })
-    
-    # Ordenar por pontuação
-    recomendacoes_df = pd.DataFrame(recomendacoes)
-    if not recomendacoes_df.empty:
-        recomendacoes_df = recomendacoes_df.sort_values("Pontuação", ascending=False)
-    
-    return recomendacoes_df
+    # Perfis iguais (mesma máscara de gêneros e épocas) reaproveitam o
+    # resultado calculado por qualquer sessão para a mesma versão do catálogo
+    chave = (assinatura_catalogo, mascara_preferencias(
+        catalogo.generos, generos_selecionados, EPOCAS, epocas_selecionadas
+    ))
+    return obter_cache_recomendacoes().obter_ou_calcular(
+        chave, lambda: montar_resultado(generos_selecionados, epocas_selecionadas)
+    )
 
 # Botão para gerar recomendações
 if st.sidebar.button("Gerar Recomendações"):
     with st.spinner("Gerando recomendações personalizadas..."):
-        recomendacoes_df = gerar_recomendacoes()
+        recomendacoes, fig_json, fig_pie_json = gerar_recomendacoes()
         
-        if not recomendacoes_df.empty:
-            st.success(f"Encontramos {len(recomendacoes_df)} filmes que correspondem às suas preferências!")
+        if recomendacoes is not None and recomendacoes.total > 0:
+            st.success(f"Encontramos {recomendacoes.total} filmes que correspondem às suas preferências!")
             
             # Exibir top recomendações
             st.subheader("Melhores Recomendações para Você")
             
-            # Mostrar os 10 melhores filmes ou todos se forem menos de 10
-            top_n = min(10, len(recomendacoes_df))
-            top_recomendacoes = recomendacoes_df.head(top_n)
+            # Os 10 melhores filmes (ou todos, se forem menos de 10)
+            top_recomendacoes = recomendacoes.top
             
             # Exibir cada recomendação em um cartão
             for i, (_, filme) in enumerate(top_recomendacoes.iterrows()):
@@ -131,31 +221,25 @@ if st.sidebar.button("Gerar Recomendações"):
             
             # Gráfico de barras para as pontuações
             st.subheader("Pontuações dos Filmes Recomendados")
-            fig = px.bar(
-                top_recomendacoes,
-                x='Título',
-                y='Pontuação',
-                color='Gênero',
-                title='Pontuação dos Filmes Recomendados',
-                hover_data=['Ano']
-            )
-            fig.update_layout(xaxis_title='Filme', yaxis_title='Pontuação')
-            st.plotly_chart(fig, use_container_width=True)
+            with perfil.secao("serialização"):
+                st.plotly_chart(pio.from_json(fig_json), use_container_width=True)
             
             # Análise de gêneros
             st.subheader("Distribuição por Gênero")
-            genero_counts = recomendacoes_df['Gênero'].value_counts().reset_index()
-            genero_counts.columns = ['Gênero', 'Quantidade']
-            
-            fig_pie = px.pie(
-                genero_counts, 
-                values='Quantidade', 
-                names='Gênero',
-                title='Distribuição de Gêneros nas Recomendações'
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            with perfil.secao("serialização"):
+                st.plotly_chart(pio.from_json(fig_pie_json), use_container_width=True)
         
-        else:
+        elif recomendacoes is not None:
             st.warning("Nenhum filme encontrado com as preferências selecionadas. Tente selecionar mais gêneros ou épocas.")
 else:
     st.info("Selecione suas preferências de filmes no menu lateral e clique em 'Gerar Recomendações'.")
+
+# Métricas do cache de recomendações
+with st.sidebar.expander("Cache de recomendações"):
+    metricas_cache = obter_cache_recomendacoes().metricas()
+    st.write(f"**Entradas:** {metricas_cache['entradas']}/{metricas_cache['capacidade']}")
+    st.write(f"**Acertos:** {metricas_cache['acertos']} | **Falhas:** {metricas_cache['falhas']}")
+    st.write(f"**Remoções:** {metricas_cache['remocoes']}")
+    st.write(f"**Taxa de acerto:** {metricas_cache['taxa_acerto']:.1%}")
+
+perfil.finalizar()
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+
+def mascara_preferencias(generos, generos_selecionados, epocas, epocas_selecionadas):
+    """
+    Codifica uma combinação de preferências como um inteiro: um bit por
+    gênero seguido de um bit por época. Perfis iguais geram a mesma máscara,
+    independentemente da ordem em que os checkboxes foram marcados.
+    """
+    mascara = 0
+    for bit, genero in enumerate(generos):
+        if genero in generos_selecionados:
+            mascara |= 1 << bit
+    for bit, epoca in enumerate(epocas, start=len(generos)):
+        if epoca in epocas_selecionadas:
+            mascara |= 1 << bit
+    return mascara
+
+
+class CacheRecomendacoes:
+    """
+    Cache LRU compartilhado pelo processo inteiro, protegido por lock.
+
+    Guarda para cada chave o resultado já pronto para exibir (ranking e
+    gráficos) e conta acertos, falhas e remoções para acompanhar a taxa de
+    acerto. Os valores são entregues a todas as sessões sem cópia, então
+    devem ser imutáveis ou não ser alterados por quem os recebe (o exerc7
+    guarda os gráficos em JSON, e não as figuras).
+    """
+
+    def __init__(self, capacidade=512):
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter_ou_calcular(self, chave, calcular):
+        with self._lock:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave]
+            self.falhas += 1
+
+        # Calcular fora do lock para não bloquear as outras sessões; se duas
+        # sessões calcularem a mesma chave ao mesmo tempo, a segunda só
+        # sobrescreve um valor idêntico.
+        valor = calcular()
+
+        with self._lock:
+            self._entradas[chave] = valor
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self.remocoes += 1
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def metricas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "capacidade": self.capacidade,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,163 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Épocas na mesma ordem dos checkboxes da barra lateral
+EPOCAS = (
+    "Clássicos (Antes de 1990)",
+    "Modernos (1990-2010)",
+    "Recentes (Após 2010)",
+)
+
+
+def classificar_epoca(anos):
+    """Converte anos no código da época (índice em EPOCAS)"""
+    anos = np.asarray(anos)
+    return np.where(anos < 1990, 0, np.where(anos <= 2010, 1, 2)).astype(np.int8)
+
+
+@dataclass(frozen=True)
+class CatalogoFilmes:
+    """Catálogo em formato colunar: um array por atributo, alinhados por posição"""
+    generos: tuple
+    titulos: np.ndarray
+    codigos_genero: np.ndarray
+    anos: np.ndarray
+    pontuacoes: np.ndarray
+    epocas: np.ndarray
+
+    def __len__(self):
+        return len(self.titulos)
+
+
+@dataclass(frozen=True)
+class Recomendacoes:
+    """Resultado de uma consulta: os melhores filmes e o resumo do conjunto completo"""
+    top: pd.DataFrame
+    total: int
+    contagem_generos: pd.DataFrame
+
+
+def construir_catalogo(generos, titulos, codigos_genero, anos, pontuacoes):
+    """Monta o catálogo colunar com os códigos de época pré-calculados"""
+    anos = np.asarray(anos, dtype=np.int16)
+    return CatalogoFilmes(
+        generos=tuple(generos),
+        titulos=np.asarray(titulos, dtype=object),
+        codigos_genero=np.asarray(codigos_genero, dtype=np.int16),
+        anos=anos,
+        pontuacoes=np.asarray(pontuacoes, dtype=np.float32),
+        epocas=classificar_epoca(anos),
+    )
+
+
+class IndiceTitulos:
+    """
+    Busca de títulos por prefixo, sem diferenciar maiúsculas de minúsculas.
+
+    Os títulos normalizados ficam ordenados junto com a posição de cada um
+    no catálogo, então os que começam com um texto formam uma fatia
+    encontrada com searchsorted, sem percorrer o catálogo. Títulos
+    repetidos continuam separados, cada um com a sua posição.
+    """
+
+    def __init__(self, titulos):
+        normalizados = pd.Series(titulos, dtype=object).fillna("").astype(str).str.casefold().to_numpy(dtype=object)
+        self.ordem = np.argsort(normalizados, kind="stable")
+        self.chaves = normalizados[self.ordem]
+
+    def buscar(self, texto, limite=50):
+        """Retorna (posições no catálogo, total de títulos que começam com o texto)"""
+        prefixo = texto.strip().casefold()
+        inicio = np.searchsorted(self.chaves, prefixo, side="left")
+        fim = np.searchsorted(self.chaves, prefixo + "\U0010ffff", side="left")
+        return self.ordem[inicio:min(fim, inicio + limite)], int(fim - inicio)
+
+
+def assinatura_arquivo(caminho):
+    """
+    Identifica a versão do arquivo do catálogo sem lê-lo.
+
+    O par (mtime, tamanho) muda sempre que o arquivo é reescrito, então
+    serve de chave de cache: enquanto a assinatura for a mesma, o catálogo
+    já carregado continua válido.
+    """
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
+
+
+def ler_catalogo(caminho):
+    """
+    Lê o catálogo de um arquivo CSV ou Parquet com as colunas
+    titulo, genero, ano e pontuacao_base.
+
+    Só as colunas usadas são lidas e o gênero vira categoria, então o
+    arquivo é convertido direto nos arrays compactos do catálogo colunar.
+    """
+    colunas = ["titulo", "genero", "ano", "pontuacao_base"]
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".parquet":
+        df = pd.read_parquet(caminho, columns=colunas)
+    elif extensao == ".csv":
+        df = pd.read_csv(
+            caminho,
+            usecols=colunas,
+            dtype={"titulo": object, "genero": "category", "ano": np.int16, "pontuacao_base": np.float32},
+        )
+    else:
+        raise ValueError(f"Formato de catálogo não suportado: {extensao}")
+
+    # Gêneros na ordem em que aparecem no arquivo
+    codigos, generos = pd.factorize(df["genero"])
+    return construir_catalogo(generos, df["titulo"].to_numpy(dtype=object), codigos,
+                              df["ano"].to_numpy(), df["pontuacao_base"].to_numpy())
+
+
+def recomendar(catalogo, generos_selecionados, epocas_selecionadas, top_k=10):
+    """
+    Seleciona os filmes dos gêneros e épocas escolhidos e retorna os top_k
+    de maior pontuação.
+
+    A seleção é feita com máscaras vetorizadas (uma tabela de consulta por
+    gênero e outra por época) e o ranking usa argpartition, então só os
+    top_k candidatos (mais os empatados com o k-ésimo) são ordenados.
+    Empates ficam com o filme que vem antes no catálogo.
+    """
+    mascara_generos = np.array([g in generos_selecionados for g in catalogo.generos], dtype=bool)
+    mascara_epocas = np.array([e in epocas_selecionadas for e in EPOCAS], dtype=bool)
+
+    mascara = mascara_generos[catalogo.codigos_genero] & mascara_epocas[catalogo.epocas]
+    indices = np.flatnonzero(mascara)
+    total = len(indices)
+
+    pontuacoes = catalogo.pontuacoes[indices]
+    if total > top_k:
+        # argpartition escolhe arbitrariamente entre os empatados com o
+        # k-ésimo; todos eles entram no desempate abaixo
+        parciais = np.argpartition(-pontuacoes, top_k - 1)[:top_k]
+        indices_top = indices[pontuacoes >= pontuacoes[parciais].min()]
+    else:
+        indices_top = indices
+
+    # Ordenar por pontuação decrescente, desempatando pela posição no catálogo
+    ordem = np.lexsort((indices_top, -catalogo.pontuacoes[indices_top]))
+    indices_top = indices_top[ordem][:top_k]
+
+    top = pd.DataFrame({
+        "Título": catalogo.titulos[indices_top],
+        "Gênero": np.asarray(catalogo.generos, dtype=object)[catalogo.codigos_genero[indices_top]],
+        "Ano": catalogo.anos[indices_top],
+        "Pontuação": catalogo.pontuacoes[indices_top],
+    })
+
+    contagens = np.bincount(catalogo.codigos_genero[indices], minlength=len(catalogo.generos))
+    contagem_generos = pd.DataFrame({
+        "Gênero": catalogo.generos,
+        "Quantidade": contagens,
+    })
+    contagem_generos = contagem_generos[contagem_generos["Quantidade"] > 0]
+    contagem_generos = contagem_generos.sort_values("Quantidade", ascending=False, kind="stable")
+
+    return Recomendacoes(top=top, total=total, contagem_generos=contagem_generos.reset_index(drop=True))
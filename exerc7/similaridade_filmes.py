@@ -0,0 +1,114 @@
+import numpy as np
+
+
+def montar_vetores(catalogo, embeddings=None, peso_embeddings=1.0):
+    """
+    Monta a matriz de características dos filmes (uma linha por filme).
+
+    Cada linha concatena o one-hot do gênero, o ano e a pontuação
+    padronizados e, opcionalmente, embeddings de texto calculados offline
+    (alinhados com as linhas do catálogo). As linhas são normalizadas para
+    que o produto interno seja a similaridade de cosseno.
+    """
+    n = len(catalogo)
+    one_hot = np.zeros((n, len(catalogo.generos)), dtype=np.float32)
+    one_hot[np.arange(n), catalogo.codigos_genero] = 1.0
+
+    def padronizar(valores):
+        valores = valores.astype(np.float32)
+        desvio = valores.std()
+        return (valores - valores.mean()) / (desvio if desvio > 0 else 1.0)
+
+    partes = [one_hot, padronizar(catalogo.anos)[:, None], padronizar(catalogo.pontuacoes)[:, None]]
+
+    if embeddings is not None:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape[0] != n:
+            raise ValueError(
+                f"Embeddings com {embeddings.shape[0]} linhas para um catálogo de {n} filmes"
+            )
+        normas = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        partes.append(peso_embeddings * embeddings / np.where(normas > 0, normas, 1.0))
+
+    vetores = np.hstack(partes)
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    return vetores / np.where(normas > 0, normas, 1.0)
+
+
+class IndiceLSH:
+    """
+    Índice aproximado de vizinhos mais próximos por projeções aleatórias.
+
+    Cada tabela sorteia n_bits hiperplanos e agrupa os filmes pelo lado de
+    cada hiperplano em que caem (um código inteiro por filme). Os códigos
+    ficam ordenados, então um balde é uma fatia encontrada com
+    searchsorted. Na consulta, os candidatos dos baldes do filme (e dos
+    baldes a um bit de distância, se faltarem candidatos) são reordenados
+    pela similaridade exata.
+    """
+
+    def __init__(self, vetores, n_tabelas=8, n_bits=None, tamanho_balde=64, semente=42):
+        self.vetores = vetores
+        n, dimensao = vetores.shape
+        if n_bits is None:
+            n_bits = int(np.clip(np.log2(max(n / tamanho_balde, 1)), 1, 24))
+        self.n_bits = n_bits
+
+        gerador = np.random.default_rng(semente)
+        self.planos = gerador.standard_normal((n_tabelas, dimensao, n_bits)).astype(np.float32)
+        self.pesos_bits = (1 << np.arange(n_bits)).astype(np.int64)
+
+        self.ordens = []
+        self.codigos_ordenados = []
+        for planos in self.planos:
+            codigos = self._codificar(vetores, planos)
+            ordem = np.argsort(codigos, kind="stable")
+            self.ordens.append(ordem)
+            self.codigos_ordenados.append(codigos[ordem])
+
+    def _codificar(self, vetores, planos):
+        return (vetores @ planos > 0).astype(np.int64) @ self.pesos_bits
+
+    def _balde(self, tabela, codigo):
+        codigos = self.codigos_ordenados[tabela]
+        inicio = np.searchsorted(codigos, codigo, side="left")
+        fim = np.searchsorted(codigos, codigo, side="right")
+        return self.ordens[tabela][inicio:fim]
+
+    def _candidatos(self, vetor, minimo):
+        codigos = [int(self._codificar(vetor[None, :], planos)[0]) for planos in self.planos]
+        candidatos = np.unique(np.concatenate([
+            self._balde(tabela, codigo) for tabela, codigo in enumerate(codigos)
+        ]))
+        if len(candidatos) >= minimo:
+            return candidatos
+
+        # Poucos candidatos: sondar também os baldes vizinhos (um bit trocado)
+        vizinhos = [
+            self._balde(tabela, codigo ^ int(peso))
+            for tabela, codigo in enumerate(codigos)
+            for peso in self.pesos_bits
+        ]
+        return np.unique(np.concatenate([candidatos, *vizinhos]))
+
+    def consultar(self, vetor, k=10, excluir=None):
+        """Retorna (índices, similaridades) dos k filmes mais parecidos com o vetor"""
+        minimo = k + (0 if excluir is None else 1)
+        candidatos = self._candidatos(vetor, minimo)
+        if len(candidatos) < minimo:
+            # Catálogo pequeno ou região esparsa: recorrer à busca exata
+            candidatos = np.arange(len(self.vetores))
+        if excluir is not None:
+            candidatos = candidatos[candidatos != excluir]
+
+        similaridades = self.vetores[candidatos] @ vetor
+        if len(candidatos) > k:
+            parciais = np.argpartition(-similaridades, k - 1)[:k]
+            candidatos, similaridades = candidatos[parciais], similaridades[parciais]
+
+        ordem = np.lexsort((candidatos, -similaridades))
+        return candidatos[ordem], similaridades[ordem]
+
+    def semelhantes(self, indice, k=10):
+        """Filmes mais parecidos com o filme na posição indice do catálogo"""
+        return self.consultar(self.vetores[indice], k=k, excluir=indice)
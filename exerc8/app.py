@@ -1,16 +1,53 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+from modelo_notas import amostra_uniforme, carregar_ou_treinar, prever_lote, treinar_incremental_arquivo
+from superficie_notas import SuperficiePrevisao
+from reducao_pontos import agregacao_voxels, amostragem_estratificada
+from avaliacao_modelos import VARIANTES, validacao_cruzada
+
+px = importar_tardio("plotly.express")
+go = importar_tardio("plotly.graph_objects")
+
+# Diretório onde os modelos treinados são persistidos
+DIRETORIO_ARTEFATOS = os.environ.get(
+    "ARTEFATOS_MODELO_NOTAS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "artefatos")
+)
+
+# Arquivo CSV de treino opcional, que pode ser maior que a memória.
+# Sem ele, o modelo é treinado com os dados de exemplo.
+CAMINHO_TREINO = os.environ.get("DADOS_TREINO_NOTAS")
+
+# Quantidade de linhas do arquivo de treino usadas nos gráficos
+TAMANHO_AMOSTRA_VISUALIZACAO = 200_000
+
+# Faixas e passos dos widgets de entrada (também definem a grade de previsões)
+HORAS_MIN, HORAS_MAX, PASSO_HORAS = 1.0, 10.0, 0.5
+NOTA_MIN, NOTA_MAX, PASSO_NOTA = 0.0, 10.0, 0.5
 
 st.title("Aplicativo de Previsão de Notas")
 st.write("Este aplicativo prevê a nota final com base nas horas de estudo e notas anteriores.")
+perfil = iniciar_perfil("exerc8")
+
+ESQUEMA_NOTAS = conjuntos.Esquema({
+    'horas_estudo': 'float64',
+    'nota_anterior': 'float64',
+    'nota_final': 'float64'
+})
 
 # Criar dados de exemplo para o modelo
-@st.cache_data
 def gerar_dados_exemplo():
     np.random.seed(42)
     horas_estudo = np.random.uniform(1, 10, 100)
@@ -30,39 +67,135 @@ def gerar_dados_exemplo():
     
     return df
 
-dados = gerar_dados_exemplo()
+# Modelo treinado uma vez por versão dos dados, persistido em disco e
+# compartilhado entre as sessões do processo
+@st.cache_resource(show_spinner="Carregando modelo...")
+def carregar_modelo():
+    return carregar_ou_treinar(carregar_dados_exemplo(), DIRETORIO_ARTEFATOS)
+
+# Com arquivo de treino: o modelo é atualizado só com as linhas novas
+# sempre que o arquivo muda (a assinatura faz parte da chave do cache)
+@st.cache_resource(max_entries=1, show_spinner="Treinando modelo com o arquivo de dados...")
+def carregar_modelo_arquivo(caminho, assinatura):
+    return treinar_incremental_arquivo(caminho, DIRETORIO_ARTEFATOS)
 
-# Treinar modelo de regressão linear
-X = dados[['horas_estudo', 'nota_anterior']]
-y = dados['nota_final']
+def carregar_dados_exemplo():
+    return conjuntos.carregar("exerc8_exemplo", gerar_dados_exemplo, esquema=ESQUEMA_NOTAS)
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+# Amostra refeita só quando o arquivo muda (data de modificação e tamanho)
+def carregar_amostra_arquivo(caminho):
+    with st.spinner("Amostrando dados para visualização..."):
+        return conjuntos.carregar(
+            "exerc8_amostra",
+            lambda caminho: amostra_uniforme(caminho, TAMANHO_AMOSTRA_VISUALIZACAO),
+            caminho,
+            esquema=ESQUEMA_NOTAS,
+            parametros=(TAMANHO_AMOSTRA_VISUALIZACAO,)
+        )
 
-modelo = LinearRegression()
-modelo.fit(X_train, y_train)
+with perfil.secao("carregamento"):
+    if CAMINHO_TREINO:
+        try:
+            info_arquivo = os.stat(CAMINHO_TREINO)
+            assinatura_treino = (info_arquivo.st_mtime_ns, info_arquivo.st_size)
+            artefato = carregar_modelo_arquivo(CAMINHO_TREINO, assinatura_treino)
+            dados = carregar_amostra_arquivo(CAMINHO_TREINO)
+        except (OSError, ValueError) as e:
+            st.error(f"Erro ao treinar com o arquivo '{CAMINHO_TREINO}': {e}")
+            perfil.finalizar()
+            st.stop()
+    else:
+        artefato = carregar_modelo()
+        dados = carregar_dados_exemplo()
+
+modelo = artefato["modelo"]
+
+# Superfície de previsões da grade de entradas, calculada uma vez por versão do modelo
+@st.cache_resource(max_entries=4)
+def carregar_superficie(versao, _modelo):
+    return SuperficiePrevisao(
+        _modelo,
+        horas=np.arange(HORAS_MIN, HORAS_MAX + PASSO_HORAS / 2, PASSO_HORAS),
+        notas=np.arange(NOTA_MIN, NOTA_MAX + PASSO_NOTA / 2, PASSO_NOTA),
+        x_linha=np.linspace(HORAS_MIN, HORAS_MAX, 100)
+    )
+
+# Gráficos com os dados originais, montados uma vez por versão do modelo e
+# configuração de exibição; a cada interação só o ponto da previsão (e a
+# linha de regressão) é acrescentado
+COLUNAS_3D = ['horas_estudo', 'nota_anterior', 'nota_final']
+MODOS_3D = ["Amostragem estratificada", "Agregação em voxels", "Todos os pontos"]
+
+@st.cache_resource(max_entries=16)
+def montar_figura_3d(versao, modo, orcamento, _dados):
+    if modo == "Agregação em voxels":
+        pontos = agregacao_voxels(_dados, COLUNAS_3D, orcamento)
+        fig = px.scatter_3d(pontos, x='horas_estudo', y='nota_anterior', z='nota_final',
+                           size='quantidade', size_max=18, hover_data=['quantidade'],
+                           color_discrete_sequence=['blue'],
+                           opacity=0.7, title="Relação entre Horas de Estudo, Nota Anterior e Nota Final")
+    else:
+        if modo == "Amostragem estratificada":
+            pontos = amostragem_estratificada(_dados, COLUNAS_3D, orcamento)
+        else:
+            pontos = _dados
+        # Gráfico 3D com Plotly
+        fig = px.scatter_3d(pontos, x='horas_estudo', y='nota_anterior', z='nota_final',
+                           color_discrete_sequence=['blue'],
+                           opacity=0.7, title="Relação entre Horas de Estudo, Nota Anterior e Nota Final")
+    fig.update_traces(name='Dados Originais', showlegend=True)
+    
+    fig.update_layout(scene=dict(xaxis_title='Horas de Estudo',
+                                yaxis_title='Nota Anterior',
+                                zaxis_title='Nota Final'),
+                     width=800, height=600)
+    
+    # Tamanho aproximado do que é enviado ao navegador
+    return fig, len(pontos), len(fig.to_json())
+
+@st.cache_resource(max_entries=16)
+def montar_figura_2d(versao, orcamento, _dados):
+    # Gráfico de dispersão 2D com a linha de regressão
+    pontos = amostragem_estratificada(_dados, ['horas_estudo', 'nota_final'], orcamento)
+    return px.scatter(pontos, x='horas_estudo', y='nota_final', 
+                     title="Relação entre Horas de Estudo e Nota Final",
+                     labels={'horas_estudo': 'Horas de Estudo', 'nota_final': 'Nota Final'})
+
+with perfil.secao("previsão"):
+    superficie = carregar_superficie(artefato["versao"], modelo)
 
 # Interface para inserção de dados
 st.sidebar.header("Parâmetros de Entrada")
 
 horas_estudo = st.sidebar.slider(
     "Horas de estudo por semana",
-    min_value=1.0,
-    max_value=10.0,
+    min_value=HORAS_MIN,
+    max_value=HORAS_MAX,
     value=5.0,
-    step=0.5
+    step=PASSO_HORAS
 )
 
 nota_anterior = st.sidebar.number_input(
     "Nota anterior (0-10)",
-    min_value=0.0,
-    max_value=10.0,
+    min_value=NOTA_MIN,
+    max_value=NOTA_MAX,
     value=7.0,
-    step=0.5
+    step=PASSO_NOTA
 )
 
-# Fazer previsão
-entrada = np.array([[horas_estudo, nota_anterior]])
-previsao = modelo.predict(entrada)[0]
+# Exibição do gráfico 3D
+st.sidebar.header("Visualização 3D")
+modo_3d = st.sidebar.radio("Modo de exibição dos pontos:", MODOS_3D)
+orcamento_pontos = st.sidebar.select_slider(
+    "Orçamento de pontos",
+    options=[500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000],
+    value=5_000,
+    disabled=modo_3d == "Todos os pontos"
+)
+
+# Fazer previsão (consulta na superfície pré-calculada)
+with perfil.secao("previsão"):
+    previsao = superficie.prever(horas_estudo, nota_anterior)
 
 # Exibir resultados
 st.header("Resultados da Previsão")
@@ -75,56 +208,47 @@ with col1:
 with col2:
     st.metric("Previsão de Nota Final", f"{previsao:.2f}")
 
-# Avaliação do modelo
-y_pred_test = modelo.predict(X_test)
-r2 = r2_score(y_test, y_pred_test)
-rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
-
-st.write(f"Coeficiente de determinação (R²): {r2:.2f}")
-st.write(f"Erro médio quadrático (RMSE): {rmse:.2f}")
+# Avaliação do modelo (calculada no treino e salva junto com o artefato)
+st.write(f"Coeficiente de determinação (R²): {artefato['r2']:.2f}")
+st.write(f"Erro médio quadrático (RMSE): {artefato['rmse']:.2f}")
+st.caption(f"Versão do modelo: {artefato['versao']} | treinado em {artefato['treinado_em']}")
 
 # Gráfico comparativo
 st.header("Visualização dos Dados")
 
-# Adicionar o ponto da previsão aos dados
-novo_ponto = pd.DataFrame({
-    'horas_estudo': [horas_estudo],
-    'nota_anterior': [nota_anterior],
-    'nota_final': [previsao],
-    'tipo': ['Previsão']
-})
-
-dados_viz = dados.copy()
-dados_viz['tipo'] = 'Dados Originais'
-dados_viz_completo = pd.concat([dados_viz, novo_ponto])
-
-# Gráfico 3D com Plotly
-fig = px.scatter_3d(dados_viz_completo, x='horas_estudo', y='nota_anterior', z='nota_final',
-                   color='tipo', color_discrete_map={'Dados Originais': 'blue', 'Previsão': 'red'},
-                   opacity=0.7, title="Relação entre Horas de Estudo, Nota Anterior e Nota Final")
+with perfil.secao("gráfico"):
+    fig_base, pontos_3d, bytes_3d = montar_figura_3d(artefato["versao"], modo_3d, orcamento_pontos, dados)
+    fig2_base = montar_figura_2d(artefato["versao"], orcamento_pontos, dados)
 
-fig.update_layout(scene=dict(xaxis_title='Horas de Estudo',
-                            yaxis_title='Nota Anterior',
-                            zaxis_title='Nota Final'),
-                 width=800, height=600)
+    # Adicionar o ponto da previsão ao gráfico 3D
+    fig = go.Figure(fig_base)
+    fig.add_scatter3d(x=[horas_estudo], y=[nota_anterior], z=[previsao], mode='markers',
+                      marker=dict(color='red'), opacity=0.7, name='Previsão')
 
-st.plotly_chart(fig)
-
-# Gráfico de dispersão 2D com a linha de regressão
-fig2 = px.scatter(dados, x='horas_estudo', y='nota_final', 
-                 title="Relação entre Horas de Estudo e Nota Final",
-                 labels={'horas_estudo': 'Horas de Estudo', 'nota_final': 'Nota Final'})
+with perfil.secao("serialização"):
+    st.plotly_chart(fig)
+# Com arquivo de treino, `dados` é só a amostra de visualização; o total é
+# o número de linhas que o modelo já leu do arquivo (treino e teste)
+if CAMINHO_TREINO:
+    origem_pontos = f"{modelo.linhas_vistas:,} (amostra de {len(dados):,})"
+else:
+    origem_pontos = f"{len(dados):,}"
+st.caption(
+    f"{pontos_3d:,} pontos exibidos de {origem_pontos} | carga do gráfico: {bytes_3d / 1024:,.0f} KB".replace(",", ".")
+)
 
-# Adicionar linha de tendência
-x_range = np.linspace(1, 10, 100)
-y_pred = modelo.predict(np.column_stack((x_range, np.ones(100) * nota_anterior)))
-fig2.add_scatter(x=x_range, y=y_pred, mode='lines', name='Linha de Regressão')
+with perfil.secao("gráfico"):
+    # Adicionar linha de tendência
+    fig2 = go.Figure(fig2_base)
+    fig2.add_scatter(x=superficie.x_linha, y=superficie.linha_regressao(nota_anterior),
+                     mode='lines', name='Linha de Regressão')
 
-# Adicionar ponto da previsão
-fig2.add_scatter(x=[horas_estudo], y=[previsao], mode='markers', 
-                marker=dict(size=12, color='red'), name='Sua Previsão')
+    # Adicionar ponto da previsão
+    fig2.add_scatter(x=[horas_estudo], y=[previsao], mode='markers', 
+                    marker=dict(size=12, color='red'), name='Sua Previsão')
 
-st.plotly_chart(fig2)
+with perfil.secao("serialização"):
+    st.plotly_chart(fig2)
 
 # Explicação do modelo
 st.header("Interpretação do Modelo")
@@ -137,3 +261,87 @@ Esta interpretação significa que:
 - Para cada hora adicional de estudo, espera-se um aumento médio de {:.2f} pontos na nota final.
 - Para cada ponto adicional na nota anterior, espera-se um aumento médio de {:.2f} pontos na nota final.
 """.format(modelo.coef_[0], modelo.coef_[1]))
+
+# Previsão em lote a partir de um CSV
+st.header("Previsão em Lote")
+st.write("Envie um CSV com as colunas `horas_estudo` e `nota_anterior` para prever a nota de vários alunos de uma vez.")
+
+arquivo_lote = st.file_uploader("Arquivo CSV de alunos", type="csv")
+tamanho_bloco = st.select_slider(
+    "Linhas por bloco",
+    options=[10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000],
+    value=250_000
+)
+
+if arquivo_lote is not None and st.button("Calcular Previsões em Lote"):
+    # Os blocos previstos vão direto para um arquivo em disco, e não para um
+    # buffer em memória: a única cópia completa do resultado é a que o
+    # Streamlit guarda para o download
+    descritor, caminho_resultado = tempfile.mkstemp(prefix="previsoes_notas_", suffix=".csv")
+    progresso = st.empty()
+    inicio = time.perf_counter()
+    try:
+        linhas = 0
+        with os.fdopen(descritor, "wb") as resultado, perfil.secao("previsão em lote"):
+            for linhas in prever_lote(modelo, arquivo_lote, resultado, tamanho_bloco=tamanho_bloco):
+                progresso.write(f"{linhas:,} linhas processadas...".replace(",", "."))
+        duracao = time.perf_counter() - inicio
+    except ValueError as e:
+        progresso.empty()
+        st.error(f"Erro ao processar o arquivo: {e}")
+    else:
+        progresso.empty()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Linhas", f"{linhas:,}".replace(",", "."))
+        col2.metric("Tempo", f"{duracao:.2f} s")
+        col3.metric("Vazão", f"{linhas / duracao if duracao > 0 else 0:,.0f} linhas/s".replace(",", "."))
+        
+        with open(caminho_resultado, "rb") as previsoes:
+            st.download_button(
+                label="Baixar previsões (CSV)",
+                data=previsoes,
+                file_name="previsoes_notas.csv",
+                mime="text/csv"
+            )
+    finally:
+        os.unlink(caminho_resultado)
+
+# Avaliação de variantes do modelo com validação cruzada
+st.header("Avaliação de Modelos")
+st.write(
+    f"Compara {len(VARIANTES)} variantes (regressão linear, Ridge e Lasso com "
+    "características polinomiais de grau 1 a 3) usando validação cruzada em paralelo."
+)
+
+# Ranking guardado por versão do modelo e número de dobras, junto com o
+# tempo de relógio da avaliação que o calculou
+@st.cache_data(max_entries=8, show_spinner=False)
+def avaliar_variantes(versao, k, _dados):
+    inicio = time.perf_counter()
+    ranking = validacao_cruzada(_dados, k=k, n_jobs=-1, diretorio_cache=DIRETORIO_ARTEFATOS)
+    return ranking, time.perf_counter() - inicio
+
+k_dobras = st.slider("Número de dobras (k)", min_value=3, max_value=10, value=5)
+
+if st.button("Executar Validação Cruzada"):
+    with st.spinner(f"Avaliando {len(VARIANTES) * k_dobras} combinações em {os.cpu_count()} núcleos..."):
+        with perfil.secao("validação cruzada"):
+            ranking, duracao = avaliar_variantes(artefato["versao"], k_dobras, dados)
+    
+    st.subheader("Ranking das Variantes")
+    st.dataframe(ranking, hide_index=True, use_container_width=True)
+    melhor = ranking.iloc[0]
+    st.success(
+        f"Melhor variante: {melhor['Modelo']} (grau {melhor['Grau']}"
+        + (f", alpha {melhor['Alpha']}" if pd.notna(melhor['Alpha']) else "")
+        + f") com RMSE médio de {melhor['RMSE_medio']:.3f}"
+    )
+    # Tempos da mesma avaliação: o de relógio e o somado das dobras (que,
+    # para as dobras lidas do cache em disco, é só o tempo da leitura)
+    dobras_em_cache = int(ranking["Dobras_em_cache"].sum())
+    st.caption(
+        f"Tempo total: {duracao:.2f} s | tempo somado das dobras: {ranking['Segundos'].sum():.2f} s"
+        + (f" | {dobras_em_cache} de {len(VARIANTES) * k_dobras} dobras lidas do cache" if dobras_em_cache else "")
+    )
+
+perfil.finalizar()
@@ -0,0 +1,121 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from comum.importacao_tardia import importar_tardio
+from modelo_notas import COLUNA_ALVO, COLUNAS_ENTRADA
+
+joblib = importar_tardio("joblib")
+linear_model = importar_tardio("sklearn.linear_model")
+metricas = importar_tardio("sklearn.metrics")
+selecao = importar_tardio("sklearn.model_selection")
+pipeline = importar_tardio("sklearn.pipeline")
+preprocessamento = importar_tardio("sklearn.preprocessing")
+
+# Grade de variantes avaliadas: (tipo, alpha, grau do polinômio)
+VARIANTES = [
+    (tipo, alpha, grau)
+    for grau in (1, 2, 3)
+    for tipo, alpha in [
+        ("Linear", None),
+        ("Ridge", 0.1), ("Ridge", 1.0), ("Ridge", 10.0),
+        ("Lasso", 0.01), ("Lasso", 0.1),
+    ]
+]
+
+
+def criar_modelo(tipo, alpha, grau):
+    """Pipeline de características polinomiais + padronização + regressor"""
+    if tipo == "Linear":
+        regressor = linear_model.LinearRegression()
+    elif tipo == "Ridge":
+        regressor = linear_model.Ridge(alpha=alpha)
+    elif tipo == "Lasso":
+        regressor = linear_model.Lasso(alpha=alpha, max_iter=10_000)
+    else:
+        raise ValueError(f"Tipo de modelo desconhecido: {tipo}")
+    return pipeline.make_pipeline(
+        preprocessamento.PolynomialFeatures(grau, include_bias=False),
+        preprocessamento.StandardScaler(),
+        regressor,
+    )
+
+
+def avaliar_dobra(variante, X, y, indices_treino, indices_teste):
+    """Treina uma variante em uma dobra e mede o desempenho na parte de teste"""
+    inicio = time.perf_counter()
+    modelo = criar_modelo(*variante)
+    modelo.fit(X[indices_treino], y[indices_treino])
+    y_pred = modelo.predict(X[indices_teste])
+    return {
+        "r2": metricas.r2_score(y[indices_teste], y_pred),
+        "rmse": float(np.sqrt(metricas.mean_squared_error(y[indices_teste], y_pred))),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def avaliar_dobra_em_cache(avaliar, variante, X, y, indices_treino, indices_teste):
+    """
+    Avalia uma dobra pelo cache em disco. O tempo é o gasto nesta chamada
+    (leitura do cache ou treino), não o guardado junto com o resultado.
+    """
+    em_cache = avaliar.check_call_in_cache(variante, X, y, indices_treino, indices_teste)
+    inicio = time.perf_counter()
+    resultado = avaliar(variante, X, y, indices_treino, indices_teste)
+    return {**resultado, "segundos": time.perf_counter() - inicio, "em_cache": em_cache}
+
+
+def validacao_cruzada(df, k=5, n_jobs=-1, diretorio_cache=None, limite_cache_bytes=256 * 2**20, semente=42):
+    """
+    Avalia todas as VARIANTES com validação cruzada de k dobras.
+
+    Cada par (variante, dobra) é uma tarefa independente, distribuída entre
+    os núcleos por processos do joblib. Com diretorio_cache, o resultado de
+    cada dobra fica em disco (chave: variante + dados da dobra), então
+    repetir a avaliação só calcula o que mudou; depois de cada avaliação,
+    os resultados usados há mais tempo são apagados até o cache caber em
+    limite_cache_bytes.
+
+    Retorna o ranking ordenado pelo RMSE médio, com o tempo somado das
+    dobras e quantas delas vieram do cache.
+    """
+    X = df[COLUNAS_ENTRADA].to_numpy(dtype=np.float64)
+    y = df[COLUNA_ALVO].to_numpy(dtype=np.float64)
+    dobras = list(selecao.KFold(n_splits=k, shuffle=True, random_state=semente).split(X))
+
+    tarefas = [(variante, treino, teste) for variante in VARIANTES for treino, teste in dobras]
+    if diretorio_cache is None:
+        resultados = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(avaliar_dobra)(variante, X, y, treino, teste) for variante, treino, teste in tarefas
+        )
+        resultados = [{**resultado, "em_cache": False} for resultado in resultados]
+    else:
+        memoria = joblib.Memory(os.path.join(diretorio_cache, "validacao_cruzada"), verbose=0)
+        avaliar = memoria.cache(avaliar_dobra)
+        resultados = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(avaliar_dobra_em_cache)(avaliar, variante, X, y, treino, teste)
+            for variante, treino, teste in tarefas
+        )
+        memoria.reduce_size(bytes_limit=limite_cache_bytes)
+
+    linhas = [
+        {"Modelo": variante[0], "Alpha": variante[1], "Grau": variante[2], **resultado}
+        for (variante, _, _), resultado in zip(tarefas, resultados)
+    ]
+    ranking = (
+        pd.DataFrame(linhas)
+        .groupby(["Modelo", "Alpha", "Grau"], dropna=False)
+        .agg(
+            R2_medio=("r2", "mean"),
+            R2_desvio=("r2", "std"),
+            RMSE_medio=("rmse", "mean"),
+            Segundos=("segundos", "sum"),
+            Dobras_em_cache=("em_cache", "sum"),
+        )
+        .reset_index()
+        .sort_values("RMSE_medio", kind="stable")
+        .reset_index(drop=True)
+    )
+    return ranking
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class MinimosQuadradosIncremental:
+    """
+    Regressão linear por mínimos quadrados treinada bloco a bloco.
+
+    Em vez de guardar os dados, acumula as estatísticas suficientes
+    X^T X, X^T y e y^T y (com uma coluna de 1s para o intercepto). Os
+    coeficientes saem da solução das equações normais, então treinar com
+    um arquivo maior que a memória ou acrescentar dados novos depois só
+    exige passar uma vez pelas linhas novas.
+
+    Uma fração fixa das linhas (uma a cada `intervalo_teste`, pela posição
+    global) vai para um acumulador separado de teste, o que permite
+    calcular R² e RMSE de validação sem revisitar os dados.
+
+    Expõe coef_, intercept_ e predict como o LinearRegression do
+    scikit-learn, para ser usado no lugar dele.
+    """
+
+    def __init__(self, n_variaveis, intervalo_teste=5):
+        tamanho = n_variaveis + 1
+        self.intervalo_teste = intervalo_teste
+        self.linhas_vistas = 0
+        self._treino = _Acumulador(tamanho)
+        self._teste = _Acumulador(tamanho)
+        self._solucao = None
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        Xa = np.column_stack([np.ones(len(X)), X])
+
+        posicoes = self.linhas_vistas + np.arange(len(X))
+        teste = posicoes % self.intervalo_teste == 0
+        self._treino.adicionar(Xa[~teste], y[~teste])
+        self._teste.adicionar(Xa[teste], y[teste])
+
+        self.linhas_vistas += len(X)
+        self._solucao = None
+        return self
+
+    @property
+    def linhas_treino(self):
+        return self._treino.n
+
+    def _resolver(self):
+        if self._solucao is None:
+            if self._treino.n == 0:
+                raise ValueError("O modelo ainda não recebeu dados de treino")
+            try:
+                self._solucao = np.linalg.solve(self._treino.xtx, self._treino.xty)
+            except np.linalg.LinAlgError:
+                # Matriz singular (ex.: coluna constante): usar a pseudo-inversa
+                self._solucao = np.linalg.lstsq(self._treino.xtx, self._treino.xty, rcond=None)[0]
+        return self._solucao
+
+    @property
+    def intercept_(self):
+        return float(self._resolver()[0])
+
+    @property
+    def coef_(self):
+        return self._resolver()[1:]
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.coef_ + self.intercept_
+
+    def metricas_teste(self):
+        """R² e RMSE nas linhas de teste, calculados só com as somas acumuladas"""
+        return self._teste.metricas(self._resolver())
+
+
+class _Acumulador:
+    """Somas X^T X, X^T y, y^T y e Σy de um conjunto de linhas"""
+
+    def __init__(self, tamanho):
+        self.xtx = np.zeros((tamanho, tamanho))
+        self.xty = np.zeros(tamanho)
+        self.yty = 0.0
+        self.soma_y = 0.0
+        self.n = 0
+
+    def adicionar(self, Xa, y):
+        self.xtx += Xa.T @ Xa
+        self.xty += Xa.T @ y
+        self.yty += float(y @ y)
+        self.soma_y += float(y.sum())
+        self.n += len(y)
+
+    def metricas(self, beta):
+        if self.n == 0:
+            return float("nan"), float("nan")
+        # SSE = y'y - 2 b'X'y + b'X'X b ; SST = y'y - n * média²
+        sse = self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta
+        sst = self.yty - self.soma_y ** 2 / self.n
+        sse = max(float(sse), 0.0)
+        r2 = 1 - sse / sst if sst > 0 else float("nan")
+        return r2, float(np.sqrt(sse / self.n))
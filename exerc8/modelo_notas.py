@@ -0,0 +1,230 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from comum.importacao_tardia import importar_tardio
+from minimos_quadrados import MinimosQuadradosIncremental
+
+linear_model = importar_tardio("sklearn.linear_model")
+metricas = importar_tardio("sklearn.metrics")
+selecao = importar_tardio("sklearn.model_selection")
+
+COLUNAS_ENTRADA = ["horas_estudo", "nota_anterior"]
+COLUNA_ALVO = "nota_final"
+
+
+def versao_dados(df):
+    """Hash do conteúdo dos dados de treino, usado como versão do modelo"""
+    colunas = df[COLUNAS_ENTRADA + [COLUNA_ALVO]]
+    valores = pd.util.hash_pandas_object(colunas, index=False).to_numpy()
+    return hashlib.sha256(valores.tobytes()).hexdigest()[:16]
+
+
+def treinar_modelo(df, versao):
+    """Treina a regressão linear e avalia no conjunto de teste (80/20)"""
+    X = df[COLUNAS_ENTRADA]
+    y = df[COLUNA_ALVO]
+
+    X_train, X_test, y_train, y_test = selecao.train_test_split(X, y, test_size=0.2, random_state=42)
+
+    modelo = linear_model.LinearRegression()
+    modelo.fit(X_train, y_train)
+
+    y_pred_test = modelo.predict(X_test)
+    return {
+        "modelo": modelo,
+        "versao": versao,
+        "r2": metricas.r2_score(y_test, y_pred_test),
+        "rmse": np.sqrt(metricas.mean_squared_error(y_test, y_pred_test)),
+        "linhas_treino": len(X_train),
+        "treinado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def salvar_artefato(artefato, caminho):
+    """Grava o artefato de forma atômica (arquivo temporário + rename)"""
+    diretorio = os.path.dirname(caminho)
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            pickle.dump(artefato, arquivo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def ler_artefato(caminho):
+    """Carrega um artefato salvo, ou None se não existir ou estiver ilegível"""
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, "rb") as arquivo:
+            return pickle.load(arquivo)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # Artefato corrompido ou de outra versão do scikit-learn
+        return None
+
+
+def carregar_ou_treinar(df, diretorio):
+    """
+    Retorna o artefato do modelo para a versão atual dos dados.
+
+    Se já existe um artefato salvo para a mesma versão ele é carregado do
+    disco; caso contrário o modelo é treinado e o artefato é salvo, então o
+    treino acontece uma única vez por versão dos dados.
+    """
+    versao = versao_dados(df)
+    caminho = os.path.join(diretorio, f"modelo_notas_{versao}.pkl")
+
+    artefato = ler_artefato(caminho)
+    if artefato is not None:
+        return artefato
+
+    artefato = treinar_modelo(df, versao)
+    salvar_artefato(artefato, caminho)
+    return artefato
+
+
+def _assinatura_consumida(arquivo, fim, trecho=64 * 1024):
+    """
+    Resumo dos `fim` bytes já consumidos de um arquivo: o início (com o
+    cabeçalho) e o trecho logo antes de `fim`. Ler só esses dois trechos
+    mantém o custo constante, por maior que o arquivo fique.
+    """
+    resumo = hashlib.sha256()
+    arquivo.seek(0)
+    resumo.update(arquivo.read(min(fim, trecho)))
+    arquivo.seek(max(0, fim - trecho))
+    resumo.update(arquivo.read(fim - max(0, fim - trecho)))
+    return resumo.hexdigest()
+
+
+def treinar_incremental_arquivo(caminho, diretorio, tamanho_bloco=500_000):
+    """
+    Treina (ou atualiza) o modelo a partir de um CSV grande, lido em blocos.
+
+    O estado do treino (somas acumuladas e quantos bytes do arquivo já
+    foram consumidos) fica salvo no artefato. Se o arquivo cresceu desde o
+    último treino, só as linhas acrescentadas no fim são lidas. Se ele
+    encolheu, ou se foi substituído por outro (inode diferente, ou início
+    e trecho final da parte já lida diferentes), o treino recomeça do
+    zero. O arquivo deve ser alimentado apenas com linhas completas
+    acrescentadas ao final.
+    """
+    identificador = hashlib.sha256(os.path.abspath(caminho).encode("utf-8")).hexdigest()[:12]
+    caminho_artefato = os.path.join(diretorio, f"modelo_notas_incremental_{identificador}.pkl")
+
+    artefato = ler_artefato(caminho_artefato)
+    with open(caminho, "rb") as arquivo:
+        estado_arquivo = os.fstat(arquivo.fileno())
+        tamanho_arquivo = estado_arquivo.st_size
+        identidade = (estado_arquivo.st_dev, estado_arquivo.st_ino)
+        if artefato is not None and (
+            artefato["bytes_processados"] > tamanho_arquivo
+            or artefato.get("identidade_arquivo") != identidade
+            or artefato.get("assinatura_consumida")
+            != _assinatura_consumida(arquivo, artefato["bytes_processados"])
+        ):
+            artefato = None
+
+        if artefato is not None and artefato["bytes_processados"] == tamanho_arquivo:
+            return artefato
+
+        arquivo.seek(0)
+        if artefato is None:
+            colunas = arquivo.readline().decode("utf-8").strip().split(",")
+            modelo = MinimosQuadradosIncremental(len(COLUNAS_ENTRADA))
+            inicio = arquivo.tell()
+        else:
+            colunas = artefato["colunas"]
+            modelo = artefato["modelo"]
+            inicio = artefato["bytes_processados"]
+
+        faltando = [coluna for coluna in COLUNAS_ENTRADA + [COLUNA_ALVO] if coluna not in colunas]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltando)}")
+
+        arquivo.seek(inicio)
+        if inicio < tamanho_arquivo:
+            blocos = pd.read_csv(
+                arquivo,
+                header=None,
+                names=colunas,
+                usecols=COLUNAS_ENTRADA + [COLUNA_ALVO],
+                chunksize=tamanho_bloco,
+            )
+            for bloco in blocos:
+                modelo.partial_fit(bloco[COLUNAS_ENTRADA].to_numpy(), bloco[COLUNA_ALVO].to_numpy())
+        bytes_processados = arquivo.tell()
+        assinatura = _assinatura_consumida(arquivo, bytes_processados)
+
+    r2, rmse = modelo.metricas_teste()
+    estado = np.concatenate([modelo.coef_, [modelo.intercept_, modelo.linhas_vistas]])
+    artefato = {
+        "modelo": modelo,
+        "versao": hashlib.sha256(estado.tobytes()).hexdigest()[:16],
+        "r2": r2,
+        "rmse": rmse,
+        "linhas_treino": modelo.linhas_treino,
+        "treinado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "colunas": colunas,
+        "bytes_processados": bytes_processados,
+        "identidade_arquivo": identidade,
+        "assinatura_consumida": assinatura,
+    }
+    salvar_artefato(artefato, caminho_artefato)
+    return artefato
+
+
+def amostra_uniforme(caminho, tamanho, tamanho_bloco=500_000, semente=42):
+    """
+    Amostra aleatória uniforme de linhas de um CSV sem carregá-lo inteiro.
+
+    Cada linha recebe uma chave aleatória e, bloco a bloco, só as
+    `tamanho` linhas de menor chave são mantidas.
+    """
+    gerador = np.random.default_rng(semente)
+    amostra = None
+    for bloco in pd.read_csv(caminho, usecols=COLUNAS_ENTRADA + [COLUNA_ALVO], chunksize=tamanho_bloco):
+        bloco["_chave"] = gerador.random(len(bloco))
+        amostra = bloco if amostra is None else pd.concat([amostra, bloco], ignore_index=True)
+        if len(amostra) > tamanho:
+            amostra = amostra.nsmallest(tamanho, "_chave")
+    if amostra is None:
+        return pd.DataFrame(columns=COLUNAS_ENTRADA + [COLUNA_ALVO])
+    return amostra.drop(columns="_chave").reset_index(drop=True)
+
+
+def prever_lote(modelo, arquivo, destino, tamanho_bloco=250_000):
+    """
+    Lê um CSV com as colunas de entrada em blocos, calcula a previsão de
+    cada bloco de forma vetorizada e escreve o resultado em destino (um
+    arquivo binário) à medida que processa.
+
+    A previsão usa os coeficientes direto (X @ coef + intercepto), sem
+    passar pelas validações do predict a cada bloco. É um gerador: devolve
+    o total de linhas processadas após cada bloco, para acompanhar o
+    progresso.
+    """
+    coeficientes = np.asarray(modelo.coef_, dtype=np.float64)
+    intercepto = float(modelo.intercept_)
+    linhas = 0
+
+    for numero, bloco in enumerate(pd.read_csv(arquivo, chunksize=tamanho_bloco)):
+        faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in bloco.columns]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltando)}")
+
+        X = bloco[COLUNAS_ENTRADA].to_numpy(dtype=np.float64)
+        bloco["nota_prevista"] = X @ coeficientes + intercepto
+        bloco.to_csv(destino, header=numero == 0, index=False, encoding="utf-8")
+
+        linhas += len(bloco)
+        yield linhas
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+
+def _voxels(df, colunas, divisoes):
+    """Código do voxel (célula de uma grade regular) de cada linha"""
+    codigo = np.zeros(len(df), dtype=np.int64)
+    for coluna in colunas:
+        valores = df[coluna].to_numpy(dtype=np.float64)
+        minimo, maximo = np.nanmin(valores), np.nanmax(valores)
+        largura = (maximo - minimo) / divisoes or 1.0
+        indice = np.clip(((valores - minimo) / largura).astype(np.int64), 0, divisoes - 1)
+        codigo = codigo * divisoes + indice
+    return codigo
+
+
+def amostragem_estratificada(df, colunas, orcamento, divisoes=8, semente=42):
+    """
+    Amostra exatamente `orcamento` linhas (ou todas, se houver menos)
+    preservando a distribuição espacial.
+
+    Os pontos são agrupados em voxels e cada voxel contribui com uma cota
+    proporcional ao seu tamanho (pelo menos um ponto), então regiões
+    esparsas continuam visíveis mesmo com orçamentos pequenos. Se houver
+    mais voxels ocupados que o orçamento, a grade fica mais grossa; se as
+    cotas mínimas passarem do orçamento, o excesso sai dos voxels maiores;
+    se o arredondamento para baixo deixar vagas, elas vão para os voxels
+    de maior resto.
+    """
+    if len(df) <= orcamento:
+        return df
+
+    gerador = np.random.default_rng(semente)
+    voxel = _voxels(df, colunas, divisoes)
+    while divisoes > 1 and np.count_nonzero(np.bincount(voxel)) > orcamento:
+        divisoes -= 1
+        voxel = _voxels(df, colunas, divisoes)
+
+    # Embaralhar e numerar os pontos dentro de cada voxel
+    ordem = gerador.permutation(len(df))
+    posicao = pd.Series(voxel[ordem]).groupby(voxel[ordem]).cumcount().to_numpy()
+
+    _, inverso, contagens = np.unique(voxel[ordem], return_inverse=True, return_counts=True)
+    proporcionais = contagens * orcamento / len(df)
+    cotas = np.maximum(1, np.floor(proporcionais)).astype(np.int64)
+
+    # Vagas deixadas pelo arredondamento: um ponto a mais para cada voxel
+    # de maior resto (quem subiu para o mínimo de um ponto tem resto negativo)
+    faltando = orcamento - cotas.sum()
+    if faltando > 0:
+        maiores = np.argsort(-(proporcionais - cotas), kind="stable")[:faltando]
+        cotas[maiores] += 1
+
+    excesso = cotas.sum() - orcamento
+    if excesso > 0:
+        # Corte proporcional ao que cada voxel tem além do seu ponto garantido;
+        # o resto do arredondamento sai, um ponto cada, dos que ainda têm mais
+        reduzivel = cotas - 1
+        reducao = np.floor(reduzivel * excesso / reduzivel.sum()).astype(np.int64)
+        maiores = np.argsort(-(reduzivel - reducao), kind="stable")[:excesso - reducao.sum()]
+        reducao[maiores] += 1
+        cotas -= reducao
+
+    selecionados = ordem[posicao < cotas[inverso]]
+    return df.iloc[np.sort(selecionados)]
+
+
+def agregacao_voxels(df, colunas, orcamento):
+    """
+    Resume os pontos em no máximo `orcamento` voxels: cada voxel vira um
+    ponto na média das coordenadas, com a quantidade de pontos agregados.
+    """
+    divisoes = max(1, int(np.floor(orcamento ** (1 / len(colunas)))))
+    voxel = _voxels(df, colunas, divisoes)
+    agregado = df[colunas].groupby(voxel).mean()
+    agregado["quantidade"] = np.bincount(voxel)[agregado.index]
+    return agregado.reset_index(drop=True)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from modelo_notas import COLUNAS_ENTRADA
+
+
+class SuperficiePrevisao:
+    """
+    Previsões do modelo pré-calculadas para toda a grade de entradas dos
+    widgets (horas de estudo x nota anterior), mais a linha de regressão
+    de cada nota anterior da grade.
+
+    Tudo é calculado com uma única chamada de predict; depois disso, cada
+    interação é só uma consulta por índice. Valores fora da grade (ex.:
+    uma nota digitada fora do passo) caem no predict do modelo.
+    """
+
+    def __init__(self, modelo, horas, notas, x_linha):
+        self.modelo = modelo
+        self.horas = np.asarray(horas, dtype=np.float64)
+        self.notas = np.asarray(notas, dtype=np.float64)
+        self.x_linha = np.asarray(x_linha, dtype=np.float64)
+
+        # Uma única avaliação para a grade e para as linhas de regressão
+        malha_notas, malha_horas = np.meshgrid(self.notas, np.concatenate([self.horas, self.x_linha]), indexing="ij")
+        valores = self._prever(malha_horas.ravel(), malha_notas.ravel()).reshape(malha_horas.shape)
+
+        self.previsoes = valores[:, :len(self.horas)]
+        self.linhas = valores[:, len(self.horas):]
+
+    def _prever(self, horas, notas):
+        entrada = pd.DataFrame({COLUNAS_ENTRADA[0]: horas, COLUNAS_ENTRADA[1]: notas})
+        return np.asarray(self.modelo.predict(entrada), dtype=np.float64)
+
+    @staticmethod
+    def _posicao(grade, valor):
+        posicao = int(np.searchsorted(grade, valor))
+        if posicao < len(grade) and np.isclose(grade[posicao], valor):
+            return posicao
+        return None
+
+    def prever(self, horas, nota):
+        i = self._posicao(self.notas, nota)
+        j = self._posicao(self.horas, horas)
+        if i is None or j is None:
+            return float(self._prever(np.array([horas]), np.array([nota]))[0])
+        return float(self.previsoes[i, j])
+
+    def linha_regressao(self, nota):
+        """Valores previstos ao longo de x_linha para a nota anterior dada"""
+        i = self._posicao(self.notas, nota)
+        if i is None:
+            return self._prever(self.x_linha, np.full(len(self.x_linha), nota))
+        return self.linhas[i]
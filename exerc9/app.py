@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import io
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
+from comum import conjuntos, memoria_sessoes
+from comum.importacao_tardia import importar_tardio
+from comum.perfil import iniciar_perfil
+
+px = importar_tardio("plotly.express")
 
 # Configuração da página
 st.set_page_config(
@@ -11,20 +19,16 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+perfil = iniciar_perfil("exerc9")
 
-# Inicializar session_state se necessário
-if 'dados' not in st.session_state:
-    st.session_state.dados = None
+# Inicializar session_state se necessário. Os dados carregados não ficam
+# no session_state: os enviados ficam em memoria_sessoes, que conta a
+# memória de cada sessão e leva para o disco os dados de sessões ociosas
+# (relidos quando a sessão volta); os de exemplo ficam só no cache de
+# conjuntos, compartilhados por todas as sessões
 if 'pagina_atual' not in st.session_state:
     st.session_state.pagina_atual = "Upload de Dados"
 
-# Função para carregar dados com cache
-@st.cache_data
-def processar_dados(df):
-    """Função com cache para processar os dados"""
-    # Simulando algum processamento pesado
-    return df.copy()
-
 # Função para calcular estatísticas com cache
 @st.cache_data
 def calcular_estatisticas(df):
@@ -36,7 +40,7 @@ def calcular_estatisticas(df):
         "desvio_padrao": df.std(numeric_only=True),
         "minimo": df.min(numeric_only=True),
         "maximo": df.max(numeric_only=True),
-        "correlacao": df.corr() if len(df.select_dtypes(include=[np.number]).columns) > 1 else None
+        "correlacao": df.corr(numeric_only=True) if len(df.select_dtypes(include=[np.number]).columns) > 1 else None
     }
     return estatisticas
 
@@ -60,6 +64,21 @@ def gerar_dados_exemplo():
     
     return df
 
+# Dados da sessão atual (None se ainda não carregou nenhum)
+def obter_dados():
+    if st.session_state.get("usando_exemplo"):
+        return conjuntos.carregar("exerc9_exemplo", gerar_dados_exemplo)
+    return memoria_sessoes.obter("dados")
+
+# Aviso das páginas de análise quando a sessão não tem dados
+def avisar_sem_dados():
+    if st.session_state.get("arquivo_dados"):
+        # O arquivo foi enviado, mas os dados da sessão expiraram e o
+        # envio só pode ser lido de novo na página de upload
+        st.warning("Os dados enviados não estão mais disponíveis. Envie o arquivo de novo na página 'Upload de Dados'.")
+    else:
+        st.warning("Não há dados carregados. Por favor, volte à página 'Upload de Dados'.")
+
 # Página 1: Upload e visualização de dados
 if st.session_state.pagina_atual == "Upload de Dados":
     st.title("Upload e Visualização de Dados")
@@ -75,25 +94,42 @@ if st.session_state.pagina_atual == "Upload de Dados":
         
         if uploaded_file is not None:
             try:
-                # Leitura do arquivo CSV
-                df = pd.read_csv(uploaded_file)
-                st.session_state.dados = processar_dados(df)
+                # Leitura do arquivo CSV, só quando o arquivo enviado muda ou
+                # quando os dados desta sessão já foram apagados (sessão
+                # expirada). O DataFrame fica em memoria_sessoes, que o leva
+                # para o disco se a memória das sessões passar do limite
+                df = None
+                if st.session_state.get("arquivo_dados") == uploaded_file.file_id:
+                    df = memoria_sessoes.obter("dados")
+                if df is None:
+                    with perfil.secao("carregamento"):
+                        uploaded_file.seek(0)
+                        df = pd.read_csv(uploaded_file)
+                    memoria_sessoes.guardar("dados", df)
+                    st.session_state.arquivo_dados = uploaded_file.file_id
+                    st.session_state.usando_exemplo = False
                 st.success(f"Arquivo carregado com sucesso! {len(df)} linhas e {len(df.columns)} colunas.")
             except Exception as e:
                 st.error(f"Erro ao ler o arquivo: {e}")
                 
     else:  # Gerar dados de exemplo
         if st.button("Gerar Dados de Exemplo"):
-            df = gerar_dados_exemplo()
-            st.session_state.dados = processar_dados(df)
+            with perfil.secao("carregamento"):
+                conjuntos.carregar("exerc9_exemplo", gerar_dados_exemplo)
+            # Os dados de exemplo são os mesmos para todos e ficam no cache
+            # compartilhado; a sessão só solta o arquivo que tinha enviado
+            memoria_sessoes.remover("dados")
+            st.session_state.arquivo_dados = None
+            st.session_state.usando_exemplo = True
             st.success("Dados de exemplo gerados com sucesso!")
     
     # Visualização dos dados
-    if st.session_state.dados is not None:
+    dados_sessao = obter_dados()
+    if dados_sessao is not None:
         st.subheader("Visualização dos Dados")
         
         # Opção para filtrar colunas
-        all_columns = st.session_state.dados.columns.tolist()
+        all_columns = dados_sessao.columns.tolist()
         selected_columns = st.multiselect(
             "Selecione as colunas para visualizar:",
             all_columns,
@@ -102,7 +138,8 @@ if st.session_state.pagina_atual == "Upload de Dados":
         
         # Exibir dados filtrados
         if selected_columns:
-            st.dataframe(st.session_state.dados[selected_columns].head(50))
+            with perfil.secao("serialização"):
+                st.dataframe(dados_sessao[selected_columns].head(50))
         else:
             st.info("Selecione pelo menos uma coluna para visualizar os dados.")
         
@@ -111,19 +148,19 @@ if st.session_state.pagina_atual == "Upload de Dados":
         
         col1, col2 = st.columns(2)
         with col1:
-            st.write(f"**Número de linhas:** {st.session_state.dados.shape[0]}")
-            st.write(f"**Número de colunas:** {st.session_state.dados.shape[1]}")
+            st.write(f"**Número de linhas:** {dados_sessao.shape[0]}")
+            st.write(f"**Número de colunas:** {dados_sessao.shape[1]}")
         
         with col2:
             # Verificar tipos de dados
-            tipos_dados = st.session_state.dados.dtypes.value_counts()
+            tipos_dados = dados_sessao.dtypes.value_counts()
             st.write("**Tipos de dados:**")
             for tipo, contagem in tipos_dados.items():
                 st.write(f"- {tipo}: {contagem} colunas")
         
         # Download dos dados processados
         if st.button("Download dos dados processados"):
-            csv = st.session_state.dados.to_csv(index=False)
+            csv = dados_sessao.to_csv(index=False)
             st.download_button(
                 label="Clique para baixar",
                 data=csv,
@@ -137,8 +174,8 @@ if st.session_state.pagina_atual == "Upload de Dados":
 elif st.session_state.pagina_atual == "Análise Estatística":
     st.title("Análise Estatística dos Dados")
     
-    if st.session_state.dados is not None:
-        df = st.session_state.dados
+    df = obter_dados()
+    if df is not None:
         
         # Filtrar apenas colunas numéricas para análise
         colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -147,7 +184,8 @@ elif st.session_state.pagina_atual == "Análise Estatística":
             st.warning("Não há colunas numéricas para análise estatística.")
         else:
             # Estatísticas básicas com cache
-            estatisticas = calcular_estatisticas(df)
+            with perfil.secao("estatísticas"):
+                estatisticas = calcular_estatisticas(df)
             
             # Seleção de colunas para análise
             col_analise = st.multiselect(
@@ -177,13 +215,15 @@ elif st.session_state.pagina_atual == "Análise Estatística":
                         fig = px.histogram(df, x=col, nbins=20, 
                                           title=f"Distribuição de {col}")
                         fig.update_layout(bargap=0.1)
-                        st.plotly_chart(fig, use_container_width=True)
+                        with perfil.secao("serialização"):
+                            st.plotly_chart(fig, use_container_width=True)
                 
                 with tab3:
                     if len(col_analise) > 1:
                         st.subheader("Matriz de Correlação")
                         # Criar matriz de correlação entre as colunas selecionadas
-                        corr_matrix = df[col_analise].corr()
+                        with perfil.secao("estatísticas"):
+                            corr_matrix = df[col_analise].corr()
                         
                         # Plotar com heatmap
                         fig = px.imshow(
@@ -192,18 +232,19 @@ elif st.session_state.pagina_atual == "Análise Estatística":
                             color_continuous_scale="RdBu_r",
                             title="Matriz de Correlação"
                         )
-                        st.plotly_chart(fig, use_container_width=True)
+                        with perfil.secao("serialização"):
+                            st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Selecione pelo menos uma coluna para análise.")
     else:
-        st.warning("Não há dados carregados. Por favor, volte à página 'Upload de Dados'.")
+        avisar_sem_dados()
 
 # Página 3: Gráficos interativos
 elif st.session_state.pagina_atual == "Gráficos Interativos":
     st.title("Gráficos Interativos")
     
-    if st.session_state.dados is not None:
-        df = st.session_state.dados
+    df = obter_dados()
+    if df is not None:
         
         # Filtrar tipos de colunas
         colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -243,7 +284,8 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                     labels={x_col: x_col, y_col: y_col}
                 )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                with perfil.secao("serialização"):
+                    st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("São necessárias pelo menos duas colunas numéricas para criar um gráfico de dispersão.")
         
@@ -277,7 +319,8 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                         title=f"{y_col} por {x_col}"
                     )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                with perfil.secao("serialização"):
+                    st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("São necessárias colunas categóricas e numéricas para criar um gráfico de barras.")
         
@@ -308,7 +351,8 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                         title=f"Gráfico de Linha"
                     )
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    with perfil.secao("serialização"):
+                        st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.info("Selecione pelo menos uma coluna para o eixo Y.")
             else:
@@ -340,7 +384,8 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                         title=f"Gráfico de Área"
                     )
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    with perfil.secao("serialização"):
+                        st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.info("Selecione pelo menos uma coluna para o eixo Y.")
             else:
@@ -366,7 +411,8 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                     title=f"Distribuição de {values_col} por {labels_col}"
                 )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                with perfil.secao("serialização"):
+                    st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("São necessárias colunas categóricas e numéricas para criar um gráfico de pizza.")
         
@@ -382,7 +428,7 @@ elif st.session_state.pagina_atual == "Gráficos Interativos":
                 # Nota: No Streamlit real, isso salvaria o HTML interativo
                 st.success("Função de exportação HTML disponível no Streamlit!")
     else:
-        st.warning("Não há dados carregados. Por favor, volte à página 'Upload de Dados'.")
+        avisar_sem_dados()
 
 # Informações na barra lateral
 with st.sidebar:
@@ -397,7 +443,10 @@ with st.sidebar:
     """)
     
     # Mostrar status dos dados carregados
-    if st.session_state.dados is not None:
-        st.success(f"✅ Dados carregados: {st.session_state.dados.shape[0]} linhas")
+    dados_sessao = obter_dados()
+    if dados_sessao is not None:
+        st.success(f"✅ Dados carregados: {dados_sessao.shape[0]} linhas")
     else:
         st.error("❌ Nenhum dado carregado")
+
+perfil.finalizar()
@@ -0,0 +1,3 @@
+from comum.paginas import executar_exercicio
+
+executar_exercicio("exerc1")